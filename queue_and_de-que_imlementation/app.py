@@ -1,11 +1,17 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+from flask import Flask, render_template, request, redirect, url_for, flash, session, Response, stream_with_context, jsonify
 from collections import deque
 from bst import BST
 from restaurant import Restaurant
-from station_lines_graph import stations_graph
+from station_lines_graph import batch_routes, k_shortest_paths
+from network_loader import METRO_MANILA_RAIL, load_network
 from collections import deque
+import atexit
+import signal
 import subprocess
 import os
+import threading
+import time
+import re
 import sys
 
 class Node:
@@ -58,23 +64,95 @@ class Queue:
             current = current.next
         return result
     
-def bfs_shortest_path(graph, start, goal):
-    visited = set()
-    queue = deque([[start]])
-    while queue:
-        path = queue.popleft()
-        station = path[-1]
-        if station == goal:
-            return path
-        if station not in visited:
-            visited.add(station)
-            for neighbor in graph.vertices[station]:
-                queue.append(path + [neighbor])
-    return None
+# The binary tree is saved here and reloaded on startup. A save rewrites the
+# whole snapshot (O(n)), so bulk inserts and clears save straight away, while
+# single inserts and deletes save at most every BST_SAVE_INTERVAL seconds: an
+# edit inside the interval arms a timer that saves once it has passed. A crash
+# therefore loses at most the last BST_SAVE_INTERVAL seconds of edits; a clean
+# exit or SIGTERM saves anything pending first.
+BST_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bst_tree.snapshot')
+BST_SAVE_INTERVAL = 30
+# the snapshot stores signed 64-bit keys
+BST_MIN_VALUE = -2**63
+BST_MAX_VALUE = 2**63 - 1
+
+bst_dirty = False
+bst_saved_at = 0.0
+bst_save_timer = None
+# held while the tree is edited or saved, since the deferred save runs on the timer's thread
+bst_lock = threading.RLock()
+
+def load_bst():
+    if os.path.exists(BST_SNAPSHOT_PATH):
+        try:
+            return BST.load(BST_SNAPSHOT_PATH)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable BST snapshot: {e}")
+    return BST()
+
+def save_bst():
+    """Write the snapshot now; returns False (and logs why) if it couldn't be written."""
+    global bst_dirty, bst_saved_at, bst_save_timer
+    with bst_lock:
+        if bst_save_timer is not None:
+            bst_save_timer.cancel()
+            bst_save_timer = None
+        try:
+            bst_tree.save(BST_SNAPSHOT_PATH)
+        except (OSError, OverflowError, TypeError) as e:
+            print(f"Could not save BST snapshot: {e}")
+            return False
+        bst_dirty = False
+        bst_saved_at = time.monotonic()
+        return True
+
+def bst_changed():
+    """
+    Note a single-value edit; saves now if the last save is BST_SAVE_INTERVAL
+    seconds old, otherwise makes sure a deferred save is scheduled.
+    """
+    global bst_dirty, bst_save_timer
+    with bst_lock:
+        bst_dirty = True
+        wait = BST_SAVE_INTERVAL - (time.monotonic() - bst_saved_at)
+        if wait <= 0:
+            return save_bst()
+        if bst_save_timer is None:
+            bst_save_timer = threading.Timer(wait, save_bst_deferred)
+            bst_save_timer.daemon = True
+            bst_save_timer.start()
+        return True
+
+def save_bst_deferred():
+    global bst_save_timer
+    with bst_lock:
+        if bst_save_timer is not threading.current_thread():
+            return      # save_bst() ran (and cancelled this timer) while it waited for the lock
+        bst_save_timer = None
+        if bst_dirty:
+            save_bst()
+
+def save_bst_on_exit():
+    with bst_lock:
+        if bst_dirty:
+            save_bst()
+
+def save_bst_on_sigterm(signum, frame):
+    """Save pending edits, then let SIGTERM end the process as it would have."""
+    save_bst_on_exit()
+    signal.signal(signum, signal.SIG_DFL)
+    signal.raise_signal(signum)
+
+def bst_value_in_range(value):
+    return BST_MIN_VALUE <= value <= BST_MAX_VALUE
 
 restaurant = Restaurant()
 tabs = deque()
-bst_tree = BST()
+bst_tree = load_bst()
+atexit.register(save_bst_on_exit)
+# atexit does not run when SIGTERM kills the process; only the main thread may install handlers
+if threading.current_thread() is threading.main_thread() and signal.getsignal(signal.SIGTERM) == signal.SIG_DFL:
+    signal.signal(signal.SIGTERM, save_bst_on_sigterm)
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key_here'  # Needed for flash messages
@@ -178,18 +256,33 @@ def remove_rear():
     return redirect(url_for("tab_manager"))
 
 # Binary Search Tree Routes
+# Trees bigger than this are streamed from /projects/binary_tree/svg instead of inlined in the page
+BST_INLINE_SVG_LIMIT = 2000
+
 @app.route('/projects/binary_tree')
 def binary_tree():
     session.pop('_flashes', None)
-    nodes, edges, svg_info = bst_tree.layout()
+    stream_svg = len(bst_tree) > BST_INLINE_SVG_LIMIT
+    svg = None if stream_svg else bst_tree.render_svg()
     traversal = bst_tree.post_traversal(bst_tree.root, [])
-    return render_template('binary_tree.html', nodes=nodes, edges=edges, svg_info=svg_info, traversal=traversal)
+    return render_template('binary_tree.html', svg=svg, stream_svg=stream_svg, traversal=traversal)
+
+@app.route('/projects/binary_tree/svg')
+def bst_svg():
+    return Response(stream_with_context(bst_tree.iter_svg()), mimetype='image/svg+xml')
 
 @app.route('/projects/binary_tree/insert', methods=['POST'])
 def bst_insert():
     try:
         value = int(request.form.get('value'))
-        bst_tree.insert(value)
+        if not bst_value_in_range(value):
+            flash(f'Values must be between {BST_MIN_VALUE} and {BST_MAX_VALUE}!', 'error')
+            return redirect(url_for('binary_tree'))
+        with bst_lock:
+            bst_tree.insert(value)
+            saved = bst_changed()
+        if not saved:
+            flash('The tree changed but could not be saved to disk!', 'error')
         flash(f'Inserted {value} into the tree!', 'success')
     except ValueError:
         flash('Please enter a valid number!', 'error')
@@ -197,6 +290,28 @@ def bst_insert():
         flash(f'Error: {str(e)}', 'error')
     return redirect(url_for('binary_tree'))
 
+@app.route('/projects/binary_tree/bulk_insert', methods=['POST'])
+def bst_bulk_insert():
+    raw = request.form.get('values', '')
+    try:
+        values = [int(token) for token in re.split(r'[,\s]+', raw.strip()) if token]
+        if values and not all(bst_value_in_range(value) for value in values):
+            flash(f'Values must be between {BST_MIN_VALUE} and {BST_MAX_VALUE}!', 'error')
+        elif values:
+            with bst_lock:
+                bst_tree.bulk_insert(values)
+                saved = save_bst()
+            if not saved:
+                flash('The tree changed but could not be saved to disk!', 'error')
+            flash(f'Inserted {len(values)} values into the tree!', 'success')
+        else:
+            flash('Please enter at least one number!', 'error')
+    except ValueError:
+        flash('Please enter numbers separated by commas or new lines!', 'error')
+    except Exception as e:
+        flash(f'Error: {str(e)}', 'error')
+    return redirect(url_for('binary_tree'))
+
 @app.route('/projects/binary_tree/search', methods=['POST'])
 def bst_search():
     try:
@@ -216,9 +331,14 @@ def bst_search():
 def bst_delete():
     try:
         value = int(request.form.get('value'))
-        found = bst_tree.search(bst_tree.root, value)
+        with bst_lock:
+            found = bst_tree.search(bst_tree.root, value)
+            if found:
+                bst_tree.root = bst_tree.delete_node(bst_tree.root, value)
+                saved = bst_changed()
         if found:
-            bst_tree.root = bst_tree.delete_node(bst_tree.root, value)
+            if not saved:
+                flash('The tree changed but could not be saved to disk!', 'error')
             flash(f'Deleted {value} from the tree!', 'success')
         else:
             flash(f'{value} not found in the tree.', 'info')
@@ -230,7 +350,11 @@ def bst_delete():
 
 @app.route('/projects/binary_tree/clear', methods=['POST'])
 def bst_clear():
-    bst_tree.root = None
+    with bst_lock:
+        bst_tree.root = None
+        saved = save_bst()
+    if not saved:
+        flash('The tree changed but could not be saved to disk!', 'error')
     flash('Tree cleared!', 'success')
     return redirect(url_for('binary_tree'))
 
@@ -348,9 +472,15 @@ def run_baccarat_game():
     
     return redirect(url_for('baccarat_game'))
 
+# The station network doesn't change while the app runs, so load it and tabulate every route once at startup
+stations_graph = load_network(METRO_MANILA_RAIL)
+station_coords = stations_graph.coords
+stations_graph.precompute_routes()
+
 @app.route("/projects/train-stations-simulator", methods=["GET", "POST"])
 def train():
     path = None
+    travel_time = None
     message = ""
     stations = stations = sorted([station.replace('_', ' ') for station in stations_graph.vertices.keys()])
     display_to_key = {station.replace('_', ' '): station for station in stations_graph.vertices.keys()}
@@ -364,67 +494,46 @@ def train():
         if start is None or end is None:
             message = "Invalid station input! Please select from available stations."
         else:
-            path = bfs_shortest_path(stations_graph, start, end)
-            if not path:
+            fastest = stations_graph.fastest_route(start, end)
+            if fastest:
+                path, travel_time = fastest
+            else:
                 message = "No path found between the selected stations."
 
 
-    return render_template("transport_page.html", stations=stations, path=path, message=message, station_coords=station_coords)
-
-#station coords for html coloring
-station_coords = {
-    #MRT COORDS
-    "North_Avenue": (60,100),
-    "Quezon_Avenue": (120,140),
-    "GMA_Kamuning": (180,180),
-    "Araneta_Center-Cubao": (180,300),
-    "Santolan-Anapolis": (180,380),
-    "Ortigas": (180,480),
-    "Shaw_Boulevard": (140,520),
-    "Boni_Avenue": (80,560),
-    "Guadalupe": (0,620),
-    "Buendia": (-80,680),
-    "Ayala": (-180,703),
-    "Magallanes": (-280,703),
-    "Taft_Avenue": (-380,703),
-
-    #LRT2 COORDS
-    "Recto": (-420, 340),
-    "Legarda": (-340, 340),
-    "Pureza": (-260, 340),
-    "V_Mapa": (-160, 340),
-    "J_Ruiz": (-80, 340),
-    "Gilmore": (30, 335),
-    "Betty_Go-Belmonte": (80, 300),
-    "Araneta_Center-Cubao": (180,300),
-    "Anonas": (240, 300),
-    "Katipunan": (300, 300),
-    "Santolan": (360, 335),
-    "Marikina-Pasig": (440, 335),
-    "Antipolo": (520, 335),
-
-    #LRT2 COORDS
-    "Roosevelt": (50,50),
-    "Balintawak": (-200, 50),
-    "Monumento": (-450, 50),
-    "5th_Avenue": (-450, 100),
-    "R_Papa": (-450, 140),
-    "Abad_Santos": (-450, 180),
-    "Blumentritt": (-450, 220),
-    "Tayuman": (-450, 260),
-    "Bambang": (-450, 300),
-    "Doroteo_Jose": (-450, 340),
-    "Carriedo": (-450, 380),
-    "Central_Terminal": (-450, 420),
-    "UN_Avenue": (-450, 460),
-    "Pedro_Gil": (-450, 500),
-    "Quirino": (-450, 540),
-    "Vito_Cruz": (-450, 580),
-    "Gil_Puyat": (-450, 620),
-    "Libertad": (-450, 660),
-    "EDSA": (-450, 700),
-    "Baclaran": (-450, 740)
-}
+    return render_template("transport_page.html", stations=stations, path=path, travel_time=travel_time, message=message, station_coords=station_coords)
+
+# Many routes in one request, for trip-planning batch jobs. Body:
+#   {"pairs": [["Baclaran", "Antipolo"], ...], "by": "time" | "hops", "k": 1}
+# Station names may use spaces or underscores. With k > 1 each answer also lists
+# up to k alternatives by travel time.
+@app.route("/projects/train-stations-simulator/batch", methods=["POST"])
+def train_batch():
+    body = request.get_json(silent=True) or {}
+    pairs = body.get("pairs")
+    by = body.get("by", "time")
+    k = body.get("k", 1)
+    if not isinstance(pairs, list) or not all(isinstance(pair, list) and len(pair) == 2 for pair in pairs):
+        return jsonify(error='"pairs" must be a list of [from, to] station pairs'), 400
+    if by not in ("time", "hops"):
+        return jsonify(error='"by" must be "time" or "hops"'), 400
+    if not isinstance(k, int) or k < 1:
+        return jsonify(error='"k" must be a positive integer'), 400
+
+    pairs = [(str(start).replace(' ', '_'), str(end).replace(' ', '_')) for start, end in pairs]
+    routes = []
+    for (start, end), found in zip(pairs, batch_routes(stations_graph, pairs, weighted=(by == "time"))):
+        answer = {"from": start, "to": end, "path": None}
+        if found:
+            answer["path"], answer["minutes" if by == "time" else "hops"] = found
+        elif start not in stations_graph.vertices or end not in stations_graph.vertices:
+            answer["error"] = "unknown station"
+        if k > 1 and found:
+            answer["alternatives"] = [{"path": path, "minutes": minutes}
+                                      for path, minutes in k_shortest_paths(stations_graph, start, end, k)]
+        routes.append(answer)
+    return jsonify(routes=routes)
+
 
 if __name__ == "__main__":
     app.run(debug=True)
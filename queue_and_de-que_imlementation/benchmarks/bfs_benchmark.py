@@ -0,0 +1,70 @@
+"""
+bfs_shortest_path (parent pointers, stations marked when enqueued) against
+the old search that queued whole path lists and marked stations only when
+dequeued, on synthetic transit networks.
+
+Run from anywhere:  python benchmarks/bfs_benchmark.py [max_stations]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from station_lines_graph import bfs_shortest_path
+from transit_graphs import synthetic_transit
+
+QUERIES = 20
+
+
+def path_list_bfs(graph, start, goal):
+    """The previous implementation, kept here for comparison."""
+    visited = set()
+    queue = deque([[start]])
+    while queue:
+        path = queue.popleft()
+        station = path[-1]
+        if station == goal:
+            return path
+        if station not in visited:
+            visited.add(station)
+            for neighbor in graph.vertices[station]:
+                queue.append(path + [neighbor])
+    return None
+
+
+def run(search, graph, pairs):
+    """(ms per query, peak traced KiB over all queries)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    for a, b in pairs:
+        search(graph, a, b)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds * 1000 / len(pairs), peak / 1024
+
+
+def main():
+    max_stations = int(sys.argv[1]) if len(sys.argv) > 1 else 10**5
+    sizes = [n for n in (10**3, 10**4, 10**5) if n <= max_stations]
+
+    print(f"{QUERIES} random origin/destination pairs per network (timed under tracemalloc)")
+    print(f"{'stations':>9}{'edges':>9}{'old ms':>10}{'old KiB':>10}{'new ms':>10}{'new KiB':>10}")
+    for n in sizes:
+        graph, names = synthetic_transit(n, seed=n)
+        edges = sum(len(targets) for targets in graph.vertices.values())
+        rng = random.Random(n)
+        pairs = [(rng.choice(names), rng.choice(names)) for _ in range(QUERIES)]
+        for a, b in pairs[:3]:
+            assert bfs_shortest_path(graph, a, b) == path_list_bfs(graph, a, b)
+        old_ms, old_kib = run(path_list_bfs, graph, pairs)
+        new_ms, new_kib = run(bfs_shortest_path, graph, pairs)
+        print(f"{n:>9}{edges:>9}{old_ms:>10.2f}{old_kib:>10.0f}{new_ms:>10.2f}{new_kib:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+One-sided against bidirectional search on synthetic metro-scale transit
+networks (unit travel time per edge) and a weighted street grid: stations
+explored and latency per query, for BFS and Dijkstra.
+
+Run from anywhere:  python benchmarks/bidirectional_benchmark.py [max_stations]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from station_lines_graph import bfs_shortest_path, dijkstra_shortest_path
+from transit_graphs import synthetic_grid, synthetic_transit
+
+QUERIES = 50
+
+
+def measure(search, graph, pairs, **kwargs):
+    """(mean stations explored, mean ms per query)."""
+    stats = {}
+    explored = 0
+    start = time.perf_counter()
+    for a, b in pairs:
+        search(graph, a, b, stats, **kwargs)
+        explored += stats["expanded"]
+    seconds = time.perf_counter() - start
+    return explored / len(pairs), seconds * 1000 / len(pairs)
+
+
+def main():
+    max_stations = int(sys.argv[1]) if len(sys.argv) > 1 else 10**5
+    networks = [(f"metro {n}", synthetic_transit(n, seed=n)) for n in (10**3, 10**4, 10**5) if n <= max_stations]
+    networks.append(("grid 316x316", synthetic_grid(316, seed=23)))
+
+    print(f"{QUERIES} random origin/destination pairs per network")
+    print(f"{'network':>14}{'search':>10}{'explored':>11}{'ms':>9}{'bi explored':>13}{'bi ms':>9}")
+    for label, (graph, names) in networks:
+        graph.freeze().reverse()        # one-off build, not part of the per-query latency
+        rng = random.Random(23)
+        pairs = [(rng.choice(names), rng.choice(names)) for _ in range(QUERIES)]
+        for a, b in pairs[:5]:
+            assert bfs_shortest_path(graph, a, b) == bfs_shortest_path(graph, a, b, bidirectional=True)
+            one, two = dijkstra_shortest_path(graph, a, b), dijkstra_shortest_path(graph, a, b, bidirectional=True)
+            assert abs(one[1] - two[1]) < 1e-9
+        for name, search in (("bfs", bfs_shortest_path), ("dijkstra", dijkstra_shortest_path)):
+            explored, ms = measure(search, graph, pairs)
+            bi_explored, bi_ms = measure(search, graph, pairs, bidirectional=True)
+            print(f"{label:>14}{name:>10}{explored:>11.0f}{ms:>9.2f}{bi_explored:>13.0f}{bi_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compare the plain BST against the AVL-balanced mode on sorted,
+reverse-sorted and random insert streams.
+
+Run from anywhere:  python benchmarks/bst_benchmark.py [n]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bst import BST
+
+
+def tree_height(node):
+    height = 0
+    stack = [(node, 1)] if node else []
+    while stack:
+        current, depth = stack.pop()
+        height = max(height, depth)
+        if current.left:
+            stack.append((current.left, depth + 1))
+        if current.right:
+            stack.append((current.right, depth + 1))
+    return height
+
+
+def run(values, balance):
+    tree = BST(balance=balance)
+
+    start = time.perf_counter()
+    for v in values:
+        tree.insert(v)
+    insert_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for v in values:
+        tree.search(tree.root, v)
+    search_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for v in values:
+        tree.root = tree.delete_node(tree.root, v)
+    delete_time = time.perf_counter() - start
+
+    tree = BST(balance=balance)
+    for v in values:
+        tree.insert(v)
+    return insert_time, search_time, delete_time, tree_height(tree.root)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    streams = {
+        "sorted": list(range(n)),
+        "reverse": list(range(n, 0, -1)),
+        "random": random.Random(42).sample(range(n * 10), n),
+    }
+
+    print(f"n = {n}")
+    print(f"{'stream':<10}{'mode':<8}{'insert s':>12}{'search s':>12}{'delete s':>12}{'height':>8}")
+    for name, values in streams.items():
+        for balance in (None, "avl"):
+            insert_time, search_time, delete_time, height = run(values, balance)
+            print(f"{name:<10}{balance or 'plain':<8}{insert_time:>12.4f}{search_time:>12.4f}{delete_time:>12.4f}{height:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Cost of BST.layout on a 50k-node tree: a cold full layout, a repeat call with
+no edits, and a call right after a single insert/delete (patched layout).
+
+Run from anywhere:  python benchmarks/bst_layout_benchmark.py [n]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bst import BST
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rng = random.Random(7)
+    values = rng.sample(range(n * 10), n)
+
+    print(f"n = {n}")
+    for balance in (None, "avl"):
+        tree = BST(balance=balance)
+        for v in values:
+            tree.insert(v)
+
+        cold = timed(tree.layout)
+        cached = timed(tree.layout)
+
+        extra = rng.randrange(n * 10)
+        after_insert = timed(lambda: (tree.insert(extra), tree.layout()))
+        after_delete = timed(lambda: (tree.delete_node(tree.root, extra), tree.layout()))
+
+        print(f"{balance or 'plain':<6} cold {cold * 1000:8.2f} ms | cached {cached * 1000:8.3f} ms"
+              f" | insert+layout {after_insert * 1000:8.2f} ms | delete+layout {after_delete * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
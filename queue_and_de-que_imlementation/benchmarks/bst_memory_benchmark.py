@@ -0,0 +1,75 @@
+"""
+Memory held by a 1M-key tree, measured with tracemalloc:
+  - the old Node layout (per-instance __dict__ with the layout scratch attributes)
+  - BST with __slots__ nodes
+  - ArrayBST (keys and child indices in array('q') buffers)
+
+Run from anywhere:  python benchmarks/bst_memory_benchmark.py [n]
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bst import BST, ArrayBST
+
+
+class DictNode:
+    """Same attributes the old bst.Node ended up with after layout()."""
+
+    def __init__(self, value):
+        self.value = value
+        self.left = None
+        self.right = None
+        self._x = None
+        self._y = None
+        self._id = None
+        self._temp_x_index = None
+        self._temp_depth = None
+
+
+def build_dict_nodes(n):
+    nodes = [DictNode(v) for v in range(n)]
+    stack = [(0, n)]
+    while stack:
+        lo, hi = stack.pop()
+        mid = (lo + hi) // 2
+        if lo < mid:
+            nodes[mid].left = nodes[(lo + mid) // 2]
+            stack.append((lo, mid))
+        if mid + 1 < hi:
+            nodes[mid].right = nodes[(mid + 1 + hi) // 2]
+            stack.append((mid + 1, hi))
+    return nodes[n // 2]
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    tree = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tree
+    return current, peak
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    keys = range(n)
+    modes = {
+        "dict nodes (old)": lambda: build_dict_nodes(n),
+        "BST __slots__": lambda: BST.from_iterable(keys, presorted=True),
+        "ArrayBST": lambda: ArrayBST.from_iterable(keys, presorted=True),
+    }
+
+    print(f"n = {n}")
+    print(f"{'mode':<20}{'current MiB':>14}{'peak MiB':>12}{'bytes/key':>12}")
+    for name, build in modes.items():
+        current, peak = measure(build)
+        print(f"{name:<20}{current / 2**20:>14.1f}{peak / 2**20:>12.1f}{current / n:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Render time of the binary tree page's SVG at 1k, 10k and 100k nodes.
+
+"template lookup" replays what binary_tree.html used to do: for every edge,
+scan the node list twice to find both endpoints (O(N*E)). It is only run
+where it finishes in reasonable time.
+
+Run from anywhere:  python benchmarks/bst_render_benchmark.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bst import BST
+
+SIZES = (1000, 10000, 100000)
+TEMPLATE_LOOKUP_LIMIT = 2000
+
+
+def template_lookup(nodes, edges, r):
+    """The old per-edge selectattr scan, minus Jinja's own overhead."""
+    lines = []
+    for e in edges:
+        parent = [n for n in nodes if n["id"] == e["from"]][0]
+        child = [n for n in nodes if n["id"] == e["to"]][0]
+        lines.append((parent["x"] + r, parent["y"] + r, child["x"] + r, child["y"] + r))
+    return lines
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'nodes':>8}{'layout ms':>12}{'render_svg ms':>15}{'svg KiB':>10}{'template lookup ms':>20}")
+    for n in SIZES:
+        tree = BST(balance="avl")
+        for v in random.Random(n).sample(range(n * 10), n):
+            tree.insert(v)
+
+        layout_time = timed(tree.layout)
+        svg_time = timed(tree.render_svg)
+        svg_kib = len(tree.render_svg()) / 1024
+
+        if n <= TEMPLATE_LOOKUP_LIMIT:
+            nodes, edges, info = tree.layout()
+            lookup = f"{timed(lambda: template_lookup(nodes, edges, info['node_radius'])) * 1000:.1f}"
+        else:
+            lookup = "skipped"
+
+        print(f"{n:>8}{layout_time * 1000:>12.1f}{svg_time * 1000:>15.1f}{svg_kib:>10.0f}{lookup:>20}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Per-operation timings of the iterative BST engine against the old recursive
+implementation on degenerate (linked-list shaped) trees of depth 10, 1,000
+and 100,000.
+
+Run from anywhere:  python benchmarks/bst_traversal_benchmark.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bst import BST, Node
+
+DEPTHS = (10, 1000, 100000)
+sys.setrecursionlimit(10000)
+
+
+# -------------------------
+# The previous recursive implementation, kept here as the baseline
+# -------------------------
+def recursive_insert(node, value):
+    if value < node.value:
+        if node.left is None:
+            node.left = Node(value)
+        else:
+            recursive_insert(node.left, value)
+    else:
+        if node.right is None:
+            node.right = Node(value)
+        else:
+            recursive_insert(node.right, value)
+
+
+def recursive_search(root, key):
+    if root is None:
+        return None
+    if root.value == key:
+        return root
+    elif key < root.value:
+        return recursive_search(root.left, key)
+    else:
+        return recursive_search(root.right, key)
+
+
+def recursive_post_traversal(start, traversal):
+    if start:
+        recursive_post_traversal(start.left, traversal)
+        recursive_post_traversal(start.right, traversal)
+        traversal.append(start.value)
+    return traversal
+
+
+def recursive_delete(root, key):
+    if root is None:
+        return root
+    if key < root.value:
+        root.left = recursive_delete(root.left, key)
+    elif key > root.value:
+        root.right = recursive_delete(root.right, key)
+    else:
+        if root.left is None:
+            return root.right
+        elif root.right is None:
+            return root.left
+        successor = root.right
+        while successor.left:
+            successor = successor.left
+        root.value = successor.value
+        root.right = recursive_delete(root.right, successor.value)
+    return root
+
+
+def build_chain(depth):
+    """A right-leaning chain 0 -> 1 -> ... -> depth-1, built without walking it."""
+    tree = BST()
+    tree.root = node = Node(0)
+    for value in range(1, depth):
+        node.right = Node(value)
+        node = node.right
+    return tree
+
+
+def per_op(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def measure(depth, recursive):
+    tree = build_chain(depth)
+    deepest = depth - 1
+    repeat = max(1, 20000 // depth)
+
+    if recursive:
+        ops = {
+            "search": lambda: recursive_search(tree.root, deepest),
+            "insert": lambda: recursive_insert(tree.root, depth),
+            "delete": lambda: recursive_delete(tree.root, depth),
+            "post_traversal": lambda: recursive_post_traversal(tree.root, []),
+        }
+    else:
+        ops = {
+            "search": lambda: tree.search(tree.root, deepest),
+            "insert": lambda: tree.insert(depth),
+            "delete": lambda: tree.delete_node(tree.root, depth),
+            "post_traversal": lambda: tree.post_traversal(tree.root, []),
+        }
+
+    results = {}
+    for name in ("search", "post_traversal"):
+        try:
+            results[name] = per_op(ops[name], repeat)
+        except RecursionError:
+            results[name] = None
+    # insert and delete alternate so the tree keeps its depth
+    try:
+        insert_total = delete_total = 0.0
+        for _ in range(repeat):
+            insert_total += per_op(ops["insert"], 1)
+            delete_total += per_op(ops["delete"], 1)
+        results["insert"] = insert_total / repeat
+        results["delete"] = delete_total / repeat
+    except RecursionError:
+        results["insert"] = results["delete"] = None
+    return results
+
+
+def fmt(seconds):
+    return "RecursionError" if seconds is None else f"{seconds * 1e6:.1f} us"
+
+
+def main():
+    print(f"{'depth':>8}  {'operation':<16}{'recursive':>16}{'iterative':>16}{'speedup':>10}")
+    for depth in DEPTHS:
+        old = measure(depth, recursive=True)
+        new = measure(depth, recursive=False)
+        for name in ("search", "insert", "delete", "post_traversal"):
+            speedup = f"{old[name] / new[name]:.2f}x" if old[name] is not None else "-"
+            print(f"{depth:>8}  {name:<16}{fmt(old[name]):>16}{fmt(new[name]):>16}{speedup:>10}")
+
+
+if __name__ == "__main__":
+    main()
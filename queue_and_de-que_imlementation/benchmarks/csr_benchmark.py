@@ -0,0 +1,82 @@
+"""
+Graph (dict of per-station lists keyed by name) against its frozen CSR form
+(FrozenGraph: interned station ints, array offsets/targets): memory of the
+adjacency and full-network BFS throughput, on synthetic transit networks of
+up to ~1e6 edges.
+
+Run from anywhere:  python benchmarks/csr_benchmark.py [max_stations]
+"""
+import os
+import random
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from station_lines_graph import bfs_parents
+from transit_graphs import synthetic_transit
+
+SOURCES = 5
+
+
+def dict_bfs_parents(graph, start):
+    """The previous name-keyed BFS, kept here for comparison."""
+    parents = {start: None}
+    queue = deque([start])
+    while queue:
+        station = queue.popleft()
+        for neighbor in graph.vertices[station]:
+            if neighbor not in parents:
+                parents[neighbor] = station
+                queue.append(neighbor)
+    return parents
+
+
+def dict_bytes(graph):
+    """Containers of the per-station adjacency (station name strings are shared, so not counted)."""
+    total = sys.getsizeof(graph.vertices) + sys.getsizeof(graph.weights) + sys.getsizeof(graph.lines)
+    for station in graph.vertices:
+        total += sys.getsizeof(graph.vertices[station]) + sys.getsizeof(graph.weights[station])
+        total += sys.getsizeof(graph.lines[station])
+    return total
+
+
+def frozen_bytes(frozen):
+    return frozen.nbytes() + sys.getsizeof(frozen.index) + sys.getsizeof(frozen.names)
+
+
+def edges_per_second(search, sources, edges):
+    start = time.perf_counter()
+    for source in sources:
+        search(source)
+    return edges * len(sources) / (time.perf_counter() - start)
+
+
+def main():
+    max_stations = int(sys.argv[1]) if len(sys.argv) > 1 else 465000
+    sizes = [n for n in (4650, 46500, 465000) if n <= max_stations]
+
+    print(f"full BFS from {SOURCES} random stations; throughput in million edges scanned per second")
+    print(f"{'stations':>9}{'edges':>9}{'dict MiB':>10}{'csr MiB':>9}{'freeze s':>10}"
+          f"{'dict':>8}{'csr ints':>10}{'csr names':>11}")
+    for n in sizes:
+        graph, names = synthetic_transit(n, seed=n)
+        edges = sum(len(targets) for targets in graph.vertices.values())
+        start = time.perf_counter()
+        frozen = graph.freeze()
+        freeze_seconds = time.perf_counter() - start
+        sources = random.Random(n).sample(names, SOURCES)
+        assert bfs_parents(graph, sources[0]) == dict_bfs_parents(graph, sources[0])
+
+        rates = [
+            edges_per_second(lambda s: dict_bfs_parents(graph, s), sources, edges),
+            edges_per_second(lambda s: frozen.bfs(frozen.index[s]), sources, frozen.edge_count()),
+            edges_per_second(lambda s: bfs_parents(graph, s), sources, frozen.edge_count()),
+        ]
+        print(f"{n:>9}{edges:>9}{dict_bytes(graph) / 2**20:>10.1f}{frozen_bytes(frozen) / 2**20:>9.1f}"
+              f"{freeze_seconds:>10.2f}" + "".join(f"{rate / 1e6:>{w}.2f}" for rate, w in zip(rates, (8, 10, 11))))
+
+
+if __name__ == "__main__":
+    main()
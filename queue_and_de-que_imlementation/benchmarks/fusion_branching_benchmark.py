@@ -0,0 +1,53 @@
+"""
+Sweep FusionTree branching factors: insert/search/delete throughput and the
+resulting tree height for the same random key set.
+
+Run from anywhere:  python benchmarks/fusion_branching_benchmark.py [n]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fusion_tree import B, FusionTree
+
+BRANCHINGS = (B, 16, 64, 256)
+
+
+def height(tree):
+    levels = 1
+    node = tree.root
+    while not node.leaf:
+        node = node.children[0]
+        levels += 1
+    return levels
+
+
+def throughput(fn, keys):
+    start = time.perf_counter()
+    for k in keys:
+        fn(k)
+    return len(keys) / (time.perf_counter() - start)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(3)
+    keys = rng.sample(range(1 << 40), n)
+    lookups = rng.sample(keys, len(keys))
+
+    print(f"n = {n}, operations per second")
+    print(f"{'branching':>10}{'max keys':>10}{'insert':>12}{'search':>12}{'delete':>12}{'height':>8}")
+    for branching in BRANCHINGS:
+        tree = FusionTree(branching=branching)
+        inserts = throughput(tree.insert, keys)
+        tree_height = height(tree)
+        searches = throughput(tree.search, lookups)
+        deletes = throughput(tree.delete, lookups)
+        print(f"{branching:>10}{tree.max_keys:>10}{inserts:>12.0f}{searches:>12.0f}{deletes:>12.0f}{tree_height:>8}")
+
+
+if __name__ == "__main__":
+    main()
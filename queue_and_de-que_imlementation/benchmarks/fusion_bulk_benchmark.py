@@ -0,0 +1,64 @@
+"""
+FusionTree.bulk_load and delete_many against the per-key insert/delete loops.
+
+Run from anywhere:  python benchmarks/fusion_bulk_benchmark.py [max_n]
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fusion_tree import FusionTree
+
+BRANCHING = 16
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def per_key_insert(keys):
+    tree = FusionTree(branching=BRANCHING)
+    for k in keys:
+        tree.insert(k)
+    return tree
+
+
+def per_key_delete(tree, keys):
+    # delete() reports misses on stdout; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for k in keys:
+            tree.delete(k)
+
+
+def main():
+    max_n = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+    sizes = [n for n in (10**4, 10**5, 10**6) if n <= max_n]
+
+    print(f"branching = {BRANCHING}, seconds")
+    print(f"{'n':>9}{'insert loop':>14}{'bulk_load':>12}{'delete loop':>14}{'delete_many':>14}")
+    for n in sizes:
+        rng = random.Random(n)
+        keys = sorted(rng.sample(range(1 << 40), n))
+        # delete half the keys plus the same number of misses
+        batch = rng.sample(keys, n // 2) + [rng.randrange(1 << 40) for _ in range(n // 2)]
+
+        insert_loop = timed(lambda: per_key_insert(keys))
+        bulk = timed(lambda: FusionTree.bulk_load(keys, branching=BRANCHING))
+
+        tree = FusionTree.bulk_load(keys, branching=BRANCHING)
+        delete_loop = timed(lambda: per_key_delete(tree, batch))
+        tree = FusionTree.bulk_load(keys, branching=BRANCHING)
+        delete_many = timed(lambda: tree.delete_many(batch))
+
+        print(f"{n:>9}{insert_loop:>14.3f}{bulk:>12.3f}{delete_loop:>14.3f}{delete_many:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+FusionNode storage: allocations held by a built tree (tracemalloc) and
+throughput of an insert/delete churn on a live tree.
+
+Run from anywhere:  python benchmarks/fusion_node_benchmark.py [ops]
+"""
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fusion_tree import FusionTree
+
+BRANCHINGS = (4, 16, 64)
+TREE_SIZE = 10**5
+
+
+def measure_build(keys, branching):
+    """Bytes and allocated blocks still held once the tree is built by inserts."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tree = FusionTree(branching=branching)
+    for k in keys:
+        tree.insert(k)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    diff = after.compare_to(before, "filename")
+    return sum(d.size_diff for d in diff), sum(d.count_diff for d in diff)
+
+
+def churn_ops(keys, ops, rng):
+    """ops (is_insert, key) pairs; every delete targets a key that is present."""
+    live = list(keys)
+    present = set(live)
+    sequence = []
+    for _ in range(ops):
+        if rng.random() < 0.5 or not live:
+            key = rng.randrange(1 << 40)
+            while key in present:
+                key = rng.randrange(1 << 40)
+            live.append(key)
+            present.add(key)
+            sequence.append((True, key))
+        else:
+            i = rng.randrange(len(live))
+            live[i], live[-1] = live[-1], live[i]
+            key = live.pop()
+            present.discard(key)
+            sequence.append((False, key))
+    return sequence
+
+
+def run_churn(tree, sequence):
+    insert = tree.insert
+    delete = tree.delete
+    start = time.perf_counter()
+    for is_insert, key in sequence:
+        if is_insert:
+            insert(key)
+        else:
+            delete(key)
+    return time.perf_counter() - start
+
+
+def main():
+    ops = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+    rng = random.Random(13)
+    keys = rng.sample(range(1 << 40), TREE_SIZE)
+    sequence = churn_ops(keys, ops, rng)
+
+    print(f"tree of {TREE_SIZE} keys built by insert; churn of {ops} insert/delete ops")
+    print(f"{'B':>5}{'held KiB':>12}{'blocks':>10}{'churn s':>10}{'ops/s':>12}")
+    for branching in BRANCHINGS:
+        size, blocks = measure_build(keys, branching)
+        tree = FusionTree(branching=branching)
+        for k in keys:
+            tree.insert(k)
+        seconds = run_churn(tree, sequence)
+        print(f"{branching:>5}{size / 1024:>12.0f}{blocks:>10}{seconds:>10.2f}{ops / seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
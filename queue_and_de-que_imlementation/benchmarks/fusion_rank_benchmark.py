@@ -0,0 +1,69 @@
+"""
+In-node rank lookup: the packed-word FusionTree._find_rank_in_node against
+bisect.bisect_right on the same keys, plus the old implementation that
+rebuilt the packed word and masks with Python loops on every call.
+
+Run from anywhere:  python benchmarks/fusion_rank_benchmark.py [queries]
+"""
+import os
+import random
+import sys
+import time
+from bisect import bisect_right
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fusion_tree import B, W, FusionTree
+
+
+def old_find_rank_in_node(key, node):
+    """The previous per-call packing (kept for comparison only)."""
+    if node.n > B:
+        return sum(1 for k in node.keys if k <= key)
+    if node.n == 0:
+        return 0
+    bits_per_key = W // B
+    packed_keys = 0
+    for i in range(node.n):
+        packed_keys |= node.keys[i] << (i * bits_per_key)
+    query_mask = 0
+    for i in range(B):
+        query_mask |= key << (i * bits_per_key)
+    high_bits_mask = 0
+    for i in range(B):
+        high_bits_mask |= 1 << ((i * bits_per_key) + bits_per_key - 1)
+    diff = query_mask - packed_keys
+    borrows = diff & high_bits_mask
+    return node.n - bin(borrows).count('1')
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1e9
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    rng = random.Random(1)
+    queries = [rng.randrange(1 << 30) for _ in range(count)]
+
+    print(f"{count} queries, ns per lookup")
+    print(f"{'branching':>10}{'keys':>6}{'packed rank':>14}{'bisect_right':>14}{'old per-call':>14}")
+    for branching in (B, 16, 64, 256):
+        tree = FusionTree(branching=branching)
+        node = tree._new_node()
+        for i, key in enumerate(sorted(rng.sample(range(1 << 30), tree.max_keys))):
+            node.insert_key(i, key, tree._field_bits)
+        keys = node.keys
+
+        packed = timed(lambda q: tree._find_rank_in_node(q, node), queries)
+        bisected = timed(lambda q: bisect_right(keys, q), queries)
+        # the old code only packed nodes of up to B keys
+        old = f"{timed(lambda q: old_find_rank_in_node(q, node), queries):14.1f}" if branching == B else f"{'-':>14}"
+        print(f"{branching:>10}{node.n:>6}{packed:>14.1f}{bisected:>14.1f}{old}")
+
+
+if __name__ == "__main__":
+    main()
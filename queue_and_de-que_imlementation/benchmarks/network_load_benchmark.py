@@ -0,0 +1,75 @@
+"""
+Network file loading: streaming parse of a ~1e5-stop network from CSV and
+JSON Lines, the first load (parse + write the binary cache), and later
+loads served from the cache next to the file.
+
+Run from anywhere:  python benchmarks/network_load_benchmark.py [stops]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network_loader import CACHE_SUFFIX, FIELDS, load_network, parse_network
+
+LINE_LENGTH = 40
+TRANSFERS_PER_LINE = 3
+
+
+def synthetic_records(stops, seed=0):
+    """Station, segment and transfer records (FIELDS order) of a metro-like network."""
+    rng = random.Random(seed)
+    names = [f"S{i}" for i in range(stops)]
+    for i, name in enumerate(names):
+        yield ("station", name, "", "", "", f"{i % 1000 * 10}", f"{i // 1000 * 10}")
+    for line_start in range(0, stops, LINE_LENGTH):
+        line = names[line_start:line_start + LINE_LENGTH]
+        label = f"L{line_start // LINE_LENGTH}"
+        for a, b in zip(line, line[1:]):
+            yield ("segment", a, b, f"{rng.uniform(1.5, 4):.1f}", label, "", "")
+        for _ in range(TRANSFERS_PER_LINE if line_start else 0):
+            yield ("transfer", rng.choice(line), rng.choice(names[:line_start]), f"{rng.randint(3, 15)}", "", "", "")
+
+
+def write_csv(path, stops):
+    with open(path, "w") as f:
+        f.write(",".join(FIELDS) + "\n")
+        for record in synthetic_records(stops):
+            f.write(",".join(record) + "\n")
+
+
+def write_jsonl(path, stops):
+    with open(path, "w") as f:
+        for record in synthetic_records(stops):
+            f.write(json.dumps({field: value for field, value in zip(FIELDS, record) if value}) + "\n")
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    stops = int(sys.argv[1]) if len(sys.argv) > 1 else 10**5
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{stops} stops; seconds per load")
+        print(f"{'file':>8}{'MiB':>7}{'cache MiB':>11}{'parse only':>12}{'first load':>12}{'cached load':>13}")
+        for label, writer in (("csv", write_csv), ("jsonl", write_jsonl)):
+            path = os.path.join(tmp, f"network.{label}")
+            writer(path, stops)
+            parsed, parse_s = timed(parse_network, path)
+            _, first_s = timed(load_network, path)
+            cached, cached_s = timed(load_network, path)
+            assert cached.vertices == parsed.vertices and cached.weights == parsed.weights
+            print(f"{label:>8}{os.path.getsize(path) / 2**20:>7.1f}"
+                  f"{os.path.getsize(path + CACHE_SUFFIX) / 2**20:>11.1f}"
+                  f"{parse_s:>12.2f}{first_s:>12.2f}{cached_s:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Origin/destination throughput: one search per pair against batch_routes,
+which groups pairs by origin and reads every destination off one search
+tree, by travel time and by hops. Also Yen k-shortest-paths queries/s.
+
+Run from anywhere:  python benchmarks/od_batch_benchmark.py [stations]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from station_lines_graph import batch_routes, bfs_shortest_path, dijkstra_shortest_path, k_shortest_paths
+from network_loader import METRO_MANILA_RAIL, load_network
+from transit_graphs import synthetic_transit
+
+ORIGINS = 100
+DESTINATIONS_PER_ORIGIN = 100
+SINGLE_SAMPLE = 500     # per-pair searches are timed on a sample of the batch
+K = 3
+
+
+def pairs_per_second(fn, pairs):
+    start = time.perf_counter()
+    fn(pairs)
+    return len(pairs) / (time.perf_counter() - start)
+
+
+def one_by_one(search):
+    return lambda pairs: [search(a, b) for a, b in pairs]
+
+
+def main():
+    stations_graph = load_network(METRO_MANILA_RAIL)
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10**4
+    stations = list(stations_graph.vertices)
+    real_pairs = [(a, b) for a in stations for b in stations]
+    graph, names = synthetic_transit(n, seed=24)
+    rng = random.Random(24)
+    synthetic_pairs = [(a, rng.choice(names)) for a in rng.sample(names, ORIGINS) for _ in range(DESTINATIONS_PER_ORIGIN)]
+    rng.shuffle(synthetic_pairs)
+
+    print(f"{'network':>16}{'pairs':>8}{'by':>6}{'single pairs/s':>16}{'batch pairs/s':>15}")
+    for label, g, pairs in (("real (45)", stations_graph, real_pairs), (f"metro {n}", graph, synthetic_pairs)):
+        g.freeze()
+        for by, weighted, search in (("time", True, dijkstra_shortest_path), ("hops", False, bfs_shortest_path)):
+            single = pairs_per_second(one_by_one(lambda a, b: search(g, a, b)), pairs[:SINGLE_SAMPLE])
+            batch = pairs_per_second(lambda p: batch_routes(g, p, weighted), pairs)
+            print(f"{label:>16}{len(pairs):>8}{by:>6}{single:>16,.0f}{batch:>15,.0f}")
+
+    sample = random.Random(3).sample(real_pairs, 300)
+    start = time.perf_counter()
+    alternatives = sum(len(k_shortest_paths(stations_graph, a, b, K)) for a, b in sample)
+    seconds = time.perf_counter() - start
+    print(f"\nk_shortest_paths (k={K}) on the real network: {len(sample) / seconds:,.0f} queries/s, "
+          f"{alternatives / len(sample):.2f} alternatives per query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Reservation book query latency with many bookings on the books: conflict
+checks (reserve), available_slots over a three-hour window, next_free_slot,
+and seating a walk-in around reservations, next to a conflict check that
+scans every booking.
+
+Run from anywhere:  python benchmarks/reservation_benchmark.py [bookings]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from restaurant import Restaurant
+
+TABLES = {2: 10, 4: 10, 6: 5, 8: 5}
+QUERIES = 2000
+
+
+def fill(restaurant, bookings, rng):
+    """Reserve random evening slots until `bookings` of them have been accepted."""
+    horizon = bookings * 90 // sum(TABLES.values()) * 2
+    booked = []
+    while len(booked) < bookings:
+        start = rng.randrange(horizon)
+        duration = rng.randint(60, 120)
+        size = rng.randint(1, 8)
+        table_id = restaurant.reserve(f"r{len(booked)}", size, start, duration)
+        if table_id is not None:
+            booked.append((table_id, start, start + duration))
+    return booked, horizon
+
+
+def latency(fn, args_list):
+    """(p50, p99) in microseconds of fn(*args) over args_list."""
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return samples[len(samples) // 2], samples[len(samples) * 99 // 100]
+
+
+def scan_conflict(booked, table_id, start, end):
+    return any(t == table_id and s < end and start < e for t, s, e in booked)
+
+
+def main():
+    bookings = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(18)
+    restaurant = Restaurant(tables=TABLES)
+    begin = time.perf_counter()
+    booked, horizon = fill(restaurant, bookings, rng)
+    print(f"{bookings} bookings on {sum(TABLES.values())} tables, filled in {time.perf_counter() - begin:.2f}s")
+
+    slots = [(rng.randrange(horizon), rng.randint(60, 120), rng.randint(1, 8)) for _ in range(QUERIES)]
+    # the per-table overlap check that reserve() runs for each candidate table
+    table_ids = list(restaurant.table_capacity)
+    checks = [(restaurant.schedules[rng.choice(table_ids)], s, s + d) for s, d, _ in slots]
+
+    print(f"{'query':>28}{'p50 us':>10}{'p99 us':>10}")
+    rows = [
+        ("conflict check", latency(lambda sch, s, e: sch.is_free(s, e), checks)),
+        ("conflict check (scan)", latency(lambda sch, s, e: scan_conflict(booked, table_ids[0], s, e),
+                                          checks[:QUERIES // 20])),
+        ("reserve", latency(lambda s, d, size: restaurant.reserve("q", size, s, d), slots)),
+        ("available_slots (3h)", latency(lambda s, d, size: restaurant.available_slots(size, (s, s + 180)), slots)),
+        ("next_free_slot", latency(lambda s, d, size: restaurant.next_free_slot(size, s, d), slots)),
+    ]
+
+    def walk_in(s, d, size):
+        # seat and immediately clear the table again, so every query sees the same book
+        seated = restaurant.process_batch([("arrive", "w", size, s)])
+        if seated:
+            table_id = seated[0][1]
+            restaurant.process_batch([("finish", restaurant.table_capacity[table_id], table_id, s)])
+        else:
+            restaurant.cancel_customer("w")
+
+    rows.append(("walk-in around bookings", latency(walk_in, slots)))
+    for label, (p50, p99) in rows:
+        print(f"{label:>28}{p50:>10.1f}{p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
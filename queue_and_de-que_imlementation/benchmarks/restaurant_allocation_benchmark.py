@@ -0,0 +1,84 @@
+"""
+Best-fit against exact-size table allocation, replaying the same arrival
+trace through both policies: parties served, seat utilization (occupied seats
+over all seats, across the evening) and average wait.
+
+Run from anywhere:  python benchmarks/restaurant_allocation_benchmark.py [arrivals]
+"""
+import heapq
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from restaurant import DEFAULT_TABLES, Restaurant
+
+# party size -> share of arrivals
+PARTY_MIX = {1: 0.10, 2: 0.35, 3: 0.15, 4: 0.20, 5: 0.08, 6: 0.07, 8: 0.05}
+LAYOUTS = {
+    "2/4/8 x3": DEFAULT_TABLES,
+    "2x4 4x4 6x2 8x2": {2: 4, 4: 4, 6: 2, 8: 2},
+}
+
+
+def make_trace(arrivals, rng, per_hour=7):
+    """(arrival_minute, name, party_size, meal_minutes) in arrival order."""
+    sizes = list(PARTY_MIX)
+    weights = list(PARTY_MIX.values())
+    t = 0.0
+    trace = []
+    for i in range(arrivals):
+        t += rng.expovariate(per_hour / 60)
+        trace.append((t, f"party{i}", rng.choices(sizes, weights)[0], rng.uniform(30, 90)))
+    return trace
+
+
+def replay(restaurant, trace):
+    """Feed arrivals and meal ends in time order; returns (served, seat_minutes, waits, end_time)."""
+    info = {name: (arrival, size, meal) for arrival, name, size, meal in trace}
+    departures = []     # (time, capacity, table_id)
+    waits = []
+    seat_minutes = 0.0
+
+    def seated(name, table_id, now):
+        nonlocal seat_minutes
+        arrival, size, meal = info[name]
+        waits.append(now - arrival)
+        seat_minutes += size * meal
+        capacity = restaurant.table_capacity[table_id]
+        heapq.heappush(departures, (now + meal, capacity, table_id))
+
+    now = 0.0
+    for arrival, name, size, meal in trace:
+        while departures and departures[0][0] <= arrival:
+            now, capacity, table_id = heapq.heappop(departures)
+            for seated_name, seated_table in restaurant.process_batch([("finish", capacity, table_id)]):
+                seated(seated_name, seated_table, now)
+        now = arrival
+        for seated_name, seated_table in restaurant.process_batch([("arrive", name, size)]):
+            seated(seated_name, seated_table, now)
+    while departures:
+        now, capacity, table_id = heapq.heappop(departures)
+        for seated_name, seated_table in restaurant.process_batch([("finish", capacity, table_id)]):
+            seated(seated_name, seated_table, now)
+    return len(waits), seat_minutes, waits, now
+
+
+def main():
+    arrivals = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    trace = make_trace(arrivals, random.Random(16))
+
+    print(f"{arrivals} arrivals at ~7 per hour; wait in minutes")
+    print(f"{'layout':>18}{'policy':>10}{'served':>9}{'utilization':>13}{'avg wait':>10}{'max wait':>10}")
+    for label, tables in LAYOUTS.items():
+        total_seats = sum(size * count for size, count in tables.items())
+        for policy in Restaurant.POLICIES:
+            served, seat_minutes, waits, end = replay(Restaurant(tables=tables, policy=policy), trace)
+            utilization = seat_minutes / (total_seats * end)
+            avg_wait = sum(waits) / served if served else 0.0
+            print(f"{label:>18}{policy:>10}{served:>9}{utilization:>13.1%}{avg_wait:>10.1f}{max(waits, default=0):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Dinner-rush queue handling: the old single waiting list (linear scans in
+finish_meal and cancel_customer) against the per-size deques + name index,
+driven one call at a time and through process_batch. Both seat by exact
+table size, so only the queue handling differs.
+
+Run from anywhere:  python benchmarks/restaurant_queue_benchmark.py [max_waiting]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from restaurant import Restaurant
+
+SIZES = (2, 4, 8)
+
+
+class ListRestaurant(Restaurant):
+    """The old queue: one list of (name, size), scanned on every freed table and cancel."""
+
+    def __init__(self):
+        super().__init__(policy="exact")
+        self.list_queue = []
+
+    def walk_in(self, customer_name, party_size):
+        table_id = self._take_table(party_size)
+        if table_id is None:
+            self.list_queue.append((customer_name, party_size))
+        return table_id
+
+    def finish_meal(self, table_size, table_id):
+        self._release_table(table_size, table_id)
+        for i, (name, size) in enumerate(self.list_queue):
+            if size == table_size:
+                self.list_queue.pop(i)
+                return name, self._take_table(table_size)
+        return None
+
+    def cancel_customer(self, customer_name):
+        for i, (name, size) in enumerate(self.list_queue):
+            if name == customer_name:
+                self.list_queue.pop(i)
+                return True
+        return False
+
+
+def rush_events(waiting, rng):
+    """Fill every table, queue `waiting` parties, then cancel a third and turn over tables."""
+    events = []
+    names = []
+    for i in range(waiting + 9):
+        name = f"guest{i}"
+        names.append(name)
+        events.append(("arrive", name, rng.choice(SIZES)))
+    for name in rng.sample(names[9:], waiting // 3):
+        events.append(("cancel", name))
+    # fewer turnovers than parties left waiting, so a freed table is normally re-seated at once
+    for _ in range(waiting // 2):
+        size = rng.choice(SIZES)
+        events.append(("finish", size, int(f"{size}{rng.randint(1, 3)}")))
+    return events
+
+
+def replay_calls(restaurant, events):
+    for event in events:
+        if event[0] == "arrive":
+            restaurant.walk_in(event[1], event[2])
+        elif event[0] == "finish":
+            restaurant.finish_meal(event[1], event[2])
+        else:
+            restaurant.cancel_customer(event[1])
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    max_waiting = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    sizes = [n for n in (1000, 5000, 20000) if n <= max_waiting]
+
+    print("seconds to replay the whole rush")
+    print(f"{'waiting':>9}{'events':>9}{'list scan':>12}{'deques':>10}{'process_batch':>15}")
+    for waiting in sizes:
+        events = rush_events(waiting, random.Random(waiting))
+        old = timed(lambda: replay_calls(ListRestaurant(), events))
+        new = timed(lambda: replay_calls(Restaurant(policy="exact"), events))
+        batch = timed(lambda: Restaurant(policy="exact").process_batch(events))
+        print(f"{waiting:>9}{len(events):>9}{old:>12.3f}{new:>10.3f}{batch:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Discrete-event restaurant simulation: raw event rate of one long run, then a
+sweep of arrival rates x seating policies spread over a multiprocessing pool.
+
+Run from anywhere:  python benchmarks/restaurant_sim_benchmark.py [hours]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from restaurant_sim import simulate, sweep
+
+ARRIVALS_PER_HOUR = (4, 6, 8, 10, 12)
+
+
+def main():
+    hours = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    start = time.perf_counter()
+    result = simulate(hours=hours, seed=17)
+    seconds = time.perf_counter() - start
+    print(f"one run of {hours} opening hours: {result['events']} events in {seconds:.2f}s "
+          f"({result['events'] / seconds:,.0f} events/s)")
+    print()
+
+    grid = {
+        "interarrival": [("expovariate", rate / 60) for rate in ARRIVALS_PER_HOUR],
+        "policy": ["best_fit", "exact"],
+    }
+    start = time.perf_counter()
+    runs = sweep(grid, hours=hours // 10, seed=17)
+    seconds = time.perf_counter() - start
+    print(f"sweep of {len(runs)} runs x {hours // 10} hours in {seconds:.2f}s; wait in minutes")
+    print(f"{'arrivals/h':>11}{'policy':>10}{'parties/h':>11}{'covers/h':>10}"
+          f"{'p50':>8}{'p95':>8}{'p99':>8}{'max queue':>11}")
+    for config, res in runs:
+        rate = config["interarrival"][1] * 60
+        print(f"{rate:>11.0f}{config['policy']:>10}{res['parties_per_hour']:>11.2f}{res['covers_per_hour']:>10.2f}"
+              f"{res['wait_p50']:>8.1f}{res['wait_p95']:>8.1f}{res['wait_p99']:>8.1f}{res['max_queue']:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Train-stations route latency: bfs_shortest_path from scratch on every query
+against the memoized route table (Graph.route), over every origin/destination
+pair of the real network. Only the route lookup is timed, not Flask.
+
+Run from anywhere:  python benchmarks/route_table_benchmark.py [rounds]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from station_lines_graph import bfs_shortest_path
+from network_loader import METRO_MANILA_RAIL, load_network
+
+
+def latencies(fn, pairs):
+    samples = []
+    for start, goal in pairs:
+        t = time.perf_counter()
+        fn(start, goal)
+        samples.append((time.perf_counter() - t) * 1e6)
+    samples.sort()
+    return samples[len(samples) // 2], samples[len(samples) * 99 // 100]
+
+
+def main():
+    stations_graph = load_network(METRO_MANILA_RAIL)
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    stations = list(stations_graph.vertices)
+    pairs = [(a, b) for a in stations for b in stations] * rounds
+    random.Random(19).shuffle(pairs)
+
+    stations_graph.invalidate_routes()
+    t = time.perf_counter()
+    stations_graph.precompute_routes()
+    build_ms = (time.perf_counter() - t) * 1000
+
+    print(f"{len(stations)} stations, {len(pairs)} queries; route table built in {build_ms:.2f} ms")
+    print(f"{'planner':>28}{'p50 us':>10}{'p99 us':>10}")
+    rows = [("bfs_shortest_path", latencies(lambda a, b: bfs_shortest_path(stations_graph, a, b), pairs))]
+    stations_graph.invalidate_routes()
+    rows.append(("route, lazily filled", latencies(stations_graph.route, pairs)))
+    rows.append(("route, precomputed", latencies(stations_graph.route, pairs)))
+    for label, (p50, p99) in rows:
+        print(f"{label:>28}{p50:>10.2f}{p99:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
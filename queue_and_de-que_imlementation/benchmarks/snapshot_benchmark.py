@@ -0,0 +1,78 @@
+"""
+Snapshot save/reload for FusionTree and BST against rebuilding by re-inserting
+every key: time to save, to open the mapped snapshot and answer a first
+lookup, and to rebuild the full tree through the bulk loaders.
+
+Run from anywhere:  python benchmarks/snapshot_benchmark.py [max_n]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bst import BST
+from fusion_tree import FusionTree
+
+BRANCHING = 16
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def reinsert_fusion(keys):
+    tree = FusionTree(branching=BRANCHING)
+    for k in keys:
+        tree.insert(k)
+    return tree
+
+
+def reinsert_bst(keys):
+    tree = BST()
+    for k in keys:
+        tree.insert(k)
+    return tree
+
+
+def first_lookup(open_snapshot, path, key):
+    with open_snapshot(path) as snap:
+        return key in snap
+
+
+def bench(name, cls, tree, keys, shuffled, reinsert, path):
+    save, _ = timed(lambda: tree.save(path))
+    size_mb = os.path.getsize(path) / 2**20
+    first, found = timed(lambda: first_lookup(cls.open_snapshot, path, keys[len(keys) // 3]))
+    assert found
+    load, loaded = timed(lambda: cls.load(path))
+    assert len(loaded) == len(keys)
+    rebuild, _ = timed(lambda: reinsert(shuffled))
+    print(f"{name:>6}{len(keys):>9}{size_mb:>9.1f}{save:>9.3f}{first * 1000:>13.3f}{load:>9.3f}{rebuild:>11.3f}")
+
+
+def main():
+    max_n = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+    sizes = [n for n in (10**4, 10**5, 10**6) if n <= max_n]
+
+    print("seconds, except the first lookup after opening the mapped snapshot (ms)")
+    print(f"{'tree':>6}{'n':>9}{'MiB':>9}{'save':>9}{'open+find ms':>13}{'load':>9}{'re-insert':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tree.snapshot")
+        for n in sizes:
+            rng = random.Random(n)
+            keys = sorted(rng.sample(range(1 << 40), n))
+            shuffled = keys[:]
+            rng.shuffle(shuffled)
+            bench("fusion", FusionTree, FusionTree.bulk_load(keys, branching=BRANCHING),
+                  keys, shuffled, reinsert_fusion, path)
+            bench("bst", BST, BST.from_iterable(keys, presorted=True),
+                  keys, shuffled, reinsert_bst, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Synthetic transit networks shared by the graph benchmarks: lines of
+consecutive stations (served in both directions) joined by two-way transfer
+walks, so a big network looks like a metro rather than a random graph.
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from station_lines_graph import TRANSFER_LINE, Graph
+
+
+def synthetic_transit(n_stations, line_length=40, transfers_per_line=3, seed=0, labelled=False):
+    """
+    Graph with stations "S0".."S{n-1}" cut into lines of line_length. Every
+    line gets one transfer to an earlier line, which keeps the network
+    connected, plus transfers_per_line - 1 transfers to random stations.
+    With labelled=True, segments carry their line ("L0", "L1", ...) and take
+    1 to 3 minutes, and transfers are TRANSFER_LINE walks of 2 to 6 minutes,
+    so the weighted searches pay line change penalties.
+    Returns (graph, list of station names).
+    """
+    rng = random.Random(seed)
+    names = [f"S{i}" for i in range(n_stations)]
+    graph = Graph()
+    for name in names:
+        graph.add_vertex(name)
+
+    def connect(a, b, minutes, line):
+        graph.add_edge(a, b, minutes, line)
+        graph.add_edge(b, a, minutes, line)
+
+    for line_start in range(0, n_stations, line_length):
+        line = names[line_start:line_start + line_length]
+        label = f"L{line_start // line_length}" if labelled else None
+        for a, b in zip(line, line[1:]):
+            connect(a, b, rng.uniform(1, 3) if labelled else 1, label)
+        if line_start == 0:
+            continue
+        hops = [rng.randrange(line_start)] + [rng.randrange(n_stations) for _ in range(transfers_per_line - 1)]
+        for other in hops:
+            connect(rng.choice(line), names[other], rng.uniform(2, 6) if labelled else 1,
+                    TRANSFER_LINE if labelled else None)
+    return graph, names
+
+
+def synthetic_grid(side, seed=0):
+    """
+    side x side street grid with unit spacing in graph.coords and two-way
+    edges taking 1 to 2 minutes each, so time_per_distance() is close to 1.
+    Returns (graph, list of station names).
+    """
+    rng = random.Random(seed)
+    names = [f"S{i}" for i in range(side * side)]
+    graph = Graph()
+    for name in names:
+        graph.add_vertex(name)
+    graph.set_coords({names[r * side + c]: (c, r) for r in range(side) for c in range(side)})
+    for r in range(side):
+        for c in range(side):
+            here = names[r * side + c]
+            for there in ([names[r * side + c + 1]] if c + 1 < side else []) + \
+                         ([names[(r + 1) * side + c]] if r + 1 < side else []):
+                minutes = rng.uniform(1, 2)
+                graph.add_edge(here, there, minutes)
+                graph.add_edge(there, here, minutes)
+    return graph, names
@@ -0,0 +1,79 @@
+"""
+BFS against Dijkstra and A* (straight-line heuristic) on the real station
+network and on a synthetic ~1e5-station grid: stations expanded and latency
+per query. For BFS, "expanded" counts the stations it discovered.
+
+Then Dijkstra on a labelled synthetic metro (40-stop lines, transfer walks)
+with and without the line change penalty: latency and the peak memory of one
+query, which tracks how many (station, line) states the search allocates.
+
+Run from anywhere:  python benchmarks/weighted_route_benchmark.py [grid_side] [metro_stations]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from station_lines_graph import astar_shortest_path, bfs_parents, dijkstra_shortest_path
+from network_loader import METRO_MANILA_RAIL, load_network
+from transit_graphs import synthetic_grid, synthetic_transit
+
+GRID_QUERIES = 20
+METRO_QUERIES = 10
+
+
+def bfs_search(graph, start, goal, stats):
+    stats["expanded"] = len(bfs_parents(graph, start, goal))
+
+
+def compare(label, graph, pairs):
+    graph.time_per_distance()      # computed once per graph, keep it out of the timings
+    for name, search in (("bfs", bfs_search), ("dijkstra", dijkstra_shortest_path), ("a*", astar_shortest_path)):
+        expanded = 0
+        stats = {}
+        start = time.perf_counter()
+        for a, b in pairs:
+            search(graph, a, b, stats)
+            expanded += stats["expanded"]
+        seconds = time.perf_counter() - start
+        print(f"{label:>18}{name:>10}{expanded / len(pairs):>12.0f}{seconds * 1e6 / len(pairs):>14.1f}")
+
+
+def main():
+    stations_graph = load_network(METRO_MANILA_RAIL)
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 316
+
+    print(f"{'network':>18}{'search':>10}{'expanded':>12}{'us / query':>14}")
+    stations = list(stations_graph.vertices)
+    compare("real (45)", stations_graph, [(a, b) for a in stations for b in stations])
+
+    graph, names = synthetic_grid(side, seed=21)
+    rng = random.Random(21)
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(GRID_QUERIES)]
+    for a, b in pairs[:3]:
+        assert abs(dijkstra_shortest_path(graph, a, b)[1] - astar_shortest_path(graph, a, b)[1]) < 1e-9
+    compare(f"grid ({side * side})", graph, pairs)
+
+    stations = int(sys.argv[2]) if len(sys.argv) > 2 else 10**5
+    graph, names = synthetic_transit(stations, seed=21, labelled=True)
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(METRO_QUERIES)]
+    print(f"\n{'labelled metro':>18}{'penalty':>10}{'us / query':>14}{'peak MiB':>12}")
+    for penalty in (5, 0):
+        graph.set_line_change_minutes(penalty)
+        graph.freeze()
+        start = time.perf_counter()
+        for a, b in pairs:
+            dijkstra_shortest_path(graph, a, b)
+        seconds = time.perf_counter() - start
+        tracemalloc.start()
+        dijkstra_shortest_path(graph, *pairs[0])
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{stations:>18}{penalty:>10}{seconds * 1e6 / len(pairs):>14.1f}{peak / 2**20:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
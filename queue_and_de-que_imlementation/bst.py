@@ -1,210 +1,760 @@
-
-class Node:
-    def __init__(self, value):
-        self.value = value
-        self.left = None
-        self.right = None
-        # layout properties (filled in by layout())
-        self._x = None
-        self._y = None
-        self._id = None
-
-
-class BST:
-    def __init__(self):
-        self.root = None
-
-    def insert(self, value):
-        """Insert a value into the BST."""
-        if self.root is None:
-            self.root = Node(value)
-        else:
-            self._insert_recursive(self.root, value)
-
-    def _insert_recursive(self, node, value):
-        if value < node.value:
-            if node.left is None:
-                node.left = Node(value)
-            else:
-                self._insert_recursive(node.left, value)
-        else:
-            if node.right is None:
-                node.right = Node(value)
-            else:
-                self._insert_recursive(node.right, value)
-
-    def display(self, node=None, level=0):
-        """Return a text-based rotated tree structure (for debugging)."""
-        if node is None:
-            node = self.root
-        if node is None:
-            return ""
-
-        result = ""
-        if node.right:
-            result += self.display(node.right, level + 1)
-
-        result += "    " * level + f"{node.value}\n"
-
-        if node.left:
-            result += self.display(node.left, level + 1)
-
-        return result
-
-    # -------------------------
-    # SVG layout generation
-    # -------------------------
-    def layout(self, h_spacing=80, v_spacing=90, node_radius=18):
-        """
-        Compute simple layout positions for each node using an inorder x-spacing
-        and depth-based y. Returns:
-          nodes: list of dicts {id, value, x, y}
-          edges: list of dicts {from: parent_id, to: child_id}
-          svg_size: dict {width, height}
-        """
-        if self.root is None:
-            return [], [], {"width": 400, "height": 200, "node_radius": node_radius}
-
-        # assign ids and compute inorder x positions
-        x_counter = {"x": 0}
-        nodes = []
-        edges = []
-
-        def inorder_assign(node, depth):
-            if node is None:
-                return
-            inorder_assign(node.left, depth + 1)
-            # assign id and x/y
-            node._id = len(nodes) + 1  # temporary sequential id (pre-append)
-            node._x = x_counter["x"] * h_spacing
-            node._y = depth * v_spacing
-            nodes.append(node)
-            x_counter["x"] += 1
-            inorder_assign(node.right, depth + 1)
-
-        # But the above appends nodes while visiting; we must ensure left and right edges refer to ids.
-        # A two-pass approach: first compute x positions using a separate traversal that builds order, then assign ids.
-        # We'll do clearer two-pass below.
-
-        # First pass: compute x order count via inorder traversal without storing nodes list
-        x_counter = {"x": 0}
-        max_depth = {"d": 0}
-
-        def inorder_count(node, depth):
-            if node is None:
-                return
-            inorder_count(node.left, depth + 1)
-            # set temporary attributes
-            node._temp_x_index = x_counter["x"]
-            x_counter["x"] += 1
-            if depth > max_depth["d"]:
-                max_depth["d"] = depth
-            node._temp_depth = depth
-            inorder_count(node.right, depth + 1)
-
-        inorder_count(self.root, 0)
-
-        # Second pass: collect nodes in any order but with positions
-        id_counter = {"i": 1}
-        def assign_ids_and_positions(node):
-            if node is None:
-                return
-            # assign for this node
-            node._id = id_counter["i"]
-            id_counter["i"] += 1
-            node._x = node._temp_x_index * h_spacing
-            node._y = node._temp_depth * v_spacing
-            # recurse to assign children
-            if node.left:
-                assign_ids_and_positions(node.left)
-            if node.right:
-                assign_ids_and_positions(node.right)
-
-        assign_ids_and_positions(self.root)
-
-        # Now produce nodes list in order of their _id so stable output
-        def collect_nodes(node, out):
-            if node is None:
-                return
-            out.append({
-                "id": node._id,
-                "value": node.value,
-                "x": node._x,
-                "y": node._y
-            })
-            collect_nodes(node.left, out)
-            collect_nodes(node.right, out)
-
-        nodes_out = []
-        collect_nodes(self.root, nodes_out)
-
-        # Build edges (parent -> child) by walking tree
-        edges_out = []
-        def collect_edges(node):
-            if node is None:
-                return
-            if node.left:
-                edges_out.append({"from": node._id, "to": node.left._id})
-                collect_edges(node.left)
-            if node.right:
-                edges_out.append({"from": node._id, "to": node.right._id})
-                collect_edges(node.right)
-        collect_edges(self.root)
-
-        # compute svg canvas size
-        total_columns = x_counter["x"]
-        width = max(400, total_columns * h_spacing + h_spacing)
-        height = max(200, (max_depth["d"] + 1) * v_spacing + v_spacing)
-
-        return nodes_out, edges_out, {"width": width, "height": height, "node_radius": node_radius}
-    
-    def search(self, root, key):
-        if root is None:
-            return None
-        if root.value == key:
-            return root
-        elif key < root.value:
-            return self.search(root.left, key)
-        else:
-            return self.search(root.right, key)
-        
-    def post_traversal(self, start, traversal):
-        if start:
-            self.post_traversal(start.left, traversal)
-            self.post_traversal(start.right, traversal)
-            traversal.append(start.value)
-        return traversal
-    
-    def delete_node(self, root, key):
-        if root is None:
-            return root
-
-        # Step 1: search for the node
-        if key < root.value:
-            root.left = self.delete_node(root.left, key)
-        elif key > root.value:
-            root.right = self.delete_node(root.right, key)
-        else:
-            # Case A: no child
-            if root.left is None and root.right is None:
-                return None
-
-            # Case B: one child
-            if root.left is None:
-                return root.right
-            elif root.right is None:
-                return root.left
-
-            # Case C: two children → find inorder successor
-            successor = root.right
-            while successor.left:
-                successor = successor.left
-
-            # replace root value with successor value
-            root.value = successor.value
-
-            # delete successor
-            root.right = self.delete_node(root.right, successor.value)
-
-        return root
-
+from array import array
+from bisect import bisect_left
+from heapq import merge
+from html import escape
+
+from snapshot import KeySnapshot, write_keys
+
+
+class Node:
+    # no per-node __dict__; layout data lives in TreeLayout's side arrays
+    __slots__ = ("value", "left", "right", "height", "size", "_id")
+
+    def __init__(self, value):
+        self.value = value
+        self.left = None
+        self.right = None
+        self.height = 1  # used by the AVL mode
+        self.size = 1    # number of nodes in this subtree (order statistics)
+        # layout id (filled in by layout(), stable across later patches)
+        self._id = None
+
+
+class TreeLayout:
+    """
+    Cached layout of a BST. Slot k describes the k-th node in inorder, so the
+    x column of a node is simply its slot. Inserts, deletes and rotations keep
+    the inorder sequence, which means they only ever touch a contiguous run of
+    slots and can be patched without walking the rest of the tree.
+    """
+
+    def __init__(self, root):
+        self.values = []
+        self.depths = []
+        self.ids = []
+        self.parents = []  # parent id per slot, 0 for the root
+        self.next_id = 1
+
+        # single inorder pass; ids are handed out on the way down so children
+        # can record their parent's id before the parent itself is emitted
+        stack = []
+        node, depth, parent_id = root, 0, 0
+        while stack or node is not None:
+            while node is not None:
+                node._id = self.next_id
+                self.next_id += 1
+                stack.append((node, depth, parent_id))
+                parent_id = node._id
+                node = node.left
+                depth += 1
+            node, depth, parent_id = stack.pop()
+            self.values.append(node.value)
+            self.depths.append(depth)
+            self.ids.append(node._id)
+            self.parents.append(parent_id)
+            parent_id = node._id
+            node = node.right
+            depth += 1
+
+    def find(self, node):
+        """Slot of node; values are in inorder so a bisect lands on the run of equal keys."""
+        k = bisect_left(self.values, node.value)
+        while self.ids[k] != node._id:
+            k += 1
+        return k
+
+    def insert_leaf(self, leaf, parent, depth):
+        if parent is None:
+            k, parent_id = 0, 0
+        else:
+            k = self.find(parent) + (0 if parent.left is leaf else 1)
+            parent_id = parent._id
+        leaf._id = self.next_id
+        self.next_id += 1
+        self.values.insert(k, leaf.value)
+        self.depths.insert(k, depth)
+        self.ids.insert(k, leaf._id)
+        self.parents.insert(k, parent_id)
+
+    def remove(self, node):
+        k = self.find(node)
+        del self.values[k], self.depths[k], self.ids[k], self.parents[k]
+
+    def replace_value(self, node, value):
+        self.values[self.find(node)] = value
+
+    def relayout(self, subtree, depth, parent_id):
+        """Recompute depths and parent ids for the slots covered by subtree."""
+        k = None
+        stack = []
+        node = subtree
+        while stack or node is not None:
+            while node is not None:
+                stack.append((node, depth, parent_id))
+                parent_id = node._id
+                node = node.left
+                depth += 1
+            node, depth, parent_id = stack.pop()
+            if k is None:
+                k = self.find(node)
+            self.depths[k] = depth
+            self.parents[k] = parent_id
+            k += 1
+            parent_id = node._id
+            node = node.right
+            depth += 1
+
+    def canvas(self, h_spacing, v_spacing, node_radius):
+        width = max(400, len(self.values) * h_spacing + h_spacing)
+        height = max(200, (max(self.depths) + 1) * v_spacing + v_spacing)
+        return {"width": width, "height": height, "node_radius": node_radius}
+
+    def render(self, h_spacing, v_spacing, node_radius):
+        nodes = [
+            {"id": node_id, "value": value, "x": column * h_spacing, "y": depth * v_spacing}
+            for column, (node_id, value, depth) in enumerate(zip(self.ids, self.values, self.depths))
+        ]
+        edges = [
+            {"from": parent_id, "to": node_id}
+            for node_id, parent_id in zip(self.ids, self.parents) if parent_id
+        ]
+        return nodes, edges, self.canvas(h_spacing, v_spacing, node_radius)
+
+    def iter_svg(self, h_spacing, v_spacing, node_radius, chunk_size=2000):
+        """
+        Yield the complete <svg> document in chunks. Edge endpoints come from an
+        id -> slot index, so drawing is linear in the number of nodes.
+        """
+        info = self.canvas(h_spacing, v_spacing, node_radius)
+        w, h, r = info["width"], info["height"], node_radius
+        yield (
+            f'<svg width="{w}" height="{h}" viewBox="0 0 {w} {h}" xmlns="http://www.w3.org/2000/svg">'
+            '<defs><filter id="shadow" x="-50%" y="-50%" width="200%" height="200%">'
+            '<feDropShadow dx="0" dy="1" stdDeviation="1" flood-color="#000" flood-opacity="0.15"/>'
+            '</filter></defs>'
+        )
+
+        slot_of = {node_id: column for column, node_id in enumerate(self.ids)}
+        depths = self.depths
+
+        # draw edges first (lines) so the circles sit on top of them
+        parts = []
+        for column, parent_id in enumerate(self.parents):
+            if not parent_id:
+                continue
+            parent_column = slot_of[parent_id]
+            parts.append(
+                f'<line x1="{parent_column * h_spacing + r}" y1="{depths[parent_column] * v_spacing + r}" '
+                f'x2="{column * h_spacing + r}" y2="{depths[column] * v_spacing + r}" '
+                'stroke="#666" stroke-width="2" stroke-linecap="round" stroke-opacity="0.8"/>'
+            )
+            if len(parts) == chunk_size:
+                yield "".join(parts)
+                parts = []
+
+        # draw nodes (circles + text)
+        for column, (value, depth) in enumerate(zip(self.values, depths)):
+            cx = column * h_spacing + r
+            cy = depth * v_spacing + r
+            parts.append(
+                f'<g><circle cx="{cx}" cy="{cy}" r="{r}" fill="#ffffff" stroke="#2b6cb0" '
+                'stroke-width="2" filter="url(#shadow)"></circle>'
+                f'<text x="{cx}" y="{cy}" font-size="12" text-anchor="middle" dominant-baseline="central" '
+                f'fill="#111" pointer-events="none">{escape(str(value))}</text></g>'
+            )
+            if len(parts) == chunk_size:
+                yield "".join(parts)
+                parts = []
+
+        parts.append("</svg>")
+        yield "".join(parts)
+
+
+class BST:
+    BALANCE_MODES = (None, "avl")
+    SNAPSHOT_MAGIC = b"BSTS"
+
+    def __init__(self, balance=None):
+        """
+        balance=None keeps the plain (unbalanced) BST.
+        balance="avl" rebalances on every insert/delete so the height stays O(log n).
+        """
+        if balance not in self.BALANCE_MODES:
+            raise ValueError(f"Unknown balance mode: {balance!r}")
+        self.balance = balance
+        self._root = None
+        self._layout = None        # TreeLayout, patched by insert/delete_node
+        self._render_cache = {}    # rendered layout()/render_svg() output for the current tree
+
+    @property
+    def root(self):
+        return self._root
+
+    @root.setter
+    def root(self, node):
+        # replacing the root from outside (e.g. clearing the tree) drops the cached layout
+        if node is not self._root:
+            self._layout = None
+        self._render_cache.clear()
+        self._root = node
+
+    def insert(self, value):
+        """Insert a value into the BST."""
+        self._render_cache.clear()
+        if self._root is None:
+            self._root = Node(value)
+            if self._layout is not None:
+                self._layout.insert_leaf(self._root, None, 0)
+            return
+
+        # walk down to the insertion point, remembering the path for rebalancing
+        path = []
+        node = self._root
+        while node is not None:
+            path.append(node)
+            node.size += 1
+            node = node.left if value < node.value else node.right
+
+        parent = path[-1]
+        leaf = Node(value)
+        if value < parent.value:
+            parent.left = leaf
+        else:
+            parent.right = leaf
+        if self._layout is not None:
+            self._layout.insert_leaf(leaf, parent, len(path))
+
+        if self.balance == "avl":
+            self._root = self._rebalance_path(path)
+
+    # -------------------------
+    # Bulk loading
+    # -------------------------
+    @classmethod
+    def from_iterable(cls, values, presorted=False, balance=None):
+        """
+        Build a perfectly balanced tree in O(n) from a sorted sequence
+        (sorting first unless presorted=True).
+        """
+        tree = cls(balance=balance)
+        tree._root = cls._build_balanced(values if presorted else sorted(values))
+        return tree
+
+    def bulk_insert(self, values, presorted=False):
+        """
+        Merge many values into the tree at once: the existing keys and the new
+        ones are merged in sorted order and the tree is rebuilt balanced.
+        """
+        new_values = values if presorted else sorted(values)
+        if self._root is not None:
+            new_values = list(merge(self.iter_inorder(), new_values))
+        self.root = self._build_balanced(new_values)
+
+    def save(self, path):
+        """Write the (integer) values to path as a snapshot (see snapshot.py), in O(n)."""
+        write_keys(path, self.SNAPSHOT_MAGIC, "q", (self.BALANCE_MODES.index(self.balance), 0), self.iter_inorder())
+
+    @classmethod
+    def open_snapshot(cls, path):
+        """Map a saved snapshot for binary-search queries without building any nodes."""
+        return KeySnapshot(path, cls.SNAPSHOT_MAGIC)
+
+    @classmethod
+    def load(cls, path):
+        """Rebuild a saved tree, balanced, through the from_iterable bulk path."""
+        with cls.open_snapshot(path) as snap:
+            mode = snap.params[0]
+            if mode >= len(cls.BALANCE_MODES):
+                raise ValueError(f"Unknown balance mode {mode} in {path}")
+            return cls.from_iterable(snap.keys, presorted=True, balance=cls.BALANCE_MODES[mode])
+
+    @staticmethod
+    def _build_balanced(sorted_values):
+        """Midpoint construction with an explicit stack; returns the root node."""
+        if not isinstance(sorted_values, (list, tuple)):
+            sorted_values = list(sorted_values)
+        if not sorted_values:
+            return None
+
+        # each entry is a half-open range of sorted_values and where its root gets linked
+        holder = Node(None)
+        stack = [(0, len(sorted_values), holder, "left")]
+        while stack:
+            lo, hi, parent, side = stack.pop()
+            mid = (lo + hi) // 2
+            node = Node(sorted_values[mid])
+            node.height = (hi - lo).bit_length()
+            node.size = hi - lo
+            setattr(parent, side, node)
+            if lo < mid:
+                stack.append((lo, mid, node, "left"))
+            if mid + 1 < hi:
+                stack.append((mid + 1, hi, node, "right"))
+        return holder.left
+
+    # -------------------------
+    # AVL balancing helpers
+    # -------------------------
+    @staticmethod
+    def _height(node):
+        return node.height if node else 0
+
+    @staticmethod
+    def _size(node):
+        return node.size if node else 0
+
+    def _update_height(self, node):
+        node.height = 1 + max(self._height(node.left), self._height(node.right))
+        node.size = 1 + self._size(node.left) + self._size(node.right)
+
+    def _balance_factor(self, node):
+        return self._height(node.left) - self._height(node.right)
+
+    def _rotate_right(self, node):
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        self._update_height(node)
+        self._update_height(pivot)
+        return pivot
+
+    def _rotate_left(self, node):
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        self._update_height(node)
+        self._update_height(pivot)
+        return pivot
+
+    def _rebalance(self, node):
+        """Restore the AVL invariant at node and return the new subtree root."""
+        self._update_height(node)
+        balance = self._balance_factor(node)
+        if balance > 1:
+            if self._balance_factor(node.left) < 0:
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            if self._balance_factor(node.right) > 0:
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        return node
+
+    def _rebalance_path(self, path):
+        """
+        Rebalance the nodes of a root-to-leaf path bottom-up, relinking rotated
+        subtrees into their parents. Stops as soon as a subtree keeps its root
+        and height, since nothing above it can change. Returns the new top of the path.
+        """
+        top = path[0]
+        rotated = None
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            old_height = node.height
+            new_root = self._rebalance(node)
+            if new_root is not node:
+                rotated = i, new_root
+                if i == 0:
+                    top = new_root
+                elif path[i - 1].left is node:
+                    path[i - 1].left = new_root
+                else:
+                    path[i - 1].right = new_root
+            elif node.height == old_height:
+                break
+
+        # rotations keep the inorder sequence, so only the highest rotated subtree
+        # needs its depths refreshed in the cached layout
+        if rotated is not None and self._layout is not None:
+            i, new_root = rotated
+            self._layout.relayout(new_root, i, path[i - 1]._id if i else 0)
+        return top
+
+    # -------------------------
+    # Traversals (explicit stacks, no recursion)
+    # -------------------------
+    @staticmethod
+    def _inorder_nodes(node):
+        stack = []
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    @staticmethod
+    def _preorder_nodes(node):
+        stack = [node] if node is not None else []
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
+
+    @staticmethod
+    def _postorder_nodes(node):
+        stack = []
+        last_visited = None
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            peek = stack[-1]
+            if peek.right is not None and peek.right is not last_visited:
+                node = peek.right
+            else:
+                last_visited = stack.pop()
+                yield last_visited
+
+    def iter_inorder(self):
+        """Lazily yield values in sorted (inorder) order."""
+        for node in self._inorder_nodes(self._root):
+            yield node.value
+
+    def iter_preorder(self):
+        """Lazily yield values in preorder."""
+        for node in self._preorder_nodes(self._root):
+            yield node.value
+
+    def iter_postorder(self):
+        """Lazily yield values in postorder."""
+        for node in self._postorder_nodes(self._root):
+            yield node.value
+
+    def display(self, node=None, level=0):
+        """Return a text-based rotated tree structure (for debugging)."""
+        if node is None:
+            node = self._root
+        if node is None:
+            return ""
+
+        # reverse inorder (right, node, left) so the tree reads rotated 90 degrees
+        lines = []
+        stack = []
+        while stack or node is not None:
+            while node is not None:
+                stack.append((node, level))
+                node = node.right
+                level += 1
+            node, level = stack.pop()
+            lines.append("    " * level + f"{node.value}\n")
+            node = node.left
+            level += 1
+
+        return "".join(lines)
+
+    # -------------------------
+    # SVG layout generation
+    # -------------------------
+    def layout(self, h_spacing=80, v_spacing=90, node_radius=18):
+        """
+        Compute simple layout positions for each node using an inorder x-spacing
+        and depth-based y. Returns:
+          nodes: list of dicts {id, value, x, y}
+          edges: list of dicts {from: parent_id, to: child_id}
+          svg_size: dict {width, height}
+        The layout is cached on the tree and patched by insert/delete_node, so
+        repeated calls between edits are free and an edit only touches the
+        affected subtree.
+        """
+        if self._root is None:
+            return [], [], {"width": 400, "height": 200, "node_radius": node_radius}
+
+        key = ("layout", h_spacing, v_spacing, node_radius)
+        if key not in self._render_cache:
+            self._render_cache[key] = self._get_layout().render(h_spacing, v_spacing, node_radius)
+        return self._render_cache[key]
+
+    def render_svg(self, h_spacing=80, v_spacing=90, node_radius=18):
+        """Return the whole tree as an <svg> string ("" for an empty tree)."""
+        if self._root is None:
+            return ""
+
+        key = ("svg", h_spacing, v_spacing, node_radius)
+        if key not in self._render_cache:
+            self._render_cache[key] = "".join(self._get_layout().iter_svg(h_spacing, v_spacing, node_radius))
+        return self._render_cache[key]
+
+    def iter_svg(self, h_spacing=80, v_spacing=90, node_radius=18):
+        """Yield the <svg> in chunks, for streaming very large trees without building one big string."""
+        key = ("svg", h_spacing, v_spacing, node_radius)
+        if key in self._render_cache:
+            yield self._render_cache[key]
+        elif self._root is not None:
+            yield from self._get_layout().iter_svg(h_spacing, v_spacing, node_radius)
+
+    def _get_layout(self):
+        if self._layout is None:
+            self._layout = TreeLayout(self._root)
+        return self._layout
+
+    def __len__(self):
+        return self._size(self._root)
+
+    # -------------------------
+    # Order statistics and range queries (subtree sizes)
+    # -------------------------
+    def kth(self, k):
+        """Return the k-th smallest value (k starts at 1)."""
+        if not 1 <= k <= len(self):
+            raise IndexError(f"k={k} is out of range for a tree of {len(self)} values")
+        node = self._root
+        while True:
+            left_size = self._size(node.left)
+            if k <= left_size:
+                node = node.left
+            elif k == left_size + 1:
+                return node.value
+            else:
+                k -= left_size + 1
+                node = node.right
+
+    def _count_below(self, value, inclusive):
+        """Number of keys < value (or <= value when inclusive)."""
+        count = 0
+        node = self._root
+        while node is not None:
+            if node.value < value or (inclusive and node.value == value):
+                count += self._size(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return count
+
+    def rank(self, value):
+        """Number of keys strictly smaller than value."""
+        return self._count_below(value, inclusive=False)
+
+    def count_range(self, lo, hi):
+        """Number of keys with lo <= key <= hi."""
+        if hi < lo:
+            return 0
+        return self._count_below(hi, inclusive=True) - self._count_below(lo, inclusive=False)
+
+    def iter_range(self, lo, hi):
+        """Lazily yield the keys with lo <= key <= hi in sorted order."""
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                # a node below lo has its whole left subtree below lo as well
+                if node.value < lo:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if node.value > hi:
+                return
+            yield node.value
+            node = node.right
+
+    def search(self, root, key):
+        while root is not None:
+            if root.value == key:
+                return root
+            root = root.left if key < root.value else root.right
+        return None
+
+    def post_traversal(self, start, traversal):
+        for node in self._postorder_nodes(start):
+            traversal.append(node.value)
+        return traversal
+
+    def delete_node(self, root, key):
+        # sizes and heights are only fixed along the path walked here, so a
+        # subtree root would leave every ancestor above it stale
+        if root is not self._root:
+            raise ValueError("delete_node must start from the tree's root")
+
+        # Step 1: search for the node, remembering the path for rebalancing
+        path = []
+        node = root
+        while node is not None and node.value != key:
+            path.append(node)
+            node = node.left if key < node.value else node.right
+        if node is None:
+            return root
+
+        layout = self._layout
+        self._render_cache.clear()
+
+        # Case C: two children → copy the inorder successor up, then remove the successor
+        if node.left is not None and node.right is not None:
+            path.append(node)
+            successor = node.right
+            while successor.left:
+                path.append(successor)
+                successor = successor.left
+            if layout is not None:
+                layout.replace_value(node, successor.value)
+            node.value = successor.value
+            node = successor
+
+        # every node left on the path loses one descendant
+        for ancestor in path:
+            ancestor.size -= 1
+
+        # Case A/B: no child or one child → splice the node out
+        child = node.left if node.left is not None else node.right
+        parent = path[-1] if path else None
+        if parent is None:
+            root = child
+        elif parent.left is node:
+            parent.left = child
+        else:
+            parent.right = child
+
+        if layout is not None:
+            # the child's subtree moves up one level into the removed node's place
+            layout.remove(node)
+            if child is not None:
+                layout.relayout(child, len(path), parent._id if parent else 0)
+
+        if self.balance == "avl" and path:
+            root = self._rebalance_path(path)
+        self._root = root
+        return root
+
+
+class ArrayBST:
+    """
+    Struct-of-arrays BST for integer keys. Node i is keys[i], left[i], right[i]
+    stored in array('q') buffers (-1 means no child), so a key costs 24 bytes
+    instead of a full Node object. Deleted slots are reused through a free list.
+    It is not self-balancing; use from_iterable to load a balanced shape.
+    """
+
+    def __init__(self):
+        self.keys = array("q")
+        self.left = array("q")
+        self.right = array("q")
+        self.root = -1
+        self._free = array("q")
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _new_node(self, value):
+        self._count += 1
+        if self._free:
+            i = self._free.pop()
+            self.keys[i] = value
+            self.left[i] = -1
+            self.right[i] = -1
+            return i
+        self.keys.append(value)
+        self.left.append(-1)
+        self.right.append(-1)
+        return len(self.keys) - 1
+
+    @classmethod
+    def from_iterable(cls, values, presorted=False):
+        """Build a perfectly balanced tree in O(n), sorting first unless presorted=True."""
+        tree = cls()
+        tree.keys = array("q", values if presorted else sorted(values))
+        n = len(tree.keys)
+        tree.left = array("q", [-1]) * n
+        tree.right = array("q", [-1]) * n
+        tree._count = n
+        if n == 0:
+            return tree
+
+        # slot i holds the i-th smallest key; link midpoints with an explicit stack
+        tree.root = (n - 1) // 2
+        stack = [(0, n, tree.root)]
+        while stack:
+            lo, hi, mid = stack.pop()
+            if lo < mid:
+                child = (lo + mid - 1) // 2
+                tree.left[mid] = child
+                stack.append((lo, mid, child))
+            if mid + 1 < hi:
+                child = (mid + 1 + hi - 1) // 2
+                tree.right[mid] = child
+                stack.append((mid + 1, hi, child))
+        return tree
+
+    def insert(self, value):
+        if self.root == -1:
+            self.root = self._new_node(value)
+            return
+        keys, left, right = self.keys, self.left, self.right
+        i = self.root
+        while True:
+            if value < keys[i]:
+                if left[i] == -1:
+                    left[i] = self._new_node(value)
+                    return
+                i = left[i]
+            else:
+                if right[i] == -1:
+                    right[i] = self._new_node(value)
+                    return
+                i = right[i]
+
+    def search(self, key):
+        """Return the slot holding key, or -1."""
+        keys, left, right = self.keys, self.left, self.right
+        i = self.root
+        while i != -1:
+            k = keys[i]
+            if k == key:
+                return i
+            i = left[i] if key < k else right[i]
+        return -1
+
+    def __contains__(self, key):
+        return self.search(key) != -1
+
+    def delete(self, key):
+        """Remove one occurrence of key. Returns True if it was found."""
+        keys, left, right = self.keys, self.left, self.right
+        parent = -1
+        i = self.root
+        while i != -1 and keys[i] != key:
+            parent = i
+            i = left[i] if key < keys[i] else right[i]
+        if i == -1:
+            return False
+
+        # two children: copy the inorder successor up, then remove the successor
+        if left[i] != -1 and right[i] != -1:
+            parent = i
+            successor = right[i]
+            while left[successor] != -1:
+                parent = successor
+                successor = left[successor]
+            keys[i] = keys[successor]
+            i = successor
+
+        child = left[i] if left[i] != -1 else right[i]
+        if parent == -1:
+            self.root = child
+        elif left[parent] == i:
+            left[parent] = child
+        else:
+            right[parent] = child
+        self._free.append(i)
+        self._count -= 1
+        return True
+
+    def iter_inorder(self):
+        """Lazily yield keys in sorted order."""
+        keys, left, right = self.keys, self.left, self.right
+        stack = []
+        i = self.root
+        while stack or i != -1:
+            while i != -1:
+                stack.append(i)
+                i = left[i]
+            i = stack.pop()
+            yield keys[i]
+            i = right[i]
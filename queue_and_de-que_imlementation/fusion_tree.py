@@ -1,240 +1,751 @@
-W = 64
-B = int(W**(1/5)) # branching factor (like in B-trees, can tune)
-# With W=64, B=2. This means each node holds at most 2 keys.
-
-class FusionNode:
-    def __init__(self, leaf=True):
-        self.keys = []          # stores INTEGER values
-        self.children = []      # pointers to children
-        self.leaf = leaf        # True if leaf node
-        self.n = 0              # number of keys
-
-
-def split_child(parent, i, y):
-    """Split the full child y of parent at index i"""
-    z = FusionNode(leaf=y.leaf)
-    mid = B // 2
-    parent.keys.insert(i, y.keys[mid])
-    z.keys = y.keys[mid+1:]
-    y.keys = y.keys[:mid]
-    if not y.leaf:
-        z.children = y.children[mid+1:]
-        y.children = y.children[:mid+1]
-    parent.children.insert(i+1, z)
-    y.n = len(y.keys)
-    z.n = len(z.keys)
-    parent.n = len(parent.keys)
-
-class FusionTree:
-    def __init__(self):
-        self.root = FusionNode()
-
-    def _find_rank_in_node(self, key, node):
-        """
-        Simulates a constant-time search for the key's rank within a single node.
-        """
-    
-        if node.n > B:
-            rank = 0
-            for k in node.keys:
-                if k <= key:
-                    rank += 1
-            return rank
-        if node.n == 0:
-            return 0
-        bits_per_key = W // B
-        packed_keys = 0
-        for i in range(node.n):
-            packed_keys |= node.keys[i] << (i * bits_per_key)
-        query_mask = 0
-        for i in range(B):
-            query_mask |= key << (i * bits_per_key)
-        high_bits_mask = 0
-        for i in range(B):
-            high_bits_mask |= 1 << ((i * bits_per_key) + bits_per_key - 1)
-        diff = query_mask - packed_keys
-        borrows = diff & high_bits_mask
-        num_keys_greater_than_key = bin(borrows).count('1')
-        rank = node.n - num_keys_greater_than_key
-        return rank
-
-    def _insert_non_full(self, node, key):
-        """Insert key into a non-full node using O(1) rank finding."""
-        i = self._find_rank_in_node(key, node)
-        if node.leaf:
-            node.keys.insert(i, key)
-            node.n += 1
-        else:
-            if len(node.children[i].keys) == B:
-                split_child(node, i, node.children[i])
-                if key > node.keys[i]:
-                    i += 1
-            self._insert_non_full(node.children[i], key)
-    
-    def insert(self, key):
-        r = self.root
-        if len(r.keys) == B:
-            s = FusionNode(leaf=False)
-            s.children.append(r)
-            self.root = s
-            split_child(s, 0, r)
-            self._insert_non_full(s, key)
-        else:
-            self._insert_non_full(r, key)
-
-    def _search_recursive(self, node, key):
-        """Helper for search using O(1) rank finding."""
-        rank = self._find_rank_in_node(key, node)
-        index = rank - 1
-
-        if index >= 0 and index < node.n and node.keys[index] == key:
-            return True
-        
-        if node.leaf:
-            return False
-        
-        # Child to descend into is at index 'rank'
-        if rank < len(node.children):
-             return self._search_recursive(node.children[rank], key)
-        return False
-
-
-    def search(self, key):
-        return self._search_recursive(self.root, key)
-
-    def delete(self, key):
-        """Public method to delete a key from the tree."""
-        if not self.search(key):
-            print(f"Element {key} not found in the tree.")
-            return
-
-        self._delete_recursive(self.root, key)
-
-        if len(self.root.keys) == 0 and not self.root.leaf and self.root.children:
-            self.root = self.root.children[0]
-
-    def _delete_recursive(self, node, key):
-        """Recursive delete helper that uses O(1) intra-node search."""
-        min_keys = B // 2
-        rank = self._find_rank_in_node(key, node)
-        index = rank - 1
-
-        # Case 1: Key is present at this node
-        if index >= 0 and index < node.n and node.keys[index] == key:
-            if node.leaf:
-                node.keys.pop(index)
-                node.n -= 1
-            else:
-                self._delete_from_internal_node(node, index)
-        # Case 2: Key is not in this node, recurse down
-        else:
-            if node.leaf:
-                return
-
-            child_idx = rank
-            is_last_child = (child_idx == node.n)
-            
-            if child_idx < len(node.children) and node.children[child_idx].n < min_keys + 1:
-                self._fill_child(node, child_idx)
-
-            if is_last_child and child_idx > node.n:
-                self._delete_recursive(node.children[child_idx - 1], key)
-            else:
-                 if child_idx < len(node.children):
-                    self._delete_recursive(node.children[child_idx], key)
-    
-    def _delete_from_internal_node(self, node, key_idx):
-        min_keys = B // 2
-        key = node.keys[key_idx]
-        if node.children[key_idx].n > min_keys:
-            pred = self._get_predecessor(node.children[key_idx])
-            node.keys[key_idx] = pred
-            self._delete_recursive(node.children[key_idx], pred)
-        elif key_idx + 1 < len(node.children) and node.children[key_idx + 1].n > min_keys:
-            succ = self._get_successor(node.children[key_idx + 1])
-            node.keys[key_idx] = succ
-            self._delete_recursive(node.children[key_idx + 1], succ)
-        else:
-            self._merge_children(node, key_idx)
-            self._delete_recursive(node.children[key_idx], key)
-
-    def _get_predecessor(self, node):
-        current = node
-        while not current.leaf:
-            # The predecessor is the rightmost key in the left subtree.
-            # The child index for the rightmost path is 'current.n'
-            current = current.children[current.n]
-        return current.keys[-1]
-
-    def _get_successor(self, node):
-        current = node
-        while not current.leaf:
-            current = current.children[0]
-        return current.keys[0]
-
-    def _fill_child(self, parent_node, child_idx):
-        min_keys = B // 2
-        if child_idx != 0 and parent_node.children[child_idx - 1].n > min_keys:
-            self._borrow_from_prev(parent_node, child_idx)
-        elif child_idx != parent_node.n and parent_node.children[child_idx + 1].n > min_keys:
-            self._borrow_from_next(parent_node, child_idx)
-        else:
-            if child_idx != parent_node.n:
-                self._merge_children(parent_node, child_idx)
-            else:
-                self._merge_children(parent_node, child_idx - 1)
-
-    def _borrow_from_prev(self, parent_node, child_idx):
-        child = parent_node.children[child_idx]
-        sibling = parent_node.children[child_idx - 1]
-        child.keys.insert(0, parent_node.keys[child_idx - 1])
-        parent_node.keys[child_idx - 1] = sibling.keys.pop()
-        if not sibling.leaf:
-            child.children.insert(0, sibling.children.pop())
-        child.n += 1
-        sibling.n -= 1
-
-    def _borrow_from_next(self, parent_node, child_idx):
-        child = parent_node.children[child_idx]
-        sibling = parent_node.children[child_idx + 1]
-        child.keys.append(parent_node.keys[child_idx])
-        parent_node.keys[child_idx] = sibling.keys.pop(0)
-        if not sibling.leaf:
-            child.children.append(sibling.children.pop(0))
-        child.n += 1
-        sibling.n -= 1
-
-    def _merge_children(self, parent_node, idx):
-        child = parent_node.children[idx]
-        sibling = parent_node.children[idx + 1]
-        child.keys.append(parent_node.keys.pop(idx))
-        child.keys.extend(sibling.keys)
-        if not child.leaf:
-            child.children.extend(sibling.children)
-        parent_node.children.pop(idx + 1)
-        parent_node.n -= 1
-        child.n = len(child.keys)
-
-    def get_min(self):
-        node = self.root
-        while not node.leaf:
-            node = node.children[0]
-        return node.keys[0] if node.keys else None
-
-    def is_empty(self):
-        return len(self.root.keys) == 0
-    
-    def get_all_keys(self):
-        """Returns a list of all keys in the tree."""
-        keys = []
-        self._get_all_keys_recursive(self.root, keys)
-        return keys
-
-    def _get_all_keys_recursive(self, node, keys):
-        """Helper to recursively gather all keys."""
-        if node:
-            keys.extend(node.keys)
-            if not node.leaf:
-                for child in node.children:
-                    self._get_all_keys_recursive(child, keys)
-
+from array import array
+
+from snapshot import KeySnapshot, write_keys
+
+W = 64
+B = int(W**(1/5)) # branching factor (like in B-trees, can tune)
+# W and B are only the defaults; every FusionTree takes its own word_bits and
+# branching, so trees with different fan-outs can live side by side.
+# With W=64, B=2. This means each node holds 1 to 3 keys.
+
+
+class FusionNode:
+    """
+    A node with fixed-capacity buffers: keys holds max_keys slots (an
+    array('Q') when keys fit in 64 bits) and children holds max_keys+1 slots
+    (an empty tuple for leaves). Only the first n keys and, for internal
+    nodes, the first n+1 children are live; the rest is spare capacity, so
+    inserting or removing a key shifts entries in place instead of resizing.
+    """
+    __slots__ = ("keys", "children", "leaf", "n", "packed")
+
+    def __init__(self, key_template, leaf=True):
+        self.keys = key_template[:]     # stores INTEGER values
+        self.children = () if leaf else [None] * (len(key_template) + 1)
+        self.leaf = leaf                # True if leaf node
+        self.n = 0                      # number of live keys
+        self.packed = 0                 # keys[i] sits in field i (bits i*field_bits ...)
+
+    def insert_key(self, i, key, field_bits):
+        shift = i * field_bits
+        high = self.packed >> shift
+        self.packed ^= high << shift
+        self.packed |= (key | (high << field_bits)) << shift
+        # shift keys[i:] right by one; the spare last slot falls off the end
+        self.keys.insert(i, key)
+        self.keys.pop()
+        self.n += 1
+
+    def pop_key(self, i, field_bits):
+        if i < 0:
+            i += self.n
+        shift = i * field_bits
+        high = self.packed >> (shift + field_bits)
+        self.packed &= (1 << shift) - 1
+        self.packed |= high << shift
+        self.n -= 1
+        key = self.keys.pop(i)
+        self.keys.append(0)
+        return key
+
+    def set_key(self, i, key, field_bits):
+        shift = i * field_bits
+        self.packed ^= (self.keys[i] ^ key) << shift
+        self.keys[i] = key
+
+    def append_keys(self, other, field_bits):
+        """Append all keys of other, whose packed word is already known (used by merges)."""
+        keys = self.keys
+        start = self.n
+        for j in range(other.n):
+            keys[start + j] = other.keys[j]
+        self.packed |= other.packed << (start * field_bits)
+        self.n += other.n
+
+    def insert_child(self, i, child):
+        self.children.insert(i, child)
+        self.children.pop()
+
+    def pop_child(self, i):
+        child = self.children.pop(i)
+        self.children.append(None)
+        return child
+
+    def set_children(self, children):
+        """Replace the live children (a list of at most n+1 nodes), clearing the spare slots."""
+        slots = self.children
+        count = len(children)
+        slots[:count] = children
+        for j in range(count, len(slots)):
+            slots[j] = None
+
+
+class FusionTree:
+    SNAPSHOT_MAGIC = b"FUSN"
+
+    def __init__(self, word_bits=W, branching=B):
+        """
+        word_bits: keys are unsigned integers of this many bits.
+        branching: B; a non-root node keeps at least B//2 keys and a full node
+        holds max_keys = 2*(B//2)+1, so splitting a full node (or merging two
+        minimal ones) always stays in range.
+        """
+        if word_bits < 1:
+            raise ValueError(f"word_bits must be positive, got {word_bits}")
+        if branching < 2:
+            raise ValueError(f"branching must be at least 2, got {branching}")
+        self.word_bits = word_bits
+        self.branching = branching
+        self.min_keys = branching // 2
+        self.max_keys = 2 * (branching // 2) + 1
+        # every node copies this zeroed buffer; array('Q') stores the keys as raw
+        # machine words, wider keys fall back to a plain list of the same length
+        if word_bits <= 64:
+            self._key_template = array("Q", [0]) * self.max_keys
+        else:
+            self._key_template = [0] * self.max_keys
+        self.root = self._new_node()
+        # kept up to date by every insert/delete so len(), get_min() and get_max() are O(1)
+        self._size = 0
+        self._min = None
+        self._max = None
+
+        # Inside a node's packed word every key gets a (word_bits+1)-bit field:
+        # the key itself plus a spare top "sentinel" bit used by the parallel
+        # comparison in _find_rank_in_node.
+        self._field_bits = word_bits + 1
+        self._key_mask = (1 << word_bits) - 1
+        # Precomputed once per tree: multiplying a key by _query_multiplier
+        # copies it into every field, and _rank_masks[n] picks the sentinel
+        # bits of the first n fields.
+        self._query_multiplier = sum(1 << (i * self._field_bits) for i in range(self.max_keys))
+        self._sentinels = self._query_multiplier << word_bits
+        self._rank_masks = [
+            self._sentinels & ((1 << (n * self._field_bits)) - 1) for n in range(self.max_keys + 1)
+        ]
+
+    @classmethod
+    def bulk_load(cls, sorted_keys, word_bits=W, branching=B):
+        """
+        Build a tree bottom-up in O(n) from keys in ascending order: each level
+        is cut into as few nodes as possible, and the key between two
+        neighbouring nodes moves up to form the next level.
+        """
+        tree = cls(word_bits=word_bits, branching=branching)
+        keys = list(sorted_keys)
+        if not keys:
+            return tree
+        if keys[0] < 0 or keys[-1] > tree._key_mask:
+            raise ValueError(f"FusionTree keys must be unsigned {word_bits}-bit integers")
+        if any(a > b for a, b in zip(keys, keys[1:])):
+            raise ValueError("bulk_load expects keys in ascending order")
+
+        nodes, separators = tree._build_level(keys, None)
+        while len(nodes) > 1:
+            nodes, separators = tree._build_level(separators, nodes)
+        tree.root = nodes[0]
+        tree._size = len(keys)
+        tree._min = keys[0]
+        tree._max = keys[-1]
+        return tree
+
+    def save(self, path):
+        """Write the keys to path as a snapshot (see snapshot.py), in O(n)."""
+        if self.word_bits > 64:
+            raise ValueError("snapshots hold keys of at most 64 bits")
+        write_keys(path, self.SNAPSHOT_MAGIC, "Q", (self.word_bits, self.branching), self.iter_keys())
+
+    @classmethod
+    def open_snapshot(cls, path):
+        """
+        Map a saved snapshot without building a tree: the returned KeySnapshot
+        answers `key in snap`, rank and iter_range by binary search at once.
+        """
+        return KeySnapshot(path, cls.SNAPSHOT_MAGIC)
+
+    @classmethod
+    def load(cls, path):
+        """Rebuild a saved tree (same word_bits and branching) through bulk_load."""
+        with cls.open_snapshot(path) as snap:
+            word_bits, branching = snap.params
+            return cls.bulk_load(snap.keys, word_bits=word_bits, branching=branching)
+
+    def _new_node(self, leaf=True):
+        return FusionNode(self._key_template, leaf)
+
+    def _build_level(self, keys, children):
+        """
+        Cut keys into nodes of min_keys..max_keys keys each, leaving one key
+        between neighbours as a separator for the level above. Node i takes
+        the next n_i + 1 entries of children (None for the leaf level).
+        """
+        count = (len(keys) + self.max_keys + 1) // (self.max_keys + 1)
+        base, extra = divmod(len(keys) - (count - 1), count)
+        nodes = []
+        separators = []
+        pos = 0
+        child_pos = 0
+        for i in range(count):
+            size = base + (1 if i < extra else 0)
+            node = self._new_node(leaf=children is None)
+            self._set_keys(node, keys[pos:pos + size])
+            if children is not None:
+                node.set_children(children[child_pos:child_pos + size + 1])
+                child_pos += size + 1
+            nodes.append(node)
+            pos += size
+            if i < count - 1:
+                separators.append(keys[pos])
+                pos += 1
+        return nodes, separators
+
+    def _set_keys(self, node, keys):
+        """Replace all keys of node, repacking its word from scratch."""
+        bits = self._field_bits
+        buf = node.keys
+        packed = 0
+        for i, key in enumerate(keys):
+            buf[i] = key
+            packed |= key << (i * bits)
+        node.packed = packed
+        node.n = len(keys)
+
+    def _split_child(self, parent, i, y):
+        """Split the full child y of parent at index i"""
+        bits = self._field_bits
+        z = self._new_node(leaf=y.leaf)
+        mid = self.min_keys
+        count = y.n - mid - 1
+        parent.insert_key(i, y.keys[mid], bits)
+        # move the upper half into z's buffers slot by slot, no temporary slices
+        for j in range(count):
+            z.keys[j] = y.keys[mid + 1 + j]
+        z.packed = y.packed >> ((mid + 1) * bits)
+        y.packed &= (1 << (mid * bits)) - 1
+        if not y.leaf:
+            for j in range(count + 1):
+                z.children[j] = y.children[mid + 1 + j]
+                y.children[mid + 1 + j] = None
+        parent.insert_child(i+1, z)
+        y.n = mid
+        z.n = count
+
+    def _find_rank_in_node(self, key, node):
+        """
+        Number of keys in node that are <= key, using one word-parallel comparison.
+
+        Each field of (key copied into every field, sentinel bits set) - packed
+        stays non-negative, so no borrow crosses fields, and its sentinel bit
+        survives exactly when key >= the key stored in that field.
+
+        In CPython this is still 2-7x slower than bisect_right over node.keys
+        (benchmarks/fusion_rank_benchmark.py): the big-int arithmetic costs more
+        than the few C-level comparisons it replaces.
+        """
+        if node.n == 0 or key < 0:
+            return 0
+        if key > self._key_mask:
+            return node.n
+        diff = (key * self._query_multiplier | self._sentinels) - node.packed
+        return (diff & self._rank_masks[node.n]).bit_count()
+
+    def _insert_non_full(self, node, key):
+        """Insert key into a non-full node using O(1) rank finding."""
+        i = self._find_rank_in_node(key, node)
+        if node.leaf:
+            node.insert_key(i, key, self._field_bits)
+        else:
+            if node.children[i].n == self.max_keys:
+                self._split_child(node, i, node.children[i])
+                if key > node.keys[i]:
+                    i += 1
+            self._insert_non_full(node.children[i], key)
+    
+    def insert(self, key):
+        if not 0 <= key <= self._key_mask:
+            raise ValueError(f"FusionTree keys must be unsigned {self.word_bits}-bit integers, got {key}")
+        self._size += 1
+        if self._min is None or key < self._min:
+            self._min = key
+        if self._max is None or key > self._max:
+            self._max = key
+        r = self.root
+        if r.n == self.max_keys:
+            s = self._new_node(leaf=False)
+            s.children[0] = r
+            self.root = s
+            self._split_child(s, 0, r)
+            self._insert_non_full(s, key)
+        else:
+            self._insert_non_full(r, key)
+
+    def _search_recursive(self, node, key):
+        """Helper for search using O(1) rank finding."""
+        rank = self._find_rank_in_node(key, node)
+        index = rank - 1
+
+        if index >= 0 and index < node.n and node.keys[index] == key:
+            return True
+        
+        if node.leaf:
+            return False
+        
+        # Child to descend into is at index 'rank'
+        return self._search_recursive(node.children[rank], key)
+
+
+    def search(self, key):
+        return self._search_recursive(self.root, key)
+
+    def delete(self, key):
+        """Public method to delete a key from the tree. Returns True if it was found."""
+        found = self._delete_recursive(self.root, key)
+
+        if self.root.n == 0 and not self.root.leaf:
+            self.root = self.root.children[0]
+
+        if found:
+            self._removed(key)
+        else:
+            print(f"Element {key} not found in the tree.")
+        return found
+
+    def _removed(self, key):
+        """Update the cached size/min/max after one copy of key left the tree."""
+        self._size -= 1
+        if self._size == 0:
+            self._min = self._max = None
+            return
+        if key == self._min:
+            self._min = self._leftmost_key()
+        if key == self._max:
+            self._max = self._rightmost_key()
+
+    def delete_many(self, keys):
+        """
+        Delete a batch of keys with one descent into each affected subtree.
+        Returns a list of booleans, True where keys[i] was found and removed
+        (each distinct key is removed once). Nothing is printed.
+        """
+        keys = list(keys)
+        batch = sorted(set(keys))
+        removed = set()
+        if batch:
+            self._delete_batch(self.root, batch, removed)
+            while self.root.n == 0 and not self.root.leaf:
+                self.root = self.root.children[0]
+            self._size -= len(removed)
+            if self._size == 0:
+                self._min = self._max = None
+            else:
+                if self._min in removed:
+                    self._min = self._leftmost_key()
+                if self._max in removed:
+                    self._max = self._rightmost_key()
+        return [key in removed for key in keys]
+
+    def _delete_batch(self, node, batch, removed):
+        """
+        Remove the sorted keys in batch from node's subtree, then repair
+        underflowing children bottom-up. node itself may be left with fewer
+        than min_keys keys; its parent repairs that.
+        """
+        if node.leaf:
+            kept = []
+            j = 0
+            for idx in range(node.n):
+                key = node.keys[idx]
+                while j < len(batch) and batch[j] < key:
+                    j += 1
+                if j < len(batch) and batch[j] == key:
+                    removed.add(key)
+                    j += 1
+                else:
+                    kept.append(key)
+            if len(kept) != node.n:
+                self._set_keys(node, kept)
+            return
+
+        # route each key to this node (as a separator) or to one child bucket
+        buckets = {}
+        doomed = []
+        for key in batch:
+            rank = self._find_rank_in_node(key, node)
+            if rank and node.keys[rank - 1] == key:
+                doomed.append(rank - 1)
+            else:
+                buckets.setdefault(rank, []).append(key)
+
+        for child_idx, bucket in buckets.items():
+            self._delete_batch(node.children[child_idx], bucket, removed)
+        for key_idx in reversed(doomed):
+            removed.add(node.keys[key_idx])
+            self._remove_separator(node, key_idx)
+        self._fix_children(node)
+
+    def _remove_separator(self, node, key_idx):
+        """Drop node.keys[key_idx], refilling the gap from a neighbouring subtree."""
+        bits = self._field_bits
+        replacement = self._pop_max(node.children[key_idx])
+        if replacement is None:
+            replacement = self._pop_min(node.children[key_idx + 1])
+        if replacement is not None:
+            node.set_key(key_idx, replacement, bits)
+        else:
+            # both neighbouring subtrees are already empty: drop one of them with the key
+            node.pop_key(key_idx, bits)
+            node.pop_child(key_idx + 1)
+
+    def _pop_max(self, node):
+        """Remove and return the largest key of node's subtree (None if it has no keys)."""
+        if node.leaf:
+            return node.pop_key(-1, self._field_bits) if node.n else None
+        key = self._pop_max(node.children[node.n])
+        if key is None:
+            if node.n == 0:
+                return None
+            # the last child's subtree is empty: give up the last key along with it
+            node.pop_child(node.n)
+            return node.pop_key(-1, self._field_bits)
+        self._fix_children(node)
+        return key
+
+    def _pop_min(self, node):
+        """Remove and return the smallest key of node's subtree (None if it has no keys)."""
+        if node.leaf:
+            return node.pop_key(0, self._field_bits) if node.n else None
+        key = self._pop_min(node.children[0])
+        if key is None:
+            if node.n == 0:
+                return None
+            node.pop_child(0)
+            return node.pop_key(0, self._field_bits)
+        self._fix_children(node)
+        return key
+
+    def _fix_children(self, node):
+        """Merge or redistribute every child that dropped below min_keys with a neighbour."""
+        i = 0
+        while not node.leaf and node.n > 0 and i <= node.n:
+            if node.children[i].n < self.min_keys:
+                self._combine_children(node, i if i < node.n else i - 1)
+                i = max(i - 1, 0)
+            else:
+                i += 1
+
+    def _combine_children(self, parent_node, idx):
+        """
+        Pool children idx and idx+1 with their separator. Small pools become one
+        node; larger ones are split evenly, which covers both merge and borrow.
+        Keys and children move slot by slot, as in _split_child.
+        """
+        child = parent_node.children[idx]
+        sibling = parent_node.children[idx + 1]
+        total = child.n + 1 + sibling.n
+        if total <= self.max_keys:
+            self._merge_children(parent_node, idx)
+            self._fix_children(child)
+            return
+
+        bits = self._field_bits
+        separator = parent_node.keys[idx]
+        mid = total // 2                # child keeps mid keys, the next one goes up
+        if mid > child.n:
+            # move the separator and the first k-1 sibling keys into child
+            k = mid - child.n
+            start = child.n
+            child.keys[start] = separator
+            for j in range(k - 1):
+                child.keys[start + 1 + j] = sibling.keys[j]
+            moved = sibling.packed & ((1 << ((k - 1) * bits)) - 1)
+            child.packed |= (separator | (moved << bits)) << (start * bits)
+            separator = sibling.keys[k - 1]
+            for j in range(sibling.n - k):
+                sibling.keys[j] = sibling.keys[j + k]
+            sibling.packed >>= k * bits
+            if not child.leaf:
+                for j in range(k):
+                    child.children[start + 1 + j] = sibling.children[j]
+                for j in range(sibling.n + 1 - k):
+                    sibling.children[j] = sibling.children[j + k]
+                for j in range(sibling.n + 1 - k, sibling.n + 1):
+                    sibling.children[j] = None
+            child.n = mid
+            sibling.n -= k
+        elif mid < child.n:
+            # move child's last k-1 keys and the separator to the front of sibling
+            k = child.n - mid
+            for j in range(sibling.n - 1, -1, -1):
+                sibling.keys[j + k] = sibling.keys[j]
+            for j in range(k - 1):
+                sibling.keys[j] = child.keys[mid + 1 + j]
+            sibling.keys[k - 1] = separator
+            moved = child.packed >> ((mid + 1) * bits)
+            sibling.packed = (sibling.packed << (k * bits)) | moved | (separator << ((k - 1) * bits))
+            separator = child.keys[mid]
+            child.packed &= (1 << (mid * bits)) - 1
+            if not child.leaf:
+                for j in range(sibling.n, -1, -1):
+                    sibling.children[j + k] = sibling.children[j]
+                for j in range(k):
+                    sibling.children[j] = child.children[mid + 1 + j]
+                    child.children[mid + 1 + j] = None
+            sibling.n += k
+            child.n = mid
+        parent_node.set_key(idx, separator, bits)
+        self._fix_children(child)
+        self._fix_children(sibling)
+
+    def _delete_recursive(self, node, key):
+        """Recursive delete helper that uses O(1) intra-node search. Returns True if key was removed."""
+        min_keys = self.min_keys
+        rank = self._find_rank_in_node(key, node)
+        index = rank - 1
+
+        # Case 1: Key is present at this node
+        if index >= 0 and index < node.n and node.keys[index] == key:
+            if node.leaf:
+                node.pop_key(index, self._field_bits)
+            else:
+                self._delete_from_internal_node(node, index)
+            return True
+        # Case 2: Key is not in this node, recurse down
+        else:
+            if node.leaf:
+                return False
+
+            child_idx = rank
+            is_last_child = (child_idx == node.n)
+            
+            if node.children[child_idx].n < min_keys + 1:
+                self._fill_child(node, child_idx)
+
+            if is_last_child and child_idx > node.n:
+                return self._delete_recursive(node.children[child_idx - 1], key)
+            return self._delete_recursive(node.children[child_idx], key)
+    
+    def _delete_from_internal_node(self, node, key_idx):
+        min_keys = self.min_keys
+        key = node.keys[key_idx]
+        if node.children[key_idx].n > min_keys:
+            pred = self._get_predecessor(node.children[key_idx])
+            node.set_key(key_idx, pred, self._field_bits)
+            self._delete_recursive(node.children[key_idx], pred)
+        elif node.children[key_idx + 1].n > min_keys:
+            succ = self._get_successor(node.children[key_idx + 1])
+            node.set_key(key_idx, succ, self._field_bits)
+            self._delete_recursive(node.children[key_idx + 1], succ)
+        else:
+            self._merge_children(node, key_idx)
+            self._delete_recursive(node.children[key_idx], key)
+
+    def _get_predecessor(self, node):
+        current = node
+        while not current.leaf:
+            # The predecessor is the rightmost key in the left subtree.
+            # The child index for the rightmost path is 'current.n'
+            current = current.children[current.n]
+        return current.keys[current.n - 1]
+
+    def _get_successor(self, node):
+        current = node
+        while not current.leaf:
+            current = current.children[0]
+        return current.keys[0]
+
+    def _fill_child(self, parent_node, child_idx):
+        min_keys = self.min_keys
+        if child_idx != 0 and parent_node.children[child_idx - 1].n > min_keys:
+            self._borrow_from_prev(parent_node, child_idx)
+        elif child_idx != parent_node.n and parent_node.children[child_idx + 1].n > min_keys:
+            self._borrow_from_next(parent_node, child_idx)
+        else:
+            if child_idx != parent_node.n:
+                self._merge_children(parent_node, child_idx)
+            else:
+                self._merge_children(parent_node, child_idx - 1)
+
+    def _borrow_from_prev(self, parent_node, child_idx):
+        child = parent_node.children[child_idx]
+        sibling = parent_node.children[child_idx - 1]
+        bits = self._field_bits
+        child.insert_key(0, parent_node.keys[child_idx - 1], bits)
+        parent_node.set_key(child_idx - 1, sibling.pop_key(-1, bits), bits)
+        if not sibling.leaf:
+            child.insert_child(0, sibling.pop_child(sibling.n + 1))
+
+    def _borrow_from_next(self, parent_node, child_idx):
+        child = parent_node.children[child_idx]
+        sibling = parent_node.children[child_idx + 1]
+        bits = self._field_bits
+        child.insert_key(child.n, parent_node.keys[child_idx], bits)
+        parent_node.set_key(child_idx, sibling.pop_key(0, bits), bits)
+        if not sibling.leaf:
+            child.children[child.n] = sibling.pop_child(0)
+
+    def _merge_children(self, parent_node, idx):
+        child = parent_node.children[idx]
+        sibling = parent_node.children[idx + 1]
+        bits = self._field_bits
+        start = child.n + 1
+        child.insert_key(child.n, parent_node.pop_key(idx, bits), bits)
+        child.append_keys(sibling, bits)
+        if not child.leaf:
+            for j in range(sibling.n + 1):
+                child.children[start + j] = sibling.children[j]
+        parent_node.pop_child(idx + 1)
+
+    def get_min(self):
+        return self._min
+
+    def get_max(self):
+        return self._max
+
+    def _leftmost_key(self):
+        node = self.root
+        while not node.leaf:
+            node = node.children[0]
+        return node.keys[0] if node.n else None
+
+    def _rightmost_key(self):
+        node = self.root
+        while not node.leaf:
+            node = node.children[node.n]
+        return node.keys[node.n - 1] if node.n else None
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, key):
+        return self.search(key)
+
+    def __iter__(self):
+        return self.iter_keys()
+
+    def pop_min(self):
+        """Remove and return the smallest key in a single descent (None if empty)."""
+        if self.is_empty():
+            return None
+        node = self.root
+        while not node.leaf:
+            # top up the leftmost child before entering it, as _delete_recursive does
+            if node.children[0].n <= self.min_keys:
+                self._fill_child(node, 0)
+            node = node.children[0]
+        key = node.pop_key(0, self._field_bits)
+
+        if self.root.n == 0 and not self.root.leaf:
+            self.root = self.root.children[0]
+        self._removed(key)
+        return key
+
+    def pop_ceiling(self, key, limit=None):
+        """
+        Remove and return the smallest key >= key in a single descent, or None
+        if there is none (or it is above limit, in which case nothing is removed).
+
+        Children are topped up on the way down as in pop_min. If the leaf
+        reached holds no key >= key, the answer is the separator after the last
+        child not taken rightmost; that leaf then holds the separator's
+        predecessor, which takes its place.
+        """
+        if self.is_empty():
+            return None
+        bits = self._field_bits
+        holder, at = None, 0        # deepest internal node (and index) whose key is >= key
+        node = self.root
+        while not node.leaf:
+            rank = self._find_rank_in_node(key - 1, node)
+            if node.children[rank].n <= self.min_keys:
+                self._fill_child(node, rank)
+                rank = self._find_rank_in_node(key - 1, node)
+            if rank < node.n:
+                holder, at = node, rank
+            node = node.children[rank]
+
+        rank = self._find_rank_in_node(key - 1, node)
+        if rank < node.n:
+            found = node.keys[rank]
+            if limit is not None and found > limit:
+                found = None
+            else:
+                node.pop_key(rank, bits)
+        elif holder is not None:
+            found = holder.keys[at]
+            if limit is not None and found > limit:
+                found = None
+            else:
+                holder.set_key(at, node.pop_key(-1, bits), bits)
+        else:
+            found = None
+
+        if self.root.n == 0 and not self.root.leaf:
+            self.root = self.root.children[0]
+        if found is not None:
+            self._removed(found)
+        return found
+
+    def successor(self, key):
+        """Smallest key strictly greater than key, or None."""
+        best = None
+        node = self.root
+        while True:
+            rank = self._find_rank_in_node(key, node)
+            if rank < node.n:
+                best = node.keys[rank]
+            if node.leaf:
+                return best
+            node = node.children[rank]
+
+    def predecessor(self, key):
+        """Largest key strictly smaller than key, or None."""
+        best = None
+        node = self.root
+        while True:
+            rank = self._find_rank_in_node(key - 1, node)
+            if rank > 0:
+                best = node.keys[rank - 1]
+            if node.leaf:
+                return best
+            node = node.children[rank]
+
+    def iter_keys(self):
+        """Lazily yield every key in ascending order."""
+        return self.iter_range(0, self._key_mask)
+
+    def iter_range(self, lo, hi):
+        """Lazily yield the keys with lo <= key <= hi in ascending order."""
+        # descend towards lo; each stack entry is (node, index of the next key to yield)
+        stack = []
+        node = self.root
+        while True:
+            rank = self._find_rank_in_node(lo - 1, node)
+            stack.append((node, rank))
+            if node.leaf:
+                break
+            node = node.children[rank]
+
+        while stack:
+            node, i = stack.pop()
+            if i >= node.n:
+                continue
+            key = node.keys[i]
+            if key > hi:
+                return
+            yield key
+            stack.append((node, i + 1))
+            if not node.leaf:
+                # continue with the leftmost path of the subtree right of key
+                child = node.children[i + 1]
+                while True:
+                    stack.append((child, 0))
+                    if child.leaf:
+                        break
+                    child = child.children[0]
+
+    def is_empty(self):
+        return self._size == 0
+    
+    def get_all_keys(self):
+        """Returns a list of all keys in the tree, in ascending order."""
+        return list(self.iter_keys())
@@ -0,0 +1,239 @@
+"""
+Load a transit network into a station_lines_graph.Graph from a data file,
+instead of hard-coding station lists and edge pairs.
+
+Records, one per CSV row (header: kind,from,to,minutes,line,x,y) or per
+JSON object with the same keys:
+    station   from=name, optional x,y map position
+    segment   from,to on a line; minutes defaults to 1
+    transfer  walk between from and to; line is recorded as "transfer"
+Segments and transfers are two-way: the reverse edge is added automatically.
+Stations are created the first time any record names them, so station rows
+are only needed for coordinates (or for stations with no edges yet).
+
+.csv and .jsonl (one object per line) files are streamed record by record;
+a .json file holds a list of record objects and is parsed in one go.
+
+After a parse, the graph is cached in binary form next to the source
+(<source>.graphcache), tagged with the source's size and mtime. Later loads
+of an unchanged source read the cache and skip parsing.
+
+Cache layout (little-endian):
+    header  40 bytes: magic (4s), version (B), 3 pad bytes, source mtime_ns (q),
+            source size (Q), stations (I), edges (I), line labels (I), 4 pad bytes
+    names   stations' names, then line labels, each block "\\0"-joined UTF-8
+            behind its byte length (Q)
+    arrays  offsets i[stations + 1], targets i[edges], minutes d[edges],
+            line ids h[edges] (-1 for none), coords d[2 * stations] (NaN if unset)
+"""
+import csv
+import json
+import math
+import os
+import sys
+from array import array
+from struct import Struct, error as StructError
+
+from station_lines_graph import TRANSFER_LINE, Graph
+
+CACHE_SUFFIX = ".graphcache"
+CACHE_MAGIC = b"GRPH"
+CACHE_VERSION = 1
+CACHE_HEADER = Struct("<4sBxxxqQIII4x")
+LENGTH = Struct("<Q")
+FIELDS = ("kind", "from", "to", "minutes", "line", "x", "y")
+KINDS = ("station", "segment", "transfer")
+
+# The Metro Manila rail network the train-stations simulator runs on
+METRO_MANILA_RAIL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "metro_manila_rail.csv")
+
+
+def load_network(path, cache=True):
+    """
+    Graph of the network in path (.csv, .jsonl or .json). With cache=True,
+    an up-to-date <path>.graphcache is used instead of parsing, and a fresh
+    one is written after parsing; a cache that can't be written is skipped.
+    """
+    stat = os.stat(path)
+    cache_path = path + CACHE_SUFFIX
+    if cache and os.path.exists(cache_path):
+        graph = _read_cache(cache_path, stat)
+        if graph is not None:
+            return graph
+    graph = parse_network(path)
+    if cache:
+        try:
+            _write_cache(graph, cache_path, stat)
+        except OSError:
+            pass
+    return graph
+
+
+def parse_network(path):
+    """Parse path into a new Graph in one streaming pass, without touching any cache."""
+    graph = Graph()
+    vertices, weights, lines = graph.vertices, graph.weights, graph.lines
+
+    def add_station(name):
+        if name not in vertices:
+            vertices[name] = []
+            weights[name] = []
+            lines[name] = []
+
+    for where, (kind, source, target, minutes, line, x, y) in _records(path):
+        if not source:
+            raise ValueError(f"{where}: record has no 'from' station")
+        add_station(source)
+        if kind == "station":
+            if x not in (None, "") and y not in (None, ""):
+                graph.coords[source] = (_number(x, where, "x"), _number(y, where, "y"))
+            continue
+        if kind not in KINDS:
+            raise ValueError(f"{where}: unknown record kind {kind!r}")
+        if not target:
+            raise ValueError(f"{where}: {kind} has no 'to' station")
+        add_station(target)
+        minutes = _number(minutes, where, "minutes") if minutes not in (None, "") else 1.0
+        if minutes < 0:
+            raise ValueError(f"{where}: {kind} {source} -> {target} has negative travel time {minutes}")
+        line = TRANSFER_LINE if kind == "transfer" else (line or None)
+        for a, b in ((source, target), (target, source)):
+            vertices[a].append(b)
+            weights[a].append(minutes)
+            lines[a].append(line)
+    graph.invalidate_routes()
+    return graph
+
+
+def _number(value, where, field):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: {field} {value!r} is not a number") from None
+
+
+def _records(path):
+    """Yield (location for error messages, (kind, from, to, minutes, line, x, y)) per record."""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline="" if extension == ".csv" else None, encoding="utf-8") as f:
+        if extension == ".csv":
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None or tuple(column.strip() for column in header) != FIELDS:
+                raise ValueError(f"{path}: expected the CSV header {','.join(FIELDS)}")
+            for row in reader:
+                if len(row) > len(FIELDS):
+                    raise ValueError(f"{path}:{reader.line_num}: expected at most {len(FIELDS)} fields, got {len(row)}")
+                if row:
+                    yield f"{path}:{reader.line_num}", tuple(row) + ("",) * (len(FIELDS) - len(row))
+        elif extension == ".jsonl":
+            for number, text in enumerate(f, 1):
+                if text.strip():
+                    record = json.loads(text)
+                    yield f"{path}:{number}", tuple(record.get(field) for field in FIELDS)
+        elif extension == ".json":
+            for number, record in enumerate(json.load(f)):
+                yield f"{path}[{number}]", tuple(record.get(field) for field in FIELDS)
+        else:
+            raise ValueError(f"Unsupported network file type {extension!r}: use .csv, .jsonl or .json")
+
+
+def _write_cache(graph, cache_path, stat):
+    names = list(graph.vertices)
+    index = {name: i for i, name in enumerate(names)}
+    line_names = []
+    line_index = {None: -1}
+    offsets = array("i", [0])
+    targets = array("i")
+    minutes = array("d")
+    line_ids = array("h")
+    coords = array("d")
+    for name in names:
+        targets.extend(index[target] for target in graph.vertices[name])
+        minutes.extend(graph.weights[name])
+        for line in graph.lines[name]:
+            if line not in line_index:
+                line_index[line] = len(line_names)
+                line_names.append(line)
+            line_ids.append(line_index[line])
+        offsets.append(len(targets))
+        coords.extend(graph.coords.get(name, (math.nan, math.nan)))
+
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, stat.st_mtime_ns, stat.st_size,
+                                  len(names), len(targets), len(line_names)))
+        for block in ("\0".join(names), "\0".join(line_names)):
+            data = block.encode("utf-8")
+            f.write(LENGTH.pack(len(data)))
+            f.write(data)
+        for buf in (offsets, targets, minutes, line_ids, coords):
+            if sys.byteorder == "big":
+                buf.byteswap()
+            buf.tofile(f)
+    os.replace(tmp_path, cache_path)
+
+
+def _read_cache(cache_path, stat):
+    """The cached Graph, or None if the cache is stale, truncated or corrupt."""
+    try:
+        return _parse_cache(cache_path, stat)
+    except (StructError, UnicodeDecodeError, IndexError, ValueError, OSError):
+        return None
+
+
+def _parse_cache(cache_path, stat):
+    with open(cache_path, "rb") as f:
+        data = f.read()
+    if len(data) < CACHE_HEADER.size:
+        return None
+    magic, version, mtime_ns, size, n_stations, n_edges, n_lines = CACHE_HEADER.unpack_from(data)
+    if magic != CACHE_MAGIC or version != CACHE_VERSION or (mtime_ns, size) != (stat.st_mtime_ns, stat.st_size):
+        return None
+
+    pos = CACHE_HEADER.size
+    blocks = []
+    for _ in range(2):
+        (length,) = LENGTH.unpack_from(data, pos)
+        pos += LENGTH.size
+        blocks.append(data[pos:pos + length].decode("utf-8"))
+        pos += length
+    names = blocks[0].split("\0") if n_stations else []
+    line_names = blocks[1].split("\0") if n_lines else []
+    line_names.append(None)         # line id -1
+
+    arrays = []
+    for typecode, count in (("i", n_stations + 1), ("i", n_edges), ("d", n_edges), ("h", n_edges), ("d", 2 * n_stations)):
+        buf = array(typecode)
+        end = pos + buf.itemsize * count
+        if end > len(data):
+            return None
+        buf.frombytes(data[pos:end])
+        if sys.byteorder == "big":
+            buf.byteswap()
+        arrays.append(buf)
+        pos = end
+    if pos != len(data) or len(names) != n_stations or len(line_names) != n_lines + 1:
+        return None
+    offsets, targets, minutes, line_ids, coords = arrays
+    # out-of-range ids would otherwise be wrapped by negative indexing
+    if offsets[0] != 0 or offsets[-1] != n_edges or any(a > b for a, b in zip(offsets, offsets[1:])):
+        return None
+    if targets and (min(targets) < 0 or max(targets) >= n_stations):
+        return None
+    if line_ids and (min(line_ids) < -1 or max(line_ids) >= n_lines):
+        return None
+
+    # translate whole arrays at once, then hand each station its slice
+    offsets = offsets.tolist()
+    spans = list(zip(offsets, offsets[1:]))
+    target_names = list(map(names.__getitem__, targets))
+    minutes = minutes.tolist()
+    lines = list(map(line_names.__getitem__, line_ids))
+    graph = Graph()
+    graph.vertices.update(zip(names, [target_names[lo:hi] for lo, hi in spans]))
+    graph.weights.update(zip(names, [minutes[lo:hi] for lo, hi in spans]))
+    graph.lines.update(zip(names, [lines[lo:hi] for lo, hi in spans]))
+    graph.coords.update((name, (x, y)) for name, x, y in zip(names, coords[0::2], coords[1::2]) if not math.isnan(x))
+    graph.invalidate_routes()
+    return graph
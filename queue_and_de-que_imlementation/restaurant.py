@@ -1,60 +1,516 @@
-from fusion_tree import FusionTree
-
-class Restaurant:
-    def __init__(self):
-        # 3 tables each for 2, 4, and 8 seats
-        self.tables = {
-            2: FusionTree(),
-            4: FusionTree(),
-            8: FusionTree()
-        }
-
-        # Pre-fill with available table IDs
-        for size in self.tables:
-            for i in range(1, 4):
-                table_id = int(f"{size}{i}")
-                self.tables[size].insert(table_id)
-
-        self.queue = []  # waiting customers
-
-    def walk_in(self, customer_name, party_size):
-        """Customer arrives for dining"""
-        tree = self.tables.get(party_size)
-        if tree and not tree.is_empty():
-            table_id = tree.get_min()
-            tree.delete(table_id)
-            return f"Assigned {table_id} to {customer_name}"
-        else:
-            self.queue.append((customer_name, party_size))
-            return f"No table available for {customer_name}, added to queue"
-
-    def finish_meal(self, table_size, table_id):
-        """Free a table and assign next in queue if possible"""
-        # Re-insert the freed table
-        self.tables[table_size].insert(table_id)
-
-        # Check queue
-        for i, (name, size) in enumerate(self.queue):
-            if size == table_size:
-                assigned_table = self.tables[table_size].get_min()
-                self.tables[table_size].delete(assigned_table)
-                self.queue.pop(i)
-                return f"Table {assigned_table} Has Finished their Meal -> Reassigned to {name}"
-        return f"Table {table_id} is now free"
-
-    def cancel_customer(self, customer_name):
-        """Cancel reservation from queue"""
-        for i, (name, size) in enumerate(self.queue):
-            if name == customer_name:
-                self.queue.pop(i)
-                return f"{customer_name}'s request cancelled"
-        return f"{customer_name} not found in queue"
-
-    def status(self):
-        return {
-            "available_tables": {
-                size: tree.get_all_keys() for size, tree in self.tables.items()
-            },
-            "queue": self.queue
-        }
-
+import math
+from collections import deque
+from itertools import count
+
+from fusion_tree import FusionTree
+
+# capacity -> number of tables; table ids are the capacity followed by 1..count (21, 22, 23, 41, ...)
+DEFAULT_TABLES = {2: 3, 4: 3, 8: 3}
+# free tables are indexed by (capacity << TABLE_ID_BITS) | table_id, so key order is capacity first
+TABLE_ID_BITS = 32
+TABLE_ID_MASK = (1 << TABLE_ID_BITS) - 1
+# reservation start times per table; wider nodes keep lookups shallow with many bookings
+SCHEDULE_BRANCHING = 16
+
+
+class WaitingParty:
+    """One queue entry. Cancelling or seating a party only flips active; the
+    entry is dropped later when it reaches the front of its deque."""
+    __slots__ = ("name", "party_size", "seq", "active")
+
+    def __init__(self, name, party_size, seq):
+        self.name = name
+        self.party_size = party_size
+        self.seq = seq              # arrival order across all party sizes
+        self.active = True
+
+
+class GapNode:
+    __slots__ = ("start", "end", "left", "right", "height", "longest")
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.left = None
+        self.right = None
+        self.height = 1
+        self.longest = end - start      # longest gap in this subtree
+
+
+class FreeGaps:
+    """
+    The free [start, end) stretches of one table (end may be math.inf), in an
+    AVL tree keyed by start where every node also knows the longest gap below
+    it. That lets first_fitting() skip whole subtrees of short gaps, so the
+    earliest gap long enough for a booking is found in O(log n).
+    """
+    __slots__ = ("root",)
+
+    def __init__(self):
+        self.root = GapNode(0, math.inf)
+
+    def containing(self, t):
+        """The gap node with start <= t < end, or None if minute t is booked."""
+        node, best = self.root, None
+        while node is not None:
+            if node.start <= t:
+                best = node
+                node = node.right
+            else:
+                node = node.left
+        return best if best is not None and t < best.end else None
+
+    def first_fitting(self, t, duration):
+        """The earliest gap starting at or after t that is at least duration long, or None."""
+        return self._first_fitting(self.root, t, duration)
+
+    def _first_fitting(self, node, t, duration):
+        if node is None or node.longest < duration:
+            return None
+        if node.start < t:
+            return self._first_fitting(node.right, t, duration)
+        found = self._first_fitting(node.left, t, duration)
+        if found is not None:
+            return found
+        if node.end - node.start >= duration:
+            return node
+        # everything right of node starts after t, so this is a single guided descent
+        return self._first_fitting(node.right, t, duration)
+
+    def book(self, start, end):
+        """Take [start, end) out of the gap that contains it."""
+        gap = self.containing(start)
+        gap_start, gap_end = gap.start, gap.end
+        self.root = self._delete(self.root, gap_start)
+        if gap_start < start:
+            self.root = self._insert(self.root, GapNode(gap_start, start))
+        if end < gap_end:
+            self.root = self._insert(self.root, GapNode(end, gap_end))
+
+    @staticmethod
+    def _height(node):
+        return node.height if node else 0
+
+    def _update(self, node):
+        left, right = node.left, node.right
+        node.height = 1 + max(self._height(left), self._height(right))
+        node.longest = max(node.end - node.start, left.longest if left else 0, right.longest if right else 0)
+
+    def _rotate_right(self, node):
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _rotate_left(self, node):
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _rebalance(self, node):
+        self._update(node)
+        balance = self._height(node.left) - self._height(node.right)
+        if balance > 1:
+            if self._height(node.left.left) < self._height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            if self._height(node.right.right) < self._height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        return node
+
+    def _insert(self, node, new):
+        if node is None:
+            return new
+        if new.start < node.start:
+            node.left = self._insert(node.left, new)
+        else:
+            node.right = self._insert(node.right, new)
+        return self._rebalance(node)
+
+    def _delete(self, node, start):
+        if start < node.start:
+            node.left = self._delete(node.left, start)
+        elif start > node.start:
+            node.right = self._delete(node.right, start)
+        else:
+            if node.left is None or node.right is None:
+                return node.left or node.right
+            # replace by the smallest gap of the right subtree
+            successor = node.right
+            while successor.left is not None:
+                successor = successor.left
+            node.right = self._delete(node.right, successor.start)
+            node.start, node.end = successor.start, successor.end
+        return self._rebalance(node)
+
+
+class TableSchedule:
+    """
+    Bookings of one table as non-overlapping [start, end) intervals in minutes:
+    a FusionTree over the start times plus start -> (end, name). Overlap
+    checks only look at the neighbouring bookings; next_free() asks the
+    FreeGaps index of the stretches in between.
+    """
+    __slots__ = ("starts", "bookings", "gaps_index", "seated")
+
+    def __init__(self):
+        self.starts = FusionTree(branching=SCHEDULE_BRANCHING)
+        self.bookings = {}          # start -> (end, name)
+        self.gaps_index = FreeGaps()
+        self.seated = set()         # starts of bookings whose party has checked in
+
+    def __len__(self):
+        return len(self.bookings)
+
+    def _covering(self, t):
+        """End of the booking that contains minute t, or None."""
+        start = t if t in self.bookings else self.starts.predecessor(t)
+        if start is not None:
+            end = self.bookings[start][0]
+            if end > t:
+                return end
+        return None
+
+    def is_free(self, start, end):
+        if self._covering(start) is not None:
+            return False
+        following = self.starts.successor(start)
+        return following is None or following >= end
+
+    def add(self, start, end, name):
+        self.starts.insert(start)
+        self.bookings[start] = (end, name)
+        self.gaps_index.book(start, end)
+
+    def next_free(self, t, duration):
+        """Earliest start >= t with duration free minutes."""
+        gap = self.gaps_index.containing(t)
+        if gap is not None and gap.end - t >= duration:
+            return t
+        return self.gaps_index.first_fitting(t + 1, duration).start
+
+    def gaps(self, lo, hi):
+        """Lazily yield the free (start, end) stretches inside [lo, hi)."""
+        t = self._covering(lo) or lo
+        for start in self.starts.iter_range(t, hi - 1):
+            if start > t:
+                yield t, start
+            t = max(t, self.bookings[start][0])
+        if t < hi:
+            yield t, hi
+
+
+class Restaurant:
+    POLICIES = ("best_fit", "exact")
+
+    def __init__(self, tables=None, policy="best_fit", walk_in_minutes=60):
+        """
+        tables: {capacity: count}, defaulting to 3 tables each for 2, 4, and 8 seats.
+        policy="best_fit" seats a party at the smallest free table that fits it;
+        policy="exact" only uses tables whose capacity equals the party size.
+        walk_in_minutes: how long a walk-in is expected to stay; when a time is
+        given, walk-ins only get tables with no reservation in that stretch.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown seating policy: {policy!r}")
+        self.policy = policy
+        self.walk_in_minutes = walk_in_minutes
+        tables = DEFAULT_TABLES if tables is None else tables
+        self.capacities = sorted(tables)
+        self.table_capacity = {}    # table_id -> capacity
+
+        # one ordered index over every free table, smallest capacity first
+        self.free_tables = FusionTree()
+        for size in self.capacities:
+            if size < 1 or tables[size] < 0:
+                raise ValueError(f"Invalid table layout entry {size}: {tables[size]}")
+            for i in range(1, tables[size] + 1):
+                table_id = int(f"{size}{i}")
+                if table_id in self.table_capacity or table_id >> TABLE_ID_BITS:
+                    raise ValueError(f"Table id {table_id} is ambiguous in this layout")
+                self.table_capacity[table_id] = size
+                self._release_table(size, table_id)
+        self._seatable = {size for size in self.capacities if tables[size]}
+        self._largest = max(self._seatable, default=0)
+        self.schedules = {}         # table_id -> TableSchedule, created on its first booking
+
+        # waiting customers: one FIFO deque per party size, plus a name index so
+        # cancelling doesn't scan; both may hold inactive entries until popped
+        self.waiting = {}           # party_size -> deque of WaitingParty
+        self._by_name = {}          # name -> deque of WaitingParty, oldest first
+        self._waiting_count = 0
+        self._arrivals = count()
+
+    @property
+    def queue(self):
+        """Waiting customers as (name, party_size) in arrival order."""
+        parties = [p for line in self.waiting.values() for p in line if p.active]
+        parties.sort(key=lambda p: p.seq)
+        return [(p.name, p.party_size) for p in parties]
+
+    def queue_length(self):
+        return self._waiting_count
+
+    def _enqueue(self, customer_name, party_size):
+        party = WaitingParty(customer_name, party_size, next(self._arrivals))
+        self.waiting.setdefault(party_size, deque()).append(party)
+        self._by_name.setdefault(customer_name, deque()).append(party)
+        self._waiting_count += 1
+
+    def _release_table(self, capacity, table_id):
+        self.free_tables.insert(capacity << TABLE_ID_BITS | table_id)
+
+    def _take_table(self, party_size, now=None):
+        """
+        Remove and return the best free table for the party under the policy, or
+        None. With a time, tables booked within walk_in_minutes of it are skipped.
+        """
+        if now is not None:
+            start, end = self._walk_in_slot(now)
+        lo = party_size << TABLE_ID_BITS
+        hi = ((party_size + 1) << TABLE_ID_BITS) - 1 if self.policy == "exact" else None
+        if now is None or not self.schedules:
+            key = self.free_tables.pop_ceiling(lo, hi)
+            return None if key is None else key & TABLE_ID_MASK
+
+        held = []       # free tables booked during the stay, put back below
+        while True:
+            key = self.free_tables.pop_ceiling(lo, hi)
+            if key is None:
+                break
+            schedule = self.schedules.get(key & TABLE_ID_MASK)
+            if schedule is None or schedule.is_free(start, end):
+                break
+            held.append(key)
+            lo = key + 1
+        for table in held:
+            self.free_tables.insert(table)
+        return None if key is None else key & TABLE_ID_MASK
+
+    def _first_waiting_for(self, capacity):
+        """The earliest-arrived active party a table of this capacity can seat, or None."""
+        sizes = [capacity] if self.policy == "exact" else self.waiting
+        first = None
+        for size in sizes:
+            line = self.waiting.get(size)
+            if size > capacity or not line:
+                continue
+            while line and not line[0].active:
+                line.popleft()
+            if line and (first is None or line[0].seq < first.seq):
+                first = line[0]
+        return first
+
+    def _next_waiting(self, party_size):
+        """Pop the first active party waiting for party_size, or None."""
+        line = self.waiting.get(party_size)
+        while line:
+            party = line.popleft()
+            if party.active:
+                party.active = False
+                self._waiting_count -= 1
+                # parties with one name are usually seated in order, so this
+                # keeps the name index from holding on to seated entries
+                entries = self._by_name[party.name]
+                while entries and not entries[0].active:
+                    entries.popleft()
+                if not entries:
+                    del self._by_name[party.name]
+                return party
+        return None
+
+    def _seat(self, customer_name, party_size, now=None):
+        """
+        Take a free table for the party; returns its id, or None after queueing
+        them. Parties no table could ever seat are not queued.
+        """
+        table_id = self._take_table(party_size, now)
+        if table_id is None and self._can_ever_seat(party_size):
+            self._enqueue(customer_name, party_size)
+        return table_id
+
+    def _can_ever_seat(self, party_size):
+        if self.policy == "exact":
+            return party_size in self._seatable
+        return party_size <= self._largest
+
+    def _free_table(self, table_size, table_id, now=None):
+        """Release a table; returns (name, table_id) if a waiting party takes a table."""
+        if self.table_capacity.get(table_id) != table_size:
+            raise ValueError(f"No table {table_id} with {table_size} seats in this restaurant")
+        if self.free_tables.search(table_size << TABLE_ID_BITS | table_id):
+            raise ValueError(f"Table {table_id} is already free")
+        self._release_table(table_size, table_id)
+        party = self._first_waiting_for(table_size)
+        if party is None:
+            return None
+        seated_at = self._take_table(party.party_size, now)
+        if seated_at is None:
+            # every table that fits is held for an upcoming reservation
+            return None
+        self._next_waiting(party.party_size)
+        return party.name, seated_at
+
+    def _cancel(self, customer_name):
+        """Drop the oldest waiting party with this name; returns True if there was one."""
+        entries = self._by_name.get(customer_name)
+        while entries:
+            party = entries.popleft()
+            if party.active:
+                party.active = False
+                self._waiting_count -= 1
+                if not entries:
+                    del self._by_name[customer_name]
+                return True
+        self._by_name.pop(customer_name, None)
+        return False
+
+    def walk_in(self, customer_name, party_size, now=None):
+        """Customer arrives for dining (at minute `now`, if reservations should be respected)"""
+        table_id = self._seat(customer_name, party_size, now)
+        if table_id is not None:
+            return f"Assigned {table_id} to {customer_name}"
+        if not self._can_ever_seat(party_size):
+            return f"No table can seat a party of {party_size}"
+        return f"No table available for {customer_name}, added to queue"
+
+    def finish_meal(self, table_size, table_id, now=None):
+        """Free a table and assign next in queue if possible"""
+        assignment = self._free_table(table_size, table_id, now)
+        if assignment is not None:
+            name, assigned_table = assignment
+            return f"Table {assigned_table} Has Finished their Meal -> Reassigned to {name}"
+        return f"Table {table_id} is now free"
+
+    def cancel_customer(self, customer_name):
+        """Cancel reservation from queue"""
+        if self._cancel(customer_name):
+            return f"{customer_name}'s request cancelled"
+        return f"{customer_name} not found in queue"
+
+    def process_batch(self, events):
+        """
+        Apply a stream of events in order and return every seating made, as a
+        list of (customer_name, table_id). Events are tuples:
+            ("arrive", name, party_size[, now])
+            ("finish", table_size, table_id[, now])
+            ("cancel", name)
+        where the optional minute `now` makes seating respect reservations.
+        """
+        assignments = []
+        seat = self._seat
+        free_table = self._free_table
+        cancel = self._cancel
+        for event in events:
+            kind = event[0]
+            if kind == "arrive":
+                table_id = seat(event[1], event[2], event[3] if len(event) > 3 else None)
+                if table_id is not None:
+                    assignments.append((event[1], table_id))
+            elif kind == "finish":
+                assignment = free_table(event[1], event[2], event[3] if len(event) > 3 else None)
+                if assignment is not None:
+                    assignments.append(assignment)
+            elif kind == "cancel":
+                cancel(event[1])
+            else:
+                raise ValueError(f"Unknown restaurant event: {kind!r}")
+        return assignments
+
+    def _fitting_tables(self, party_size):
+        """Ids of the tables that can seat the party under the policy, smallest first."""
+        # table_capacity was filled in capacity order, so it is already sorted that way
+        return [
+            table_id for table_id, capacity in self.table_capacity.items()
+            if capacity == party_size or (self.policy == "best_fit" and capacity > party_size)
+        ]
+
+    def _walk_in_slot(self, now):
+        """
+        Whole minutes [start, end) a walk-in at `now` is expected to hold a table.
+        Fractional times (the simulator's clock) are widened to the minutes they touch.
+        """
+        if isinstance(now, bool) or not isinstance(now, (int, float)) or not now >= 0 or math.isinf(now):
+            raise ValueError(f"Walk-in times need a finite minute >= 0, got {now!r}")
+        return math.floor(now), math.ceil(now + self.walk_in_minutes)
+
+    @staticmethod
+    def _check_slot(start, duration):
+        if not isinstance(start, int) or not isinstance(duration, int) or start < 0 or duration < 1:
+            raise ValueError(f"Reservations need whole minutes: start >= 0 and duration >= 1, got {start}, {duration}")
+
+    def reserve(self, customer_name, party_size, start, duration):
+        """
+        Book the best-fitting table that is free for [start, start + duration)
+        minutes. Returns its table id, or None if every table that fits is taken.
+        """
+        self._check_slot(start, duration)
+        end = start + duration
+        for table_id in self._fitting_tables(party_size):
+            schedule = self.schedules.get(table_id)
+            if schedule is None:
+                schedule = self.schedules[table_id] = TableSchedule()
+            elif not schedule.is_free(start, end):
+                continue
+            schedule.add(start, end, customer_name)
+            return table_id
+        return None
+
+    def available_slots(self, party_size, window):
+        """
+        Free stretches inside window=(start, end) on every table that fits the
+        party, as (table_id, free_from, free_until), smallest tables first.
+        """
+        lo, hi = window
+        slots = []
+        for table_id in self._fitting_tables(party_size):
+            schedule = self.schedules.get(table_id)
+            if schedule is None:
+                slots.append((table_id, lo, hi))
+            else:
+                slots.extend((table_id, a, b) for a, b in schedule.gaps(lo, hi))
+        return slots
+
+    def next_free_slot(self, party_size, after, duration):
+        """Earliest (start, table_id) at or after `after` with `duration` free minutes, or None."""
+        self._check_slot(after, duration)
+        best = None
+        for table_id in self._fitting_tables(party_size):
+            schedule = self.schedules.get(table_id)
+            start = after if schedule is None else schedule.next_free(after, duration)
+            if best is None or start < best[0]:
+                best = (start, table_id)
+        return best
+
+    def check_in(self, table_id, start):
+        """
+        Seat the party booked on table_id at minute start. Returns their name,
+        or None while the table is still occupied. A booking can be checked in once.
+        """
+        schedule = self.schedules.get(table_id)
+        if schedule is None or start not in schedule.bookings:
+            raise ValueError(f"No reservation on table {table_id} at {start}")
+        if start in schedule.seated:
+            raise ValueError(f"The reservation on table {table_id} at {start} has already checked in")
+        key = self.table_capacity[table_id] << TABLE_ID_BITS | table_id
+        if not self.free_tables.search(key):
+            return None
+        self.free_tables.delete(key)
+        schedule.seated.add(start)
+        return schedule.bookings[start][1]
+
+    def status(self):
+        available = {size: [] for size in self.capacities}
+        for key in self.free_tables:
+            available[key >> TABLE_ID_BITS].append(key & TABLE_ID_MASK)
+        return {
+            "available_tables": available,
+            "queue": self.queue
+        }
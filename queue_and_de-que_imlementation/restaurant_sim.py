@@ -0,0 +1,134 @@
+"""
+Discrete-event simulation of a Restaurant: arrivals and meal ends are kept in
+one heap ordered by time and fed to Restaurant.process_batch, so a run covers
+millions of events without any real waiting.
+
+Distributions are given as (random.Random method name, *args), e.g.
+("expovariate", 7 / 60) for Poisson arrivals at 7 per hour, or
+("uniform", 30, 90) for meals of 30 to 90 minutes. All times are in minutes.
+The same seed always replays the same evening.
+"""
+import heapq
+import random
+from itertools import product
+from multiprocessing import Pool
+
+from restaurant import Restaurant
+
+# party size -> share of arrivals
+DEFAULT_PARTY_MIX = {1: 0.10, 2: 0.35, 3: 0.15, 4: 0.20, 5: 0.08, 6: 0.07, 8: 0.05}
+
+
+def _percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list (0 for an empty list)."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def simulate(hours=8, tables=None, policy="best_fit", interarrival=("expovariate", 7 / 60),
+             meal_time=("uniform", 30, 90), party_mix=None, seed=0, sample_every=15):
+    """
+    Run one evening: parties arrive for `hours`, then the restaurant keeps
+    serving until everyone who queued has eaten. Returns a dict with
+    throughput (parties and covers per hour, from opening until the last
+    table is cleared), wait percentiles, and queue_samples, the queue length
+    every `sample_every` minutes.
+    """
+    rng = random.Random(seed)
+    restaurant = Restaurant(tables=tables, policy=policy)
+    process = restaurant.process_batch
+    mix = DEFAULT_PARTY_MIX if party_mix is None else party_mix
+    sizes = list(mix)
+    weights = list(mix.values())
+    next_gap = getattr(rng, interarrival[0])
+    gap_args = interarrival[1:]
+    next_meal = getattr(rng, meal_time[0])
+    meal_args = meal_time[1:]
+    close = hours * 60
+
+    # heap entries: (time, seq, kind, a, b); kind 0 = arrival (party id, size),
+    # kind 1 = meal end (capacity, table_id). seq breaks ties in event order.
+    events = []
+    first = next_gap(*gap_args)
+    if first < close:
+        events.append((first, 0, 0, 0, rng.choices(sizes, weights)[0]))
+    seq = 1
+    arrivals = len(events)
+    arrived_at = {}
+    waits = []
+    covers = 0
+    turned_away = 0
+    queue_samples = []
+    next_sample = 0
+    processed = 0
+    now = 0.0
+
+    while events:
+        now, _, kind, a, b = heapq.heappop(events)
+        processed += 1
+        while next_sample <= now:
+            queue_samples.append((next_sample, restaurant.queue_length()))
+            next_sample += sample_every
+
+        if kind == 0:
+            arrived_at[a] = (now, b)
+            waiting = restaurant.queue_length()
+            seatings = process([("arrive", a, b)])
+            if not seatings and restaurant.queue_length() == waiting:
+                # no table could ever seat this party, so it was not queued
+                del arrived_at[a]
+                turned_away += 1
+            arrival = now + next_gap(*gap_args)
+            if arrival < close:
+                heapq.heappush(events, (arrival, seq, 0, a + 1, rng.choices(sizes, weights)[0]))
+                seq += 1
+                arrivals += 1
+        else:
+            seatings = process([("finish", a, b)])
+
+        for party, table_id in seatings:
+            arrival, size = arrived_at.pop(party)
+            waits.append(now - arrival)
+            covers += size
+            heapq.heappush(events, (now + next_meal(*meal_args), seq, 1,
+                                    restaurant.table_capacity[table_id], table_id))
+            seq += 1
+
+    waits.sort()
+    served = len(waits)
+    span_hours = max(now, close) / 60
+    return {
+        "events": processed,
+        "parties": arrivals,
+        "served": served,
+        "turned_away": turned_away,
+        "parties_per_hour": served / span_hours,
+        "covers_per_hour": covers / span_hours,
+        "mean_wait": sum(waits) / served if served else 0.0,
+        "wait_p50": _percentile(waits, 50),
+        "wait_p95": _percentile(waits, 95),
+        "wait_p99": _percentile(waits, 99),
+        "max_queue": max((length for _, length in queue_samples), default=0),
+        "queue_samples": queue_samples,
+    }
+
+
+def _run_config(config):
+    result = simulate(**config)
+    del result["queue_samples"]     # keep what goes back through the pool small
+    return config, result
+
+
+def sweep(grid, processes=None, **base):
+    """
+    Simulate every combination of the values in grid ({parameter: [values]})
+    on top of the fixed simulate() arguments in base, spread over a
+    multiprocessing pool. Returns [(config, result)] in grid order, with
+    queue_samples dropped from each result.
+    """
+    names = list(grid)
+    configs = [dict(base, **dict(zip(names, values))) for values in product(*grid.values())]
+    with Pool(processes) as pool:
+        return pool.map(_run_config, configs)
@@ -0,0 +1,114 @@
+"""
+Compact on-disk snapshots of a sorted integer key set, used by FusionTree and BST.
+
+File layout (little-endian):
+    header  32 bytes: magic (4s), version (B), typecode (c), 2 pad bytes,
+            param_a (I), param_b (I), count (Q), 8 pad bytes
+    keys    count 8-byte words in ascending order, as array(typecode)
+
+The structure that owns the file picks the magic and what the two params mean
+(e.g. word_bits and branching for a FusionTree). Opening a snapshot maps the
+file with mmap, so it costs O(1) whatever its size: keys are paged in only as
+lookups touch them, and a full tree can be rebuilt later through the bulk
+loaders.
+"""
+import mmap
+import os
+import sys
+from array import array
+from bisect import bisect_left
+from struct import Struct
+
+HEADER = Struct("<4sBcxxIIQ8x")
+VERSION = 1
+KEY_TYPECODES = ("q", "Q")    # signed / unsigned 64-bit keys
+
+
+def write_keys(path, magic, typecode, params, keys):
+    """
+    Write keys (already in ascending order) to path behind a header.
+    The file is written next to path and renamed over it, so a crash mid-save
+    never leaves a truncated snapshot behind.
+    """
+    if typecode not in KEY_TYPECODES:
+        raise ValueError(f"Unsupported snapshot typecode: {typecode!r}")
+    buf = array(typecode, keys)
+    if sys.byteorder == "big":
+        buf.byteswap()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(magic, VERSION, typecode.encode(), params[0], params[1], len(buf)))
+        buf.tofile(f)
+    os.replace(tmp_path, path)
+
+
+class KeySnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file. keys is a sequence
+    over the mapped buffer, so membership, rank and range queries work by
+    binary search straight away, before (or instead of) building a tree.
+    Use it as a context manager, or call close() when done.
+    """
+
+    def __init__(self, path, magic):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = None
+        try:
+            if len(self._mm) < HEADER.size:
+                raise ValueError(f"{path} is too short to be a snapshot")
+            file_magic, version, typecode, param_a, param_b, count = HEADER.unpack_from(self._mm)
+            if file_magic != magic:
+                raise ValueError(f"{path} is not a {magic.decode()} snapshot")
+            if version != VERSION:
+                raise ValueError(f"Unsupported snapshot version {version} in {path}")
+            self.typecode = typecode.decode()
+            if self.typecode not in KEY_TYPECODES:
+                raise ValueError(f"Unsupported snapshot typecode {self.typecode!r} in {path}")
+            if len(self._mm) != HEADER.size + 8 * count:
+                raise ValueError(f"{path} is truncated: expected {count} keys")
+        except ValueError:
+            self._mm.close()
+            raise
+        self.params = (param_a, param_b)
+
+        if sys.byteorder == "little":
+            self._view = memoryview(self._mm)[HEADER.size:]
+            self.keys = self._view.cast(self.typecode)
+        else:
+            # big-endian hosts pay for one copy to swap the words into native order
+            self.keys = array(self.typecode, self._mm[HEADER.size:])
+            self.keys.byteswap()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        i = bisect_left(self.keys, key)
+        return i < len(self.keys) and self.keys[i] == key
+
+    def rank(self, key):
+        """Number of keys strictly smaller than key, matching BST.rank."""
+        return bisect_left(self.keys, key)
+
+    def iter_range(self, lo, hi):
+        """Lazily yield the keys with lo <= key <= hi in ascending order."""
+        keys = self.keys
+        for i in range(bisect_left(keys, lo), len(keys)):
+            key = keys[i]
+            if key > hi:
+                return
+            yield key
+
+    def close(self):
+        if self._view is not None:
+            self.keys.release()
+            self._view.release()
+            self._view = None
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
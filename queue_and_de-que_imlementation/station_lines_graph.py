@@ -1,216 +1,794 @@
-from collections import deque
+import heapq
+import math
+from array import array
+
+# Line label of a walking transfer between stations; such edges carry their own time
+TRANSFER_LINE = "transfer"
+# Approximate minutes to change trains between two lines that share a station
+LINE_CHANGE_MINUTES = 5
 
 class Graph:
-    def __init__(self):
+    def __init__(self, line_change_minutes=LINE_CHANGE_MINUTES):
         self.vertices = {}
+        # per source, parallel to vertices[source]: travel time and line label of each edge
+        self.weights = {}
+        self.lines = {}
+        # added by the weighted searches whenever a route leaves a station on a
+        # different line than it arrived on, without a TRANSFER_LINE walk between
+        self.line_change_minutes = line_change_minutes
+        self.coords = {}        # station -> (x, y) map position, used by the A* heuristic
+        # source -> BFS parent map of every station reachable from it, filled on
+        # demand by route(); any edit through the methods below empties it
+        self._routes = {}
+        self._fastest = {}      # source -> (times, parents) of a full Dijkstra, for fastest_route()
+        self._time_per_distance = None
+        self._frozen = None     # FrozenGraph the searches run over, rebuilt after any edit
     
     def add_vertex(self, vertex):
         self.vertices[vertex] = []
+        self.weights[vertex] = []
+        self.lines[vertex] = []
+        self.invalidate_routes()
 
-    def add_edge(self, source, target):
+    def add_edge(self, source, target, weight=1, line=None):
+        if weight < 0:
+            raise ValueError(f"Edge {source} -> {target} has negative travel time {weight}")
         self.vertices[source].append(target)
+        self.weights[source].append(weight)
+        self.lines[source].append(line)
+        self.invalidate_routes()
 
-    def add_edges_from(self, edges):
+    def add_edges_from(self, edges, weight=1, line=None):
         for source, target in edges:
-            self.add_edge(source, target)
-
-# -- MRT --
-
-mrt_stations = [
-    "North_Avenue",
-    "Quezon_Avenue",
-    "GMA_Kamuning",
-    "Araneta_Center-Cubao",
-    "Santolan-Anapolis",
-    "Ortigas",
-    "Shaw_Boulevard",
-    "Boni_Avenue",
-    "Guadalupe",
-    "Buendia",
-    "Ayala",
-    "Magallanes",
-    "Taft_Avenue"
-]
-
-mrt_edges = [
-    ("North_Avenue","Quezon_Avenue"),
-    ("Quezon_Avenue","GMA_Kamuning"),
-    ("Quezon_Avenue","North_Avenue"),
-    ("GMA_Kamuning","Araneta_Center-Cubao"),
-    ("GMA_Kamuning","Quezon_Avenue"),
-    ("Araneta_Center-Cubao","Santolan-Anapolis"),
-    ("Araneta_Center-Cubao","GMA_Kamuning"),
-    ("Santolan-Anapolis","Ortigas"),
-    ("Santolan-Anapolis","Araneta_Center-Cubao"),
-    ("Ortigas","Shaw_Boulevard"),
-    ("Ortigas","Santolan-Anapolis"),
-    ("Shaw_Boulevard","Boni_Avenue"),
-    ("Shaw_Boulevard","Ortigas"),
-    ("Boni_Avenue","Guadalupe"),
-    ("Boni_Avenue","Shaw_Boulevard"),
-    ("Guadalupe","Buendia"),
-    ("Guadalupe","Boni_Avenue"),
-    ("Buendia","Ayala"),
-    ("Buendia","Guadalupe"),
-    ("Ayala","Magallanes"),
-    ("Ayala","Buendia"),
-    ("Magallanes","Taft_Avenue"),
-    ("Magallanes","Ayala"),
-    ("Taft_Avenue","Magallanes")
-]
-
-
-# -- LRT2 --
-
-LRT2_stations = [
-    "Recto",
-    "Legarda",
-    "Pureza",
-    "V_Mapa",
-    "J_Ruiz",
-    "Gilmore",
-    "Betty_Go-Belmonte",
-    "Araneta_Center-Cubao",
-    "Anonas",
-    "Katipunan",
-    "Santolan",
-    "Marikina-Pasig",
-    "Antipolo"
-]
-
-LRT2_edges = [
-    ("Recto","Legarda"),
-    ("Legarda","Pureza"),
-    ("Legarda","Recto"),
-    ("Pureza","V_Mapa"),
-    ("Pureza","Legarda"),
-    ("V_Mapa","J_Ruiz"),
-    ("V_Mapa","Pureza"),
-    ("J_Ruiz","Gilmore"),
-    ("J_Ruiz","V_Mapa"),
-    ("Gilmore","Betty_Go-Belmonte"),
-    ("Gilmore","J_Ruiz"),
-    ("Betty_Go-Belmonte","Araneta_Center-Cubao"),
-    ("Betty_Go-Belmonte","Gilmore"),
-    ("Araneta_Center-Cubao","Anonas"),
-    ("Araneta_Center-Cubao","Betty_Go-Belmonte"),
-    ("Anonas","Katipunan"),
-    ("Anonas","Araneta_Center-Cubao"),
-    ("Katipunan","Santolan"),
-    ("Katipunan","Anonas"),
-    ("Santolan","Marikina-Pasig"),
-    ("Santolan","Katipunan"),
-    ("Marikina-Pasig","Antipolo"),
-    ("Marikina-Pasig","Santolan"),
-    ("Antipolo","Marikina-Pasig")
-]
-
-# -- LRT1 --
-
-LRT1_stations = [
-    "Roosevelt",
-    "Balintawak",
-    "Monumento",
-    "5th_Avenue",
-    "R_Papa",
-    "Abad_Santos",
-    "Blumentritt",
-    "Tayuman",
-    "Bambang",
-    "Doroteo_Jose",
-    "Carriedo",
-    "Central_Terminal",
-    "UN_Avenue",
-    "Pedro_Gil",
-    "Quirino",
-    "Vito_Cruz",
-    "Gil_Puyat",
-    "Libertad",
-    "EDSA",
-    "Baclaran"
-]
-
-LRT1_edges = [
-    ("Roosevelt","Balintawak"),
-    ("Balintawak","Monumento"),
-    ("Balintawak","Roosevelt"),
-    ("Monumento","5th_Avenue"),
-    ("Monumento","Balintawak"),
-    ("5th_Avenue","R_Papa"),
-    ("5th_Avenue","Monumento"),
-    ("R_Papa","Abad_Santos"),
-    ("R_Papa","5th_Avenue"),
-    ("Abad_Santos","Blumentritt"),
-    ("Abad_Santos","R_Papa"),
-    ("Blumentritt","Tayuman"),
-    ("Blumentritt","Abad_Santos"),
-    ("Tayuman","Bambang"),
-    ("Tayuman","Blumentritt"),
-    ("Bambang","Doroteo_Jose"),
-    ("Bambang","Tayuman"),
-    ("Doroteo_Jose","Carriedo"),
-    ("Doroteo_Jose","Bambang"),
-    ("Carriedo","Central_Terminal"),
-    ("Carriedo","Doroteo_Jose"),
-    ("Central_Terminal","UN_Avenue"),
-    ("Central_Terminal","Carriedo"),
-    ("UN_Avenue","Pedro_Gil"),
-    ("UN_Avenue","Central_Terminal"),
-    ("Pedro_Gil","Quirino"),
-    ("Pedro_Gil","UN_Avenue"),
-    ("Quirino","Vito_Cruz"),
-    ("Quirino","Pedro_Gil"),
-    ("Vito_Cruz","Gil_Puyat"),
-    ("Vito_Cruz","Quirino"),
-    ("Gil_Puyat","Libertad"),
-    ("Gil_Puyat","Vito_Cruz"),
-    ("Libertad","EDSA"),
-    ("Libertad","Gil_Puyat"),
-    ("EDSA","Baclaran"),
-    ("EDSA","Libertad"),
-    ("Baclaran","EDSA"),
-]
-
-# ----INTERCONNECTIONS GRAPH----
-
-stations_graph = Graph()
-
-for station in mrt_stations + LRT2_stations + LRT1_stations:
-    stations_graph.add_vertex(station)
-
-stations_graph.add_edges_from(mrt_edges)
-stations_graph.add_edges_from(LRT2_edges)
-stations_graph.add_edges_from(LRT1_edges)
-
-# -- STATION TRANSFER CONNECTIONS --
-
-stations_graph.add_edge("Araneta_Center-Cubao", "Araneta_Center-Cubao")
-stations_graph.add_edge("Araneta_Center-Cubao", "Araneta_Center-Cubao")
-stations_graph.add_edge("Taft_Avenue", "EDSA")
-stations_graph.add_edge("EDSA", "Taft_Avenue")
-stations_graph.add_edge("Roosevelt", "North_Avenue")
-stations_graph.add_edge("North_Avenue","Roosevelt")
-stations_graph.add_edge("Doroteo_Jose","Recto")
-stations_graph.add_edge("Recto","Doroteo_Jose")
-
-def bfs_shortest_path(graph, start, goal):
+            self.add_edge(source, target, weight, line)
+
+    def set_line_change_minutes(self, minutes):
+        if minutes < 0:
+            raise ValueError(f"Line change penalty must not be negative, got {minutes}")
+        self.line_change_minutes = minutes
+        self.invalidate_routes()
+
+    def set_coords(self, coords):
+        """Record map positions ({station: (x, y)}) for the A* heuristic."""
+        self.coords.update(coords)
+        self._time_per_distance = None
+        self._frozen = None     # its coords copy feeds the A* heuristic
+
+    def invalidate_routes(self):
+        """Drop memoized routes and the frozen form; needed only after editing self.vertices directly."""
+        self._routes.clear()
+        self._fastest.clear()
+        self._time_per_distance = None
+        self._frozen = None
+
+    def freeze(self):
+        """The FrozenGraph of the current stations and edges, built once per edit."""
+        if self._frozen is None:
+            self._frozen = FrozenGraph(self)
+        return self._frozen
+
+    def time_per_distance(self):
+        """
+        The smallest travel time per unit of straight-line distance over all
+        edges. Scaling a distance by it never overestimates the travel time, so
+        it makes an admissible A* heuristic. 0 (no guidance) unless every
+        station has coordinates.
+        """
+        if self._time_per_distance is None:
+            scale = math.inf
+            if all(station in self.coords for station in self.vertices):
+                for source, targets in self.vertices.items():
+                    here = self.coords[source]
+                    for target, weight in zip(targets, self.weights[source]):
+                        distance = math.dist(here, self.coords[target])
+                        if distance > 0:
+                            scale = min(scale, weight / distance)
+            self._time_per_distance = 0.0 if scale == math.inf else scale
+        return self._time_per_distance
+
+    def fastest_route(self, start, goal):
+        """
+        Quickest path by total travel time as (path, minutes), or None. Like
+        route(), each start's shortest-path tree is computed once and reused.
+        """
+        if start not in self.vertices or goal not in self.vertices:
+            return None
+        tree = self._fastest.get(start)
+        if tree is None:
+            times, parent, _ = _best_first_search(self, start, None, None)
+            tree = self._fastest[start] = (times, parent)
+        return _named_route(self.freeze(), *tree, goal)
+
+    def precompute_routes(self):
+        """Build the route tables (fewest hops and fastest) for every source up front instead of lazily."""
+        for station in self.vertices:
+            if station not in self._routes:
+                self._routes[station] = bfs_parents(self, station)
+            if station not in self._fastest:
+                times, parent, _ = _best_first_search(self, station, None, None)
+                self._fastest[station] = (times, parent)
+
+    def route(self, start, goal):
+        """
+        Fewest-hops path from start to goal (the same one bfs_shortest_path
+        finds), or None. The BFS tree of each start is computed once and
+        reused, so repeated queries are just a walk up the parent pointers.
+        """
+        if start not in self.vertices or goal not in self.vertices:
+            return None
+        parents = self._routes.get(start)
+        if parents is None:
+            parents = self._routes[start] = bfs_parents(self, start)
+        return path_from_parents(parents, goal)
+
+
+class FrozenGraph:
+    """
+    Read-only compressed sparse row copy of a Graph. Stations are interned to
+    dense ints (names[i], index[name]); the edges of station i are
+    targets[offsets[i]:offsets[i + 1]], with travel times in weights and line
+    labels interned in line_ids / line_names. Self-loops are dropped. Of
+    parallel edges in the same lane (see below) only the first is kept, with
+    the smallest travel time; parallel edges on different riding lines all
+    stay. Edge order is otherwise the Graph's, so searches break ties the
+    same way.
+
+    The weighted searches run over states (station, lane), where lane is the
+    riding line (1-based in lanes; 0 for walks, unlabelled edges and the
+    start) the station was reached on, so that changing lines can cost
+    line_change minutes. best_first() numbers them densely: station v owns
+    states state_offsets[v]..state_offsets[v + 1] - 1, one for lane 0 and one
+    per riding line with an edge into v, and edge i arrives in edge_states[i].
+    The dict-based searches key them sparsely as station * line_states + lane.
+    Without a penalty, or with fewer than two riding lines, line_states is 1
+    and states are just stations.
+    """
+
+    def __init__(self, graph):
+        self.names = list(graph.vertices)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.offsets = array("i", [0])
+        self.targets = array("i")
+        self.weights = array("d")
+        self.line_ids = array("h")
+        self.lanes = array("h")
+        self.line_names = []
+        line_index = {}
+        for lines in graph.lines.values():
+            for line in lines:
+                if line not in line_index:
+                    line_index[line] = len(self.line_names)
+                    self.line_names.append(line)
+        riding = [line for line in self.line_names if line is not None and line != TRANSFER_LINE]
+        self.line_change = graph.line_change_minutes
+        self.line_states = len(riding) + 1 if self.line_change > 0 and len(riding) >= 2 else 1
+        riding_lane = {line: lane for lane, line in enumerate(riding, 1)} if self.line_states > 1 else {}
+        lane_of = [riding_lane.get(line, 0) for line in self.line_names]
+
+        index = self.index
+        for source, name in enumerate(self.names):
+            seen = {}       # (target, lane) -> its position in self.targets
+            for target, weight, line in zip(graph.vertices[name], graph.weights[name], graph.lines[name]):
+                target = index[target]
+                if target == source:
+                    continue
+                line_id = line_index[line]
+                key = (target, lane_of[line_id])
+                if key in seen:
+                    pos = seen[key]
+                    self.weights[pos] = min(self.weights[pos], weight)
+                    continue
+                seen[key] = len(self.targets)
+                self.targets.append(target)
+                self.weights.append(weight)
+                self.line_ids.append(line_id)
+                self.lanes.append(key[1])
+            self.offsets.append(len(self.targets))
+        self._number_states()
+        self.coords = None      # [(x, y) by station index] when every station has a position
+        if all(name in graph.coords for name in self.names):
+            self.coords = [graph.coords[name] for name in self.names]
+        self._reverse = None
+
+    def _number_states(self):
+        """Fill state_offsets, state_stations, state_lanes and edge_states (see the class docstring)."""
+        local = [{0: 0} for _ in self.names]       # station -> {lane: its state's position at the station}
+        for target, lane in zip(self.targets, self.lanes):
+            if lane not in local[target]:
+                local[target][lane] = len(local[target])
+        self.state_offsets = array("i", [0])
+        self.state_stations = array("i")
+        self.state_lanes = array("h")
+        for station, lanes_here in enumerate(local):
+            self.state_offsets.append(self.state_offsets[-1] + len(lanes_here))
+            self.state_stations.extend([station] * len(lanes_here))
+            self.state_lanes.extend(lanes_here)
+        offsets = self.state_offsets
+        self.edge_states = array("i", (offsets[target] + local[target][lane]
+                                       for target, lane in zip(self.targets, self.lanes)))
+
+    def __len__(self):
+        return len(self.names)
+
+    def edge_count(self):
+        return len(self.targets)
+
+    def neighbors(self, station):
+        """Station indexes reachable in one edge from station index `station`."""
+        return self.targets[self.offsets[station]:self.offsets[station + 1]]
+
+    def nbytes(self):
+        """Bytes held by the CSR buffers (not counting the name index)."""
+        buffers = (self.offsets, self.targets, self.weights, self.line_ids, self.lanes,
+                   self.state_offsets, self.state_stations, self.state_lanes, self.edge_states)
+        return sum(buf.itemsize * len(buf) for buf in buffers)
+
+    def bfs(self, start, goal=-1):
+        """
+        BFS over station indexes from start, stopping early once goal is
+        reached. Returns (order, parent): the stations reached, in the order
+        they were queued, and a list where parent[v] is the station v was
+        first reached from (start is its own parent; -1 means unreached).
+        """
+        parent = [-1] * len(self.names)
+        parent[start] = start
+        order = [start]
+        if start == goal:
+            return order, parent
+        offsets, targets = self.offsets, self.targets
+        for station in order:       # order doubles as the queue: the loop picks up what gets appended
+            for neighbor in targets[offsets[station]:offsets[station + 1]]:
+                if parent[neighbor] < 0:
+                    parent[neighbor] = station
+                    order.append(neighbor)
+                    if neighbor == goal:
+                        return order, parent
+        return order, parent
+
+    def best_first(self, start, goal=-1, heuristic=None):
+        """
+        Dijkstra (heuristic=None) or A* from station start; stops once goal
+        is settled, or settles everything reachable when goal is -1. A state
+        can be settled again if a cheaper way to it turns up, so an admissible
+        heuristic (given a station index) is enough for exact answers.
+        Returns (reached, times, parent, settled count) over states (see the
+        class docstring); route_to() reads a path off them.
+        """
+        state_stations, state_lanes, edge_states = self.state_stations, self.state_lanes, self.edge_states
+        times = [math.inf] * len(state_stations)
+        parent = [-1] * len(times)
+        first = self.state_offsets[start]
+        times[first] = 0
+        parent[first] = first
+        reached = [first]
+        heap = [(heuristic(start) if heuristic else 0, 0, first)]
+        offsets, targets, weights, lanes = self.offsets, self.targets, self.weights, self.lanes
+        change = self.line_change
+        expanded = 0
+        while heap:
+            _, time, state = heapq.heappop(heap)
+            if time > times[state]:
+                continue        # stale entry, a quicker way was found after it was pushed
+            expanded += 1
+            station = state_stations[state]
+            if station == goal:
+                break
+            lane = state_lanes[state]
+            for i in range(offsets[station], offsets[station + 1]):
+                edge_lane = lanes[i]
+                arrival = time + weights[i]
+                if lane and edge_lane and lane != edge_lane:
+                    arrival += change
+                neighbor = edge_states[i]
+                if arrival < times[neighbor]:
+                    if parent[neighbor] < 0:
+                        reached.append(neighbor)
+                    times[neighbor] = arrival
+                    parent[neighbor] = state
+                    priority = arrival + heuristic(targets[i]) if heuristic else arrival
+                    heapq.heappush(heap, (priority, arrival, neighbor))
+        return reached, times, parent, expanded
+
+    def route_to(self, times, parent, goal):
+        """(station indexes start..goal, time) from best_first() results, or None if goal wasn't reached."""
+        state = min(range(self.state_offsets[goal], self.state_offsets[goal + 1]), key=times.__getitem__)
+        if times[state] == math.inf:
+            return None
+        time = times[state]
+        path = [state]
+        while parent[path[-1]] != path[-1]:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return [self.state_stations[state] for state in path], time
+
+    def reverse(self):
+        """
+        (offsets, targets, weights, lanes) of the reversed edges, in the same
+        CSR layout: targets[offsets[v]:offsets[v + 1]] are the stations with an
+        edge into v. Built on first use and kept.
+        """
+        if self._reverse is None:
+            n = len(self.names)
+            offsets = array("i", [0]) * (n + 1)
+            for target in self.targets:
+                offsets[target + 1] += 1
+            for station in range(n):
+                offsets[station + 1] += offsets[station]
+            fill = offsets[:-1]       # next free slot per station
+            sources = array("i", [0]) * len(self.targets)
+            weights = array("d", [0.0]) * len(self.targets)
+            lanes = array("h", [0]) * len(self.targets)
+            for source in range(n):
+                for i in range(self.offsets[source], self.offsets[source + 1]):
+                    target = self.targets[i]
+                    sources[fill[target]] = source
+                    weights[fill[target]] = self.weights[i]
+                    lanes[fill[target]] = self.lanes[i]
+                    fill[target] += 1
+            self._reverse = (offsets, sources, weights, lanes)
+        return self._reverse
+
+    def bidirectional_bfs(self, start, goal):
+        """
+        Fewest-hops path between station indexes, searching a level at a time
+        from both ends (always the smaller frontier) until the two searches
+        meet. Returns (path or None, stations explored).
+
+        The path is the one bfs() would give: once the distance is known,
+        the stations on some shortest path are collected from both searches,
+        and a BFS restricted to them reproduces bfs()'s parent choices.
+        """
+        if start == goal:
+            return [start], 1
+        offsets, targets = self.offsets, self.targets
+        r_offsets, r_targets, _, _ = self.reverse()
+        forward, backward = {start: 0}, {goal: 0}
+        f_front, b_front = [start], [goal]
+        f_level = b_level = 0
+        met = False
+        while f_front and b_front and not met:
+            if len(f_front) <= len(b_front):
+                f_level += 1
+                f_front, met = _expand_level(f_front, f_level, forward, backward, offsets, targets)
+            else:
+                b_level += 1
+                b_front, met = _expand_level(b_front, b_level, backward, forward, r_offsets, r_targets)
+        explored = len(forward) + len(backward)
+        if not met:
+            return None, explored
+
+        # both searches have complete levels, so the distance is f_level + b_level and
+        # the stations at forward level f_level that are also at backward level b_level
+        # are exactly the ones on a shortest path there
+        hops = f_level + b_level
+        on_path = [None] * (hops + 1)
+        on_path[f_level] = {v for v in f_front if backward.get(v) == b_level}
+        for level in range(f_level - 1, -1, -1):
+            on_path[level] = {u for v in on_path[level + 1] for u in r_targets[r_offsets[v]:r_offsets[v + 1]]
+                              if forward.get(u) == level}
+        for level in range(f_level + 1, hops + 1):
+            on_path[level] = {w for v in on_path[level - 1] for w in targets[offsets[v]:offsets[v + 1]]
+                              if backward.get(w) == hops - level}
+
+        parent = {start: None}
+        layer = [start]
+        for level in range(1, hops + 1):
+            allowed = on_path[level]
+            next_layer = []
+            for station in layer:
+                for neighbor in targets[offsets[station]:offsets[station + 1]]:
+                    if neighbor in allowed and neighbor not in parent:
+                        parent[neighbor] = station
+                        next_layer.append(neighbor)
+            layer = next_layer
+        path = [goal]
+        while parent[path[-1]] is not None:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return path, explored
+
+    def bidirectional_dijkstra(self, start, goal):
+        """
+        Quickest path between station indexes, growing Dijkstra searches from
+        start (forward edges) and goal (reverse edges), always advancing the
+        side with the cheaper heap top, until the two tops together cost at
+        least the best meeting found. Returns (path, time, settled count), or
+        (None, inf, settled count). Same time as best_first(); on ties the
+        path may differ.
+
+        Forward states carry the lane a station was reached on, backward
+        states the lane it is left on, so a meeting pays the line change
+        penalty when the two differ.
+        """
+        if start == goal:
+            return [start], 0, 1
+        k = self.line_states
+        change = self.line_change
+        r_offsets, r_targets, r_weights, r_lanes = self.reverse()
+        sides = (
+            ({start * k: 0}, {start * k: None}, [(0, start * k)], self.offsets, self.targets, self.weights, self.lanes),
+            ({goal * k: 0}, {goal * k: None}, [(0, goal * k)], r_offsets, r_targets, r_weights, r_lanes),
+        )
+        best, meet = math.inf, None
+        settled = 0
+        while sides[0][2] and sides[1][2]:
+            if sides[0][2][0][0] + sides[1][2][0][0] >= best:
+                break
+            side = 0 if sides[0][2][0][0] <= sides[1][2][0][0] else 1
+            times, parent, heap, offsets, targets, weights, lanes = sides[side]
+            other = sides[1 - side][0]
+            time, state = heapq.heappop(heap)
+            if time > times[state]:
+                continue        # stale entry
+            settled += 1
+            station, lane = divmod(state, k)
+            for i in range(offsets[station], offsets[station + 1]):
+                edge_lane = lanes[i]
+                arrival = time + weights[i]
+                if lane and edge_lane and lane != edge_lane:
+                    arrival += change
+                neighbor = targets[i] * k + edge_lane
+                if arrival < times.get(neighbor, math.inf):
+                    times[neighbor] = arrival
+                    parent[neighbor] = state
+                    heapq.heappush(heap, (arrival, neighbor))
+                    for other_lane in range(k):
+                        other_time = other.get(targets[i] * k + other_lane)
+                        if other_time is None:
+                            continue
+                        total = arrival + other_time
+                        if edge_lane and other_lane and edge_lane != other_lane:
+                            total += change
+                        if total < best:
+                            best = total
+                            pair = (neighbor, targets[i] * k + other_lane)
+                            meet = pair if side == 0 else pair[::-1]
+        if meet is None:
+            return None, math.inf, settled
+        forward_parent, backward_parent = sides[0][1], sides[1][1]
+        path = [meet[0]]
+        while forward_parent[path[-1]] is not None:
+            path.append(forward_parent[path[-1]])
+        path.reverse()
+        state = backward_parent[meet[1]]
+        while state is not None:
+            path.append(state)
+            state = backward_parent[state]
+        return [state // k for state in path], best, settled
+
+    def path_to(self, parent, goal):
+        """Station indexes start..goal from a parent list of bfs() (best_first() results go through route_to())."""
+        path = [goal]
+        while parent[path[-1]] != path[-1]:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return path
+
+    def ride(self, arrivals, source, target):
+        """
+        Extend arrivals ({lane: quickest time at source}) over every edge
+        source -> target; returns {lane: quickest time at target}.
+        """
+        reached = {}
+        change = self.line_change
+        for i in range(self.offsets[source], self.offsets[source + 1]):
+            if self.targets[i] != target:
+                continue
+            edge_lane = self.lanes[i]
+            for lane, time in arrivals.items():
+                arrival = time + self.weights[i]
+                if lane and edge_lane and lane != edge_lane:
+                    arrival += change
+                if arrival < reached.get(edge_lane, math.inf):
+                    reached[edge_lane] = arrival
+        return reached
+
+    def dijkstra_avoiding(self, start, goal, banned_stations, banned_edges, arrivals=None):
+        """
+        Quickest path start..goal that enters none of banned_stations and uses
+        none of banned_edges ((source, target) pairs), as (path, time), or
+        (None, inf). arrivals ({lane: time}, default {0: 0}) are the lines
+        start can be reached on and the time so far on each, for the line
+        change penalty; time includes it. The spur search of k_shortest_paths.
+        """
+        k = self.line_states
+        change = self.line_change
+        times = {}
+        parent = {}
+        heap = []
+        for lane, time in (arrivals if arrivals is not None else {0: 0}).items():
+            times[start * k + lane] = time
+            parent[start * k + lane] = None
+            heap.append((time, start * k + lane))
+        heapq.heapify(heap)
+        offsets, targets, weights, lanes = self.offsets, self.targets, self.weights, self.lanes
+        while heap:
+            time, state = heapq.heappop(heap)
+            if time > times[state]:
+                continue
+            station, lane = divmod(state, k)
+            if station == goal:
+                path = [state]
+                while parent[path[-1]] is not None:
+                    path.append(parent[path[-1]])
+                path.reverse()
+                return [state // k for state in path], time
+            for i in range(offsets[station], offsets[station + 1]):
+                target = targets[i]
+                if target in banned_stations or (station, target) in banned_edges:
+                    continue
+                edge_lane = lanes[i]
+                arrival = time + weights[i]
+                if lane and edge_lane and lane != edge_lane:
+                    arrival += change
+                neighbor = target * k + edge_lane
+                if arrival < times.get(neighbor, math.inf):
+                    times[neighbor] = arrival
+                    parent[neighbor] = state
+                    heapq.heappush(heap, (arrival, neighbor))
+        return None, math.inf
+
+    def loopless_avoiding(self, start, goal, banned_stations, banned_edges, arrivals=None):
+        """
+        dijkstra_avoiding(), but the path never visits a station twice. The
+        quickest state path is loopless unless a detour beats a line change;
+        only then are partial loopless paths searched best-first, bounded
+        below by the travel time to goal without line change penalties.
+        """
+        path, time = self.dijkstra_avoiding(start, goal, banned_stations, banned_edges, arrivals)
+        if path is None or len(set(path)) == len(path):
+            return path, time
+
+        r_offsets, r_targets, r_weights, _ = self.reverse()
+        bound = {goal: 0}
+        heap = [(0, goal)]
+        while heap:
+            time, station = heapq.heappop(heap)
+            if time > bound[station]:
+                continue
+            for i in range(r_offsets[station], r_offsets[station + 1]):
+                source = r_targets[i]
+                arrival = time + r_weights[i]
+                if source not in banned_stations and arrival < bound.get(source, math.inf):
+                    bound[source] = arrival
+                    heapq.heappush(heap, (arrival, source))
+
+        offsets, targets, weights, lanes = self.offsets, self.targets, self.weights, self.lanes
+        change = self.line_change
+        heap = [(time + bound[start], time, tie, (start,), lane)
+                for tie, (lane, time) in enumerate((arrivals if arrivals is not None else {0: 0}).items())]
+        heapq.heapify(heap)
+        tie = len(heap)
+        while heap:
+            _, time, _, path, lane = heapq.heappop(heap)
+            station = path[-1]
+            if station == goal:
+                return list(path), time
+            for i in range(offsets[station], offsets[station + 1]):
+                target = targets[i]
+                if target not in bound or target in path or (station, target) in banned_edges:
+                    continue
+                edge_lane = lanes[i]
+                arrival = time + weights[i]
+                if lane and edge_lane and lane != edge_lane:
+                    arrival += change
+                tie += 1
+                heapq.heappush(heap, (arrival + bound[target], arrival, tie, path + (target,), edge_lane))
+        return None, math.inf
+
+    def k_shortest_paths(self, start, goal, k):
+        """
+        Yen's algorithm: up to k loopless paths start..goal in increasing
+        travel time, as [(path, time)]. Each next path branches off a
+        previous one at some spur station, with the edges the earlier paths
+        took from that same root prefix banned. The spur search starts from
+        every line the root can arrive on (ride()), so parallel edges on
+        different lines are priced exactly. With a line change penalty the
+        quickest spur can come back through a station (a detour cheaper than
+        changing lines), so spurs come from loopless_avoiding().
+        """
+        path, time = self.loopless_avoiding(start, goal, (), ())
+        if path is None:
+            return []
+        found = [(path, time)]
+        candidates = []     # heap of (time, path)
+        seen = {tuple(path)}
+        while len(found) < k:
+            previous, _ = found[-1]
+            arrivals = {0: 0}       # lane -> quickest time to previous[i] along previous[:i + 1]
+            for i in range(len(previous) - 1):
+                spur, root = previous[i], previous[:i + 1]
+                banned_edges = {(p[i], p[i + 1]) for p, _ in found if p[:i + 1] == root}
+                spur_path, time = self.loopless_avoiding(spur, goal, set(root[:-1]), banned_edges, arrivals)
+                if spur_path is not None:
+                    candidate = root[:-1] + spur_path
+                    if tuple(candidate) not in seen:
+                        seen.add(tuple(candidate))
+                        heapq.heappush(candidates, (time, candidate))
+                arrivals = self.ride(arrivals, previous[i], previous[i + 1])
+            if not candidates:
+                break
+            time, path = heapq.heappop(candidates)
+            found.append((path, time))
+        return found
+
+    def named_parents(self, reached, parent):
+        """{station name: parent name} for the reached stations, with the start mapped to None."""
+        names = self.names
+        parents = {names[station]: names[parent[station]] for station in reached}
+        parents[names[reached[0]]] = None
+        return parents
+
+
+def _expand_level(front, level, dist, other, offsets, targets):
+    """
+    One BFS level for bidirectional_bfs: label the unseen neighbors of front
+    with level in dist. Returns (the new front, whether any of them is
+    already labelled by the other search).
+    """
+    next_front = []
+    met = False
+    for station in front:
+        for neighbor in targets[offsets[station]:offsets[station + 1]]:
+            if neighbor not in dist:
+                dist[neighbor] = level
+                next_front.append(neighbor)
+                if neighbor in other:
+                    met = True
+    return next_front, met
+
+
+def bfs_parents(graph, start, goal=None):
+    """
+    BFS from start; returns {station: the station it was first reached from},
+    with start mapped to None. Stations are marked when enqueued, so each is
+    queued once. With a goal, the search stops as soon as the goal is reached.
+    Runs over graph.freeze().
+    """
+    frozen = graph.freeze()
+    goal = frozen.index[goal] if goal is not None else -1
+    order, parent = frozen.bfs(frozen.index[start], goal)
+    return frozen.named_parents(order, parent)
+
+
+def path_from_parents(parents, goal):
+    """Walk the parent pointers back from goal; returns the path start..goal, or None if goal wasn't reached."""
+    if goal not in parents:
+        return None
+    path = [goal]
+    while parents[path[-1]] is not None:
+        path.append(parents[path[-1]])
+    path.reverse()
+    return path
+
+
+def bfs_shortest_path(graph, start, goal, stats=None, bidirectional=False):
+    """
+    Fewest-hops path from start to goal, or None. bidirectional=True searches
+    from both ends over graph.freeze() and returns the same path while
+    exploring far fewer stations on big networks. If stats is a dict,
+    stats["expanded"] gets the number of stations explored.
+    """
+    if start not in graph.vertices or goal not in graph.vertices:
+        return None
+    if bidirectional:
+        frozen = graph.freeze()
+        path, explored = frozen.bidirectional_bfs(frozen.index[start], frozen.index[goal])
+        if stats is not None:
+            stats["expanded"] = explored
+        return [frozen.names[station] for station in path] if path is not None else None
+    parents = bfs_parents(graph, start, goal)
+    if stats is not None:
+        stats["expanded"] = len(parents)
+    return path_from_parents(parents, goal)
+
+
+def dijkstra_shortest_path(graph, start, goal, stats=None, bidirectional=False):
+    """
+    Quickest path by total edge weight (travel time), as (path, total_time),
+    or None. bidirectional=True meets in the middle from both ends (same
+    time; on ties the path may differ). If stats is a dict, stats["expanded"]
+    gets the number of stations settled.
+    """
+    if start not in graph.vertices or goal not in graph.vertices:
+        return None
+    if bidirectional:
+        frozen = graph.freeze()
+        path, time, expanded = frozen.bidirectional_dijkstra(frozen.index[start], frozen.index[goal])
+        if stats is not None:
+            stats["expanded"] = expanded
+        return ([frozen.names[station] for station in path], time) if path is not None else None
+    times, parent, expanded = _best_first_search(graph, start, goal, None)
+    if stats is not None:
+        stats["expanded"] = expanded
+    return _named_route(graph.freeze(), times, parent, goal)
+
+
+def astar_shortest_path(graph, start, goal, stats=None):
+    """
+    Same answer as dijkstra_shortest_path (up to ties), but guided towards
+    goal by straight-line distance in graph.coords scaled by
+    graph.time_per_distance(), so fewer stations are settled.
+    """
     if start not in graph.vertices or goal not in graph.vertices:
         return None
+    scale = graph.time_per_distance()
+    heuristic = None
+    if scale:
+        target = graph.coords[goal]
+        coords = graph.freeze().coords
+        heuristic = lambda station: scale * math.dist(coords[station], target)
+    times, parent, expanded = _best_first_search(graph, start, goal, heuristic)
+    if stats is not None:
+        stats["expanded"] = expanded
+    return _named_route(graph.freeze(), times, parent, goal)
 
-    visited = set()
-    queue = deque([[start]])
 
-    while queue:
-        path = queue.popleft()
-        station = path[-1]
+def batch_routes(graph, pairs, weighted=True):
+    """
+    Answer many (start, goal) queries at once. Returns a list aligned with
+    pairs of (path, cost) or None, where cost is the total travel time
+    (weighted) or the number of hops (BFS). Pairs are grouped by start, so
+    each start is searched once over graph.freeze() and its tree serves all
+    of its goals; a start with a single goal stops as soon as it is reached.
+    """
+    frozen = graph.freeze()
+    by_start = {}
+    for position, (start, goal) in enumerate(pairs):
+        if start in frozen.index and goal in frozen.index:
+            by_start.setdefault(frozen.index[start], []).append((position, frozen.index[goal]))
+    results = [None] * len(pairs)
+    names = frozen.names
+    for start, queries in by_start.items():
+        only_goal = queries[0][1] if len(queries) == 1 else -1
+        if weighted:
+            _, times, parent, _ = frozen.best_first(start, only_goal)
+            for position, goal in queries:
+                route = frozen.route_to(times, parent, goal)
+                if route is not None:
+                    results[position] = [names[station] for station in route[0]], route[1]
+        else:
+            _, parent = frozen.bfs(start, only_goal)
+            for position, goal in queries:
+                if parent[goal] >= 0:
+                    path = frozen.path_to(parent, goal)
+                    results[position] = [names[station] for station in path], len(path) - 1
+    return results
 
-        if station == goal:
-            return path
 
-        if station not in visited:
-            visited.add(station)
+def k_shortest_paths(graph, start, goal, k=3):
+    """
+    Up to k loopless alternatives from start to goal, quickest first, as
+    [(path, total_time)] (Yen's algorithm over graph.freeze()). The first is
+    the dijkstra_shortest_path answer unless that passes a station twice;
+    later ones are the next-best detours, e.g. a route that skips a transfer.
+    Fewer than k come back only if fewer loopless paths exist. Empty if goal
+    can't be reached.
+    """
+    if start not in graph.vertices or goal not in graph.vertices:
+        return []
+    frozen = graph.freeze()
+    names = frozen.names
+    return [([names[station] for station in path], time)
+            for path, time in frozen.k_shortest_paths(frozen.index[start], frozen.index[goal], k)]
+
 
-            for neighbor in graph.vertices[station]:
-                new_path = path + [neighbor]
-                queue.append(new_path)
-    return None
\ No newline at end of file
+def _best_first_search(graph, start, goal, heuristic):
+    """
+    FrozenGraph.best_first over graph.freeze() by station name (goal=None
+    settles everything reachable; heuristic takes a station index).
+    Returns (times, parent, settled count) over the frozen graph's states.
+    """
+    frozen = graph.freeze()
+    goal = frozen.index[goal] if goal is not None else -1
+    _, times, parent, expanded = frozen.best_first(frozen.index[start], goal, heuristic)
+    return times, parent, expanded
+
+
+def _named_route(frozen, times, parent, goal):
+    """(path of station names, total time) to the named goal from best_first results, or None."""
+    route = frozen.route_to(times, parent, frozen.index[goal])
+    if route is None:
+        return None
+    path, time = route
+    return [frozen.names[station] for station in path], time
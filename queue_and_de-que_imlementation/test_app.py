@@ -0,0 +1,67 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+import app
+from bst import BST
+
+
+@pytest.fixture
+def bst_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "BST_SNAPSHOT_PATH", str(tmp_path / "bst_tree.snapshot"))
+    monkeypatch.setattr(app, "BST_SAVE_INTERVAL", 0.2)
+    monkeypatch.setattr(app, "bst_tree", BST())
+    yield app
+    app.save_bst()
+
+
+def _saved_values():
+    return list(BST.load(app.BST_SNAPSHOT_PATH).iter_inorder())
+
+
+def test_edit_inside_the_save_interval_is_saved_later(bst_app):
+    client = bst_app.app.test_client()
+    assert bst_app.save_bst()
+    client.post("/projects/binary_tree/insert", data={"value": "7"})
+    assert bst_app.bst_dirty and _saved_values() == []
+
+    deadline = time.monotonic() + 5
+    while bst_app.bst_dirty and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not bst_app.bst_dirty
+    assert _saved_values() == [7]
+    assert bst_app.bst_save_timer is None
+
+
+def test_immediate_save_cancels_the_deferred_one(bst_app):
+    assert bst_app.save_bst()
+    bst_app.bst_tree.insert(1)
+    bst_app.bst_changed()
+    timer = bst_app.bst_save_timer
+    assert timer is not None
+    client = bst_app.app.test_client()
+    client.post("/projects/binary_tree/bulk_insert", data={"values": "2, 3"})
+    assert bst_app.bst_save_timer is None
+    assert timer.finished.is_set()      # cancelled
+    assert _saved_values() == [1, 2, 3]
+
+
+def test_sigterm_saves_pending_edits(tmp_path):
+    path = tmp_path / "bst_tree.snapshot"
+    script = (
+        "import os, signal, app\n"
+        f"app.BST_SNAPSHOT_PATH = {str(path)!r}\n"
+        "app.save_bst()\n"
+        "app.bst_tree.insert(5)\n"
+        "app.bst_changed()\n"
+        "os.kill(os.getpid(), signal.SIGTERM)\n"
+        "signal.pause()\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(app.__file__)),
+                            timeout=60)
+    assert result.returncode == -signal.SIGTERM
+    assert list(BST.load(str(path)).iter_inorder()) == [5]
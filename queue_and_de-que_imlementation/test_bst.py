@@ -0,0 +1,120 @@
+import bisect
+import random
+
+import pytest
+
+from bst import BST, ArrayBST, Node, TreeLayout
+
+
+@pytest.mark.parametrize("balance", [None, "avl"])
+def test_delete_node_keeps_sizes_consistent(balance):
+    tree = BST.from_iterable(range(1, 8), balance=balance)
+    tree.root = tree.delete_node(tree.root, 1)
+    assert len(tree) == 6
+    assert [tree.kth(k) for k in range(1, 7)] == [2, 3, 4, 5, 6, 7]
+
+
+def test_delete_node_rejects_subtree_roots():
+    tree = BST.from_iterable(range(1, 8))
+    with pytest.raises(ValueError):
+        tree.delete_node(tree.root.left, 1)
+    assert len(tree) == 7
+    assert list(tree.iter_inorder()) == list(range(1, 8))
+
+
+def test_snapshot_rank_matches_tree(tmp_path):
+    keys = [1, 3, 5, 9, 9]
+    tree = BST.from_iterable(keys)
+    path = tmp_path / "tree.snapshot"
+    tree.save(path)
+    with BST.open_snapshot(path) as snap:
+        for key in range(11):
+            assert snap.rank(key) == tree.rank(key)
+        assert snap.rank(5) == 2
+
+
+def _copy(node):
+    """Structural copy of a subtree, so a fresh TreeLayout can't touch the tree's own node ids."""
+    if node is None:
+        return None
+    clone = Node(node.value)
+    clone.left, clone.right = _copy(node.left), _copy(node.right)
+    return clone
+
+
+def _expected_layout(root):
+    """(value, depth, parent slot or None) per node in inorder, from a plain recursive walk."""
+    rows = []
+
+    def walk(node, depth, parent):
+        if node is not None:
+            walk(node.left, depth + 1, node)
+            rows.append((node, depth, parent))
+            walk(node.right, depth + 1, node)
+
+    walk(root, 0, None)
+    slot = {id(node): k for k, (node, _, _) in enumerate(rows)}
+    return [(node.value, depth, None if parent is None else slot[id(parent)]) for node, depth, parent in rows]
+
+
+def _patched_layout(tree):
+    layout = tree._layout
+    slot = {node_id: k for k, node_id in enumerate(layout.ids)}
+    return [(value, depth, slot[parent] if parent else None)
+            for value, depth, parent in zip(layout.values, layout.depths, layout.parents)]
+
+
+@pytest.mark.parametrize("balance", [None, "avl"])
+def test_patched_layout_matches_a_fresh_one(balance):
+    rng = random.Random(3 if balance else 2)
+    for _ in range(20):
+        tree = BST(balance=balance)
+        values = []
+        for value in rng.choices(range(60), k=rng.randint(1, 30)):
+            tree.insert(value)
+            values.append(value)
+        tree.layout()
+        for _ in range(60):
+            if values and rng.random() < 0.45:
+                # mostly existing values, sometimes one that isn't there
+                value = rng.choice(values) if rng.random() < 0.9 else rng.randrange(60, 70)
+                tree.root = tree.delete_node(tree.root, value)
+                if value in values:
+                    values.remove(value)
+            else:
+                value = rng.randrange(60)
+                tree.insert(value)
+                values.append(value)
+            if tree.root is None:
+                assert values == []
+                continue
+            assert tree._layout is not None
+            assert _patched_layout(tree) == _expected_layout(tree.root)
+            assert tree._layout.ids == [node._id for node in tree._inorder_nodes(tree.root)]
+            assert tree.render_svg() == "".join(TreeLayout(_copy(tree.root)).iter_svg(80, 90, 18))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_array_bst_matches_a_sorted_list(seed):
+    rng = random.Random(seed)
+    model = sorted(rng.randrange(50) for _ in range(rng.randrange(30)))
+    tree = ArrayBST.from_iterable(rng.sample(model, len(model)))
+    for _ in range(400):
+        key = rng.randrange(50)
+        if rng.random() < 0.5:
+            tree.insert(key)
+            bisect.insort(model, key)
+        else:
+            assert tree.delete(key) == (key in model)
+            if key in model:
+                model.remove(key)
+        assert list(tree.iter_inorder()) == model
+        assert len(tree) == len(model)
+        assert all((k in tree) == (k in model) for k in range(-1, 51))
+        # every slot is either live or on the free list
+        assert len(tree.keys) == len(tree) + len(tree._free)
+    slots = len(tree.keys)
+    if model:
+        tree.delete(model[0])
+        tree.insert(model[0])
+        assert len(tree.keys) == slots
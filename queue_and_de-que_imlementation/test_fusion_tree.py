@@ -0,0 +1,99 @@
+import random
+from collections import Counter
+
+import pytest
+
+from fusion_tree import FusionTree
+
+
+def _check_node(tree, node, depth, leaf_depths, is_root):
+    """Walk node's subtree checking sizes and packed words; returns its keys in order."""
+    assert node.n <= tree.max_keys
+    if not is_root:
+        assert node.n >= tree.min_keys
+    keys = list(node.keys[:node.n])
+    packed = sum(key << (i * tree._field_bits) for i, key in enumerate(keys))
+    assert node.packed == packed
+    if node.leaf:
+        leaf_depths.add(depth)
+        return keys
+    assert node.n >= 1
+    result = []
+    for i in range(node.n + 1):
+        child_keys = _check_node(tree, node.children[i], depth + 1, leaf_depths, False)
+        if i > 0:
+            assert all(key >= keys[i - 1] for key in child_keys)
+        if i < node.n:
+            assert all(key <= keys[i] for key in child_keys)
+            result.extend(child_keys + [keys[i]])
+        else:
+            result.extend(child_keys)
+    return result
+
+
+def _check(tree, model):
+    leaf_depths = set()
+    keys = _check_node(tree, tree.root, 0, leaf_depths, True)
+    assert len(leaf_depths) <= 1
+    assert keys == sorted(model.elements())
+    assert list(tree) == keys
+    assert len(tree) == len(keys)
+    assert tree.get_min() == (keys[0] if keys else None)
+    assert tree.get_max() == (keys[-1] if keys else None)
+
+
+@pytest.mark.parametrize("branching", [2, 3, 4, 5, 8, 16])
+def test_operations_match_a_multiset_model(branching):
+    rng = random.Random(branching)
+    for _ in range(30):
+        keys = sorted(rng.choices(range(200), k=rng.randint(0, 120)))
+        tree = FusionTree.bulk_load(keys, branching=branching)
+        model = Counter(keys)
+        _check(tree, model)
+        for _ in range(12):
+            op = rng.random()
+            if op < 0.5:
+                batch = rng.choices(range(210), k=rng.randint(0, 60))
+                found = tree.delete_many(batch)
+                assert found == [key in model for key in batch]
+                for key in set(batch):
+                    model[key] -= 1
+                model += Counter()      # drop keys whose count reached zero
+            elif op < 0.8:
+                for key in rng.choices(range(200), k=rng.randint(0, 20)):
+                    tree.insert(key)
+                    model[key] += 1
+            elif op < 0.85:
+                smallest = min(model) if model else None
+                assert tree.pop_min() == smallest
+                if smallest is not None:
+                    model[smallest] -= 1
+                    model += Counter()
+            elif op < 0.95:
+                key = rng.randrange(210)
+                limit = rng.choice([None, key + rng.randrange(20)])
+                ceiling = min((k for k in model if k >= key), default=None)
+                if ceiling is not None and limit is not None and ceiling > limit:
+                    ceiling = None
+                assert tree.pop_ceiling(key, limit) == ceiling
+                if ceiling is not None:
+                    model[ceiling] -= 1
+                    model += Counter()
+            else:
+                key = rng.randrange(210)
+                assert tree.delete(key) == (key in model)
+                if key in model:
+                    model[key] -= 1
+                    model += Counter()
+            _check(tree, model)
+
+
+@pytest.mark.parametrize("branching", [2, 4, 16])
+def test_neighbour_queries_match_a_sorted_model(branching):
+    rng = random.Random(branching)
+    keys = sorted(set(rng.choices(range(500), k=200)))
+    tree = FusionTree.bulk_load(keys, branching=branching)
+    for query in range(0, 510, 7):
+        assert tree.successor(query) == next((key for key in keys if key > query), None)
+        assert tree.predecessor(query) == next((key for key in reversed(keys) if key < query), None)
+        assert list(tree.iter_range(query, query + 40)) == [key for key in keys if query <= key <= query + 40]
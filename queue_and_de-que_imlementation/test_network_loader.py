@@ -0,0 +1,69 @@
+import os
+import shutil
+import sys
+from array import array
+
+import pytest
+
+from network_loader import CACHE_HEADER, CACHE_SUFFIX, LENGTH, METRO_MANILA_RAIL, load_network, parse_network
+
+
+@pytest.fixture
+def network(tmp_path):
+    path = str(tmp_path / "rail.csv")
+    shutil.copyfile(METRO_MANILA_RAIL, path)
+    load_network(path)
+    return path
+
+
+def _patch_cache(path, which, index, value):
+    """Overwrite one entry of the offsets/targets/line ids array in the cache of path."""
+    cache_path = path + CACHE_SUFFIX
+    with open(cache_path, "rb") as f:
+        data = bytearray(f.read())
+    _, _, _, _, n_stations, n_edges, _ = CACHE_HEADER.unpack_from(data)
+    pos = CACHE_HEADER.size
+    for _ in range(2):
+        (length,) = LENGTH.unpack_from(data, pos)
+        pos += LENGTH.size + length
+    layout = {"offsets": (0, "i"), "targets": (4 * (n_stations + 1), "i"),
+              "line_ids": (4 * (n_stations + 1) + 12 * n_edges, "h")}
+    start, typecode = layout[which]
+    item = array(typecode, [value])
+    if sys.byteorder == "big":
+        item.byteswap()
+    pos += start + item.itemsize * index
+    data[pos:pos + item.itemsize] = item.tobytes()
+    stat = os.stat(path)
+    with open(cache_path, "wb") as f:
+        f.write(data)
+    # keep the source's mtime so the cache is not rejected as stale for that reason
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def _adjacency(graph):
+    return {name: list(zip(graph.vertices[name], graph.weights[name], graph.lines[name])) for name in graph.vertices}
+
+
+def test_cache_round_trip(network):
+    assert _adjacency(load_network(network)) == _adjacency(parse_network(network))
+
+
+@pytest.mark.parametrize("which, index, value", [
+    ("targets", 0, -2),
+    ("targets", 0, 1 << 20),
+    ("offsets", 2, 0),
+    ("offsets", 0, 1),
+    ("line_ids", 0, -2),
+    ("line_ids", 0, 1000),
+])
+def test_corrupt_cache_is_reparsed(network, which, index, value):
+    _patch_cache(network, which, index, value)
+    assert _adjacency(load_network(network)) == _adjacency(parse_network(network))
+
+
+def test_csv_row_with_extra_fields_reports_its_line(tmp_path):
+    path = tmp_path / "extra.csv"
+    path.write_text("kind,from,to,minutes,line,x,y\nsegment,A,B,2,L1,,,oops\n")
+    with pytest.raises(ValueError, match=r"extra\.csv:2: expected at most 7 fields"):
+        parse_network(str(path))
@@ -0,0 +1,154 @@
+import random
+
+import pytest
+
+from restaurant import Restaurant, TableSchedule
+
+
+def test_walk_in_at_fractional_minute_respects_reservations():
+    restaurant = Restaurant({2: 2})
+    assert restaurant.reserve("a", 2, 100, 60) == 21
+    # 40.5 + 60 runs into the booking at minute 100, 39.5 + 60 stops just short
+    assert restaurant.walk_in("w", 2, now=40.5) == "Assigned 22 to w"
+    assert restaurant.walk_in("v", 2, now=40.5) == "No table available for v, added to queue"
+    # once table 22 is free again, v fits on 21 before the booking starts
+    assert restaurant.finish_meal(2, 22, now=39.5) == "Table 21 Has Finished their Meal -> Reassigned to v"
+
+
+def test_process_batch_accepts_float_clock():
+    restaurant = Restaurant()
+    restaurant.reserve("a", 2, 100, 60)
+    assert restaurant.process_batch([("arrive", "x", 2, 30.0), ("arrive", "y", 2, 90.5)]) == [("x", 21), ("y", 22)]
+
+
+@pytest.mark.parametrize("now", [-1, -0.5, float("nan"), float("inf"), "90"])
+def test_walk_in_rejects_invalid_times(now):
+    restaurant = Restaurant()
+    restaurant.reserve("a", 2, 100, 60)
+    with pytest.raises(ValueError):
+        restaurant.walk_in("w", 2, now=now)
+
+
+@pytest.mark.parametrize("table_size, table_id", [(3, 21), (4, 21), (2, 99)])
+def test_finish_meal_rejects_unknown_tables(table_size, table_id):
+    restaurant = Restaurant()
+    restaurant.walk_in("a", 2)
+    with pytest.raises(ValueError):
+        restaurant.finish_meal(table_size, table_id)
+    assert restaurant.status()["available_tables"][2] == [22, 23]
+
+
+def test_finish_meal_rejects_a_table_that_is_already_free():
+    restaurant = Restaurant()
+    assert restaurant.walk_in("a", 2) == "Assigned 21 to a"
+    assert restaurant.finish_meal(2, 21) == "Table 21 is now free"
+    with pytest.raises(ValueError):
+        restaurant.finish_meal(2, 21)
+    with pytest.raises(ValueError):
+        restaurant.process_batch([("finish", 2, 22)])
+    seated = [restaurant.walk_in(name, 2) for name in "bcd"]
+    assert seated == ["Assigned 21 to b", "Assigned 22 to c", "Assigned 23 to d"]
+
+
+def _first_free_minute(bookings, t, duration):
+    while any(start < t + duration and t < end for start, end in bookings):
+        t += 1
+    return t
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_next_free_matches_a_minute_by_minute_scan(seed):
+    rng = random.Random(seed)
+    schedule = TableSchedule()
+    bookings = []
+    for _ in range(60):
+        # mostly back-to-back runs, with the odd short gap between them
+        start = bookings[-1][1] + rng.choice([0, 0, 0, 5, 20]) if bookings and rng.random() < 0.7 else rng.randrange(1500)
+        end = start + rng.randint(1, 90)
+        if schedule.is_free(start, end):
+            schedule.add(start, end, "x")
+            bookings.append((start, end))
+        t, duration = rng.randrange(1600), rng.randint(1, 60)
+        assert schedule.next_free(t, duration) == _first_free_minute(bookings, t, duration)
+
+
+def test_check_in_consumes_the_booking():
+    restaurant = Restaurant({2: 1})
+    restaurant.reserve("a", 2, 100, 60)
+    assert restaurant.check_in(21, 100) == "a"
+    with pytest.raises(ValueError):
+        restaurant.check_in(21, 100)
+
+
+def test_waiting_parties_of_one_size_are_seated_in_arrival_order():
+    restaurant = Restaurant({2: 1})
+    restaurant.walk_in("a", 2)
+    for name in "bcd":
+        assert restaurant.walk_in(name, 2) == f"No table available for {name}, added to queue"
+    for name in "bcd":
+        assert restaurant.finish_meal(2, 21) == f"Table 21 Has Finished their Meal -> Reassigned to {name}"
+    assert restaurant.finish_meal(2, 21) == "Table 21 is now free"
+    assert restaurant.queue_length() == 0
+
+
+def test_cancel_drops_the_oldest_entry_of_a_repeated_name():
+    restaurant = Restaurant({2: 1})
+    restaurant.walk_in("a", 2)
+    restaurant.walk_in("bob", 2)
+    restaurant.walk_in("amy", 2)
+    restaurant.walk_in("bob", 1)
+    assert restaurant.cancel_customer("bob") == "bob's request cancelled"
+    assert restaurant.queue == [("amy", 2), ("bob", 1)]
+    assert restaurant.queue_length() == 2
+
+
+def test_cancel_after_being_seated_is_not_found():
+    restaurant = Restaurant({2: 1})
+    restaurant.walk_in("a", 2)
+    restaurant.walk_in("b", 2)
+    restaurant.finish_meal(2, 21)
+    assert restaurant.cancel_customer("b") == "b not found in queue"
+    assert restaurant.queue_length() == 0
+
+
+def test_process_batch_returns_every_seating_in_order():
+    restaurant = Restaurant({2: 1, 4: 1})
+    events = [
+        ("arrive", "a", 2),
+        ("arrive", "b", 3),
+        ("arrive", "c", 2),
+        ("arrive", "d", 2),
+        ("cancel", "c"),
+        ("finish", 4, 41),
+        ("finish", 2, 21),
+        ("arrive", "e", 9),
+    ]
+    # c cancelled before a table came free; nothing could ever seat e
+    assert restaurant.process_batch(events) == [("a", 21), ("b", 41), ("d", 41)]
+    assert restaurant.queue == []
+
+
+def test_best_fit_uses_the_smallest_table_that_fits():
+    restaurant = Restaurant({2: 1, 4: 1, 8: 1})
+    assert restaurant.walk_in("a", 3) == "Assigned 41 to a"
+    assert restaurant.walk_in("b", 3) == "Assigned 81 to b"
+    assert restaurant.walk_in("c", 1) == "Assigned 21 to c"
+    assert restaurant.walk_in("d", 9) == "No table can seat a party of 9"
+    # a freed 4-seater goes to the earliest party it can hold, whatever their size
+    restaurant.walk_in("e", 4)
+    restaurant.walk_in("f", 2)
+    assert restaurant.finish_meal(4, 41) == "Table 41 Has Finished their Meal -> Reassigned to e"
+    assert restaurant.finish_meal(8, 81) == "Table 81 Has Finished their Meal -> Reassigned to f"
+
+
+def test_exact_policy_only_uses_tables_of_the_party_size():
+    restaurant = Restaurant({2: 1, 4: 1, 8: 1}, policy="exact")
+    assert restaurant.walk_in("a", 3) == "No table can seat a party of 3"
+    assert restaurant.walk_in("b", 4) == "Assigned 41 to b"
+    assert restaurant.walk_in("c", 4) == "No table available for c, added to queue"
+    assert restaurant.walk_in("d", 2) == "Assigned 21 to d"
+    # the 8-seater is free, but it is never handed to a smaller party
+    assert restaurant.walk_in("e", 2) == "No table available for e, added to queue"
+    assert restaurant.finish_meal(4, 41) == "Table 41 Has Finished their Meal -> Reassigned to c"
+    assert restaurant.finish_meal(2, 21) == "Table 21 Has Finished their Meal -> Reassigned to e"
+    assert restaurant.status()["available_tables"] == {2: [], 4: [], 8: [81]}
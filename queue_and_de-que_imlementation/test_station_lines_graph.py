@@ -0,0 +1,177 @@
+import itertools
+import math
+import random
+
+import pytest
+
+from station_lines_graph import (TRANSFER_LINE, Graph, astar_shortest_path, bfs_shortest_path,
+                                 dijkstra_shortest_path, k_shortest_paths)
+
+
+def _random_network(rng, line_change_minutes, max_stations=8, one_way=0.0, parallel=0.0):
+    """
+    Edges on lines A-C, walks and unlabelled edges. Each edge is two-way
+    except for a one_way share of them, and a parallel share of station
+    pairs get a second edge on another line.
+    """
+    graph = Graph(line_change_minutes=line_change_minutes)
+    n = rng.randint(4, max_stations)
+    for station in range(n):
+        graph.add_vertex(station)
+    for _ in range(rng.randint(n, 2 * n)):
+        a, b = rng.sample(range(n), 2)
+        if b in graph.vertices[a] or a in graph.vertices[b]:
+            continue
+        lines = rng.sample(["A", "B", "C", TRANSFER_LINE, None], 2 if rng.random() < parallel else 1)
+        two_way = rng.random() >= one_way
+        for line in lines:
+            minutes = rng.randint(1, 6)
+            graph.add_edge(a, b, minutes, line)
+            if two_way:
+                graph.add_edge(b, a, minutes, line)
+    return graph
+
+
+def _riding_change(graph):
+    """The line change penalty the searches charge: none with fewer than two riding lines."""
+    riding = {line for lines in graph.lines.values() for line in lines if line not in (None, TRANSFER_LINE)}
+    return (graph.line_change_minutes if len(riding) >= 2 else 0), riding
+
+
+def _travel_time(graph, path):
+    """Quickest minutes along a path of station names over any of its parallel edges, with line changes."""
+    change, riding = _riding_change(graph)
+    arrivals = {None: 0}
+    for source, target in zip(path, path[1:]):
+        reached = {}
+        for next_station, minutes, line in zip(graph.vertices[source], graph.weights[source], graph.lines[source]):
+            if next_station != target:
+                continue
+            edge_lane = line if line in riding else None
+            for lane, time in arrivals.items():
+                arrival = time + minutes + (change if lane and edge_lane and lane != edge_lane else 0)
+                reached[edge_lane] = min(arrival, reached.get(edge_lane, math.inf))
+        arrivals = reached
+    return min(arrivals.values())
+
+
+def _loopless_times(graph, start, goal):
+    times = []
+
+    def extend(path):
+        if path[-1] == goal:
+            times.append(_travel_time(graph, path))
+            return
+        for neighbor in dict.fromkeys(graph.vertices[path[-1]]):
+            if neighbor not in path:
+                extend(path + [neighbor])
+
+    extend([start])
+    return sorted(times)
+
+
+@pytest.mark.parametrize("line_change_minutes", [0, 4, 10])
+def test_k_shortest_paths_match_brute_force(line_change_minutes):
+    rng = random.Random(line_change_minutes)
+    for _ in range(40):
+        graph = _random_network(rng, line_change_minutes, parallel=0.3)
+        for start, goal in itertools.permutations(graph.vertices, 2):
+            found = k_shortest_paths(graph, start, goal, k=4)
+            for path, time in found:
+                assert len(set(path)) == len(path)
+                assert _travel_time(graph, path) == pytest.approx(time)
+            assert len({tuple(path) for path, _ in found}) == len(found)
+            expected = _loopless_times(graph, start, goal)[:4]
+            assert [time for _, time in found] == pytest.approx(expected)
+
+
+def _reference_times(graph, start):
+    """
+    Quickest time from start to every station by Bellman-Ford over (station,
+    line ridden in on) pairs, working on the Graph's own lists.
+    """
+    change, riding = _riding_change(graph)
+    best = {(start, None): 0}
+    changed = True
+    while changed:
+        changed = False
+        for (station, lane), time in list(best.items()):
+            for target, minutes, line in zip(graph.vertices[station], graph.weights[station], graph.lines[station]):
+                edge_lane = line if line in riding else None
+                arrival = time + minutes
+                if lane and edge_lane and lane != edge_lane:
+                    arrival += change
+                if arrival < best.get((target, edge_lane), math.inf):
+                    best[(target, edge_lane)] = arrival
+                    changed = True
+    times = {}
+    for (station, _), time in best.items():
+        times[station] = min(time, times.get(station, math.inf))
+    return times
+
+
+def _check_route(graph, route, expected):
+    if expected is None:
+        assert route is None
+        return
+    path, time = route
+    assert time == pytest.approx(expected)
+    assert _travel_time(graph, path) == pytest.approx(time)
+
+
+@pytest.mark.parametrize("line_change_minutes", [0, 4, 10])
+def test_weighted_searches_match_bellman_ford(line_change_minutes):
+    rng = random.Random(100 + line_change_minutes)
+    for _ in range(40):
+        graph = _random_network(rng, line_change_minutes, max_stations=12, parallel=0.3)
+        graph.set_coords({station: (rng.uniform(0, 10), rng.uniform(0, 10)) for station in graph.vertices})
+        for start in graph.vertices:
+            reference = _reference_times(graph, start)
+            for goal in graph.vertices:
+                expected = reference.get(goal)
+                _check_route(graph, dijkstra_shortest_path(graph, start, goal), expected)
+                _check_route(graph, astar_shortest_path(graph, start, goal), expected)
+                _check_route(graph, graph.fastest_route(start, goal), expected)
+
+
+@pytest.mark.parametrize("line_change_minutes", [0, 4, 10])
+def test_bidirectional_searches_match_one_way_searches(line_change_minutes):
+    rng = random.Random(200 + line_change_minutes)
+    for _ in range(40):
+        graph = _random_network(rng, line_change_minutes, max_stations=12, one_way=0.3, parallel=0.3)
+        for start in graph.vertices:
+            reference = _reference_times(graph, start)
+            for goal in graph.vertices:
+                _check_route(graph, dijkstra_shortest_path(graph, start, goal, bidirectional=True), reference.get(goal))
+                assert bfs_shortest_path(graph, start, goal, bidirectional=True) == bfs_shortest_path(graph, start, goal)
+
+
+def test_weighted_states_grow_with_edges_not_lines():
+    # 200 two-stop lines: a station * lines table would hold 400 * 201 states
+    graph = Graph(line_change_minutes=5)
+    for i in range(200):
+        graph.add_vertex(f"a{i}")
+        graph.add_vertex(f"b{i}")
+        graph.add_edge(f"a{i}", f"b{i}", 1, f"L{i}")
+        graph.add_edge(f"b{i}", f"a{i}", 1, f"L{i}")
+    frozen = graph.freeze()
+    assert frozen.line_states == 201
+    assert len(frozen.state_stations) == len(frozen) + frozen.edge_count()
+    assert dijkstra_shortest_path(graph, "a7", "b7") == (["a7", "b7"], 1)
+
+
+def test_parallel_edges_on_different_lines_are_priced_separately():
+    graph = Graph(line_change_minutes=5)
+    for station in "SABC":
+        graph.add_vertex(station)
+    graph.add_edge("S", "A", 1, "X")
+    graph.add_edge("A", "B", 3, "X")
+    graph.add_edge("A", "B", 2, "Y")
+    graph.add_edge("B", "C", 1, "X")
+    # the 2-minute edge costs two line changes, so staying on X is quicker
+    expected = (["S", "A", "B", "C"], 5)
+    assert dijkstra_shortest_path(graph, "S", "C") == expected
+    assert dijkstra_shortest_path(graph, "S", "C", bidirectional=True) == expected
+    assert astar_shortest_path(graph, "S", "C") == expected
+    assert graph.fastest_route("S", "C") == expected
+    assert k_shortest_paths(graph, "S", "C") == [expected]